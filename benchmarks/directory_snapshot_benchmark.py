@@ -0,0 +1,61 @@
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from yget.directory_snapshot import DirectorySnapshot
+
+def make_library(directory, file_count):
+    for i in range(file_count):
+        with open(os.path.join(directory, "Video title {} ({:011d}).mp4".format(i, i)), "w"):
+            pass
+
+def make_roots(directory, file_count, lookup_count):
+    step = max(file_count // lookup_count, 1)
+
+    return [os.path.join(directory, "Video title {} ({:011d})".format(i, i)) for i in range(0, file_count, step)][:lookup_count]
+
+def time_glob(roots):
+    start = time.perf_counter()
+
+    for root in roots:
+        glob.glob(glob.escape(root) + ".*")
+
+    return time.perf_counter() - start
+
+def time_snapshot(directory, roots):
+    start = time.perf_counter()
+
+    directory_snapshot = DirectorySnapshot(directory)
+
+    scanned = time.perf_counter()
+
+    for root in roots:
+        directory_snapshot.get_extensions(root)
+
+    return (scanned - start, time.perf_counter() - scanned)
+
+def main(argv):
+    file_count = int(argv[1]) if len(argv) > 1 else 100000
+    lookup_count = int(argv[2]) if len(argv) > 2 else 1000
+
+    directory = tempfile.mkdtemp()
+
+    try:
+        print("Creating {} files in {}".format(file_count, directory))
+        make_library(directory, file_count)
+
+        roots = make_roots(directory, file_count, lookup_count)
+
+        glob_time = time_glob(roots)
+        scan_time, lookup_time = time_snapshot(directory, roots)
+
+        print("glob:     {:.3f}s for {} lookups ({:.3f}ms per lookup)".format(glob_time, len(roots), glob_time * 1000 / len(roots)))
+        print("snapshot: {:.3f}s scan + {:.3f}s for {} lookups ({:.4f}ms per lookup)".format(scan_time, lookup_time, len(roots), lookup_time * 1000 / len(roots)))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
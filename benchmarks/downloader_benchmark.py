@@ -0,0 +1,265 @@
+import http.server
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import youtube_dl
+
+from youtube_dl.extractor.common import InfoExtractor
+
+from yget.download_settings import DownloadSettings
+from yget.downloader import Downloader
+
+block = b"\0" * (64 * 1024)
+
+class MediaRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    path_regex = re.compile(r"^/media/(?P<id>[0-9]+)\.mp4\?size=(?P<size>[0-9]+)$")
+    range_regex = re.compile(r"^bytes=(?P<start>[0-9]+)-(?P<end>[0-9]*)$")
+
+    def do_GET(self):
+        match = MediaRequestHandler.path_regex.match(self.path)
+
+        if match is None:
+            self.send_error(404)
+            return
+
+        size = int(match.group("size"))
+        start = 0
+        end = size - 1
+
+        range_match = MediaRequestHandler.range_regex.match(self.headers.get("Range", ""))
+
+        if range_match is not None:
+            start = int(range_match.group("start"))
+            end = min(int(range_match.group("end") or end), end)
+
+            if start > end:
+                self.send_response(416)
+                self.send_header("Content-Range", "bytes */{}".format(size))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, end, size))
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        remaining = end - start + 1
+
+        while remaining > 0:
+            chunk = block[:min(remaining, len(block))]
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        pass
+
+class BenchmarkIE(InfoExtractor):
+    _VALID_URL = r"benchmark:(?P<kind>video|playlist):(?P<id>[0-9]+)"
+
+    server_url = None
+    item_size = None
+
+    def _real_extract(self, url):
+        kind, number = re.match(BenchmarkIE._VALID_URL, url).group("kind", "id")
+
+        if kind == "playlist":
+            # Entries are generated as they are iterated, like the pages of a real playlist
+            entries = (self.url_result("benchmark:video:{}".format(i), BenchmarkIE.ie_key(), "benchmark{:07d}".format(i)) for i in range(int(number)))
+
+            return self.playlist_result(entries, "benchmarks{}".format(number), "Benchmark playlist of {}".format(number))
+
+        return {
+            "id": "benchmark{:07d}".format(int(number)),
+            "title": "Benchmark video {}".format(number),
+            "duration": 60,
+            "formats": [{
+                "format_id": "18",
+                "url": "{}/media/{}.mp4?size={}".format(BenchmarkIE.server_url, number, BenchmarkIE.item_size),
+                "ext": "mp4",
+                "filesize": BenchmarkIE.item_size,
+                "protocol": "http"
+            }]
+        }
+
+class BenchmarkDownloader(Downloader):
+    def __init__(self, output_directory, settings, postprocess):
+        super(BenchmarkDownloader, self).__init__(output_directory, False, True, settings, None)
+
+        self.postprocess = postprocess
+        self.first_byte = None
+
+    def create_download_options(self):
+        download_options = super(BenchmarkDownloader, self).create_download_options()
+
+        # Without ffmpeg the postprocess stage still runs, only without any postprocessors
+        if not self.postprocess:
+            download_options.download_options["postprocessors"] = []
+
+        return download_options
+
+    def download_status(self, info):
+        if self.first_byte is None and info.get("downloaded_bytes"):
+            self.first_byte = time.perf_counter()
+
+        super(BenchmarkDownloader, self).download_status(info)
+
+def install_extractor(server_url, item_size):
+    BenchmarkIE.server_url = server_url
+    BenchmarkIE.item_size = item_size
+
+    add_default_info_extractors = youtube_dl.YoutubeDL.add_default_info_extractors
+
+    # Every YoutubeDL the downloader creates tries the benchmark extractor before the real ones
+    def add_benchmark_info_extractor(youtube_downloader):
+        youtube_downloader.add_info_extractor(BenchmarkIE())
+        add_default_info_extractors(youtube_downloader)
+
+    youtube_dl.YoutubeDL.add_default_info_extractors = add_benchmark_info_extractor
+
+def get_peak_rss():
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes and macOS bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+def get_directory_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file() and entry.name.endswith(".mp4"))
+
+def run_benchmark(server_url, item_count, item_size, jobs, postprocess):
+    install_extractor(server_url, item_size)
+
+    directory = tempfile.mkdtemp()
+    output_directory = os.path.join(directory, "output")
+    os.mkdir(output_directory)
+
+    settings = DownloadSettings()
+    settings.jobs = jobs
+    settings.cache_directory = os.path.join(directory, "cache")
+
+    downloader = BenchmarkDownloader(output_directory, settings, postprocess)
+    url = "benchmark:video:0" if item_count == 1 else "benchmark:playlist:{}".format(item_count)
+
+    stdout = sys.stdout
+
+    try:
+        with open(os.devnull, "w") as devnull:
+            sys.stdout = devnull
+
+            start = time.perf_counter()
+
+            downloader.download_videos([url])
+
+            seconds = time.perf_counter() - start
+
+        sys.stdout = stdout
+
+        downloaded_bytes = get_directory_size(output_directory)
+        downloaded = len([name for name in os.listdir(output_directory) if name.endswith(".mp4")])
+
+        return {
+            "items": item_count,
+            "downloaded": downloaded,
+            "seconds": seconds,
+            "items_per_second": downloaded / seconds,
+            "bytes_per_second": downloaded_bytes / seconds,
+            "peak_rss_bytes": get_peak_rss(),
+            "time_to_first_byte_seconds": downloader.first_byte - start if downloader.first_byte is not None else None
+        }
+    finally:
+        sys.stdout = stdout
+        shutil.rmtree(directory)
+
+def start_media_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MediaRequestHandler)
+    server.daemon_threads = True
+
+    thread = threading.Thread(target=server.serve_forever, name="media-server", daemon=True)
+    thread.start()
+
+    return server
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {run["items"]: run for run in json.load(f)["runs"]}
+
+    for run in results["runs"]:
+        baseline_run = baseline.get(run["items"])
+
+        if baseline_run is None:
+            continue
+
+        print("{:>6} items: {:+.1f}% items/s, {:+.1f}% peak RSS against {}".format(
+            run["items"],
+            (run["items_per_second"] / baseline_run["items_per_second"] - 1) * 100,
+            (run["peak_rss_bytes"] / baseline_run["peak_rss_bytes"] - 1) * 100,
+            baseline_path))
+
+def main(argv):
+    item_counts = [int(count) for count in (argv[1] if len(argv) > 1 else "1,100,10000").split(",")]
+    item_size = int(argv[2]) * 1024 if len(argv) > 2 else 64 * 1024
+    jobs = int(argv[3]) if len(argv) > 3 else 4
+    results_path = argv[4] if len(argv) > 4 else "downloader_benchmark.json"
+    baseline_path = argv[5] if len(argv) > 5 else None
+
+    postprocess = shutil.which("ffmpeg") is not None
+
+    if not postprocess:
+        print("ffmpeg not found, videos are downloaded without being postprocessed")
+
+    server = start_media_server()
+    server_url = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    # Each run gets a fresh process so peak RSS is its own and the server does not share its interpreter
+    context = multiprocessing.get_context("spawn")
+
+    results = {
+        "python": platform.python_version(),
+        "youtube_dl": youtube_dl.version.__version__,
+        "item_size": item_size,
+        "jobs": jobs,
+        "postprocess": postprocess,
+        "runs": []
+    }
+
+    try:
+        for item_count in item_counts:
+            with context.Pool(1) as pool:
+                run = pool.apply(run_benchmark, (server_url, item_count, item_size, jobs, postprocess))
+
+            results["runs"].append(run)
+
+            print("{:>6} items: {:.2f}s, {:.1f} items/s, {}/s, peak RSS {}, first byte after {}".format(
+                item_count,
+                run["seconds"],
+                run["items_per_second"],
+                youtube_dl.utils.format_bytes(run["bytes_per_second"]),
+                youtube_dl.utils.format_bytes(run["peak_rss_bytes"]),
+                "{:.3f}s".format(run["time_to_first_byte_seconds"]) if run["time_to_first_byte_seconds"] is not None else "-"))
+    finally:
+        server.shutdown()
+
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print("Results written to {}".format(results_path))
+
+    if baseline_path is not None:
+        compare(results, baseline_path)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
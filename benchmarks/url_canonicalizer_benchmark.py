@@ -0,0 +1,63 @@
+import sys
+import time
+
+from youtube_dl.extractor import gen_extractor_classes
+
+from yget.url_canonicalizer import UrlCanonicalizer
+
+url_templates = [
+    "https://www.youtube.com/watch?v={video}",
+    "https://www.youtube.com/watch?v={video}&list={playlist}&index=3",
+    "https://youtu.be/{video}?t=42",
+    "https://m.youtube.com/watch?feature=share&v={video}",
+    "https://music.youtube.com/playlist?list={playlist}",
+    "{video}",
+    "https://example.com/{video}"
+]
+
+def make_inputs(line_count):
+    inputs = []
+
+    for i in range(line_count):
+        video = "{:011d}".format(i)
+        playlist = "PL{:032d}".format(i)
+
+        inputs.append(url_templates[i % len(url_templates)].format(video=video, playlist=playlist))
+
+    return inputs
+
+def time_canonicalizer(inputs):
+    start = time.perf_counter()
+
+    for value in inputs:
+        UrlCanonicalizer.classify(value)
+
+    return time.perf_counter() - start
+
+def time_extractor_matching(inputs):
+    # youtube_dl tries each extractor's suitable() in turn until one matches
+    extractors = list(gen_extractor_classes())
+
+    start = time.perf_counter()
+
+    for value in inputs:
+        for extractor in extractors:
+            if extractor.suitable(value):
+                break
+
+    return time.perf_counter() - start
+
+def main(argv):
+    line_count = int(argv[1]) if len(argv) > 1 else 1000000
+    sample_count = int(argv[2]) if len(argv) > 2 else 10000
+
+    inputs = make_inputs(line_count)
+
+    canonicalizer_time = time_canonicalizer(inputs)
+    extractor_time = time_extractor_matching(inputs[:sample_count])
+
+    print("canonicalizer:      {:.3f}s for {} lines ({:.2f}us per line)".format(canonicalizer_time, len(inputs), canonicalizer_time * 1000000 / len(inputs)))
+    print("extractor matching: {:.3f}s for {} lines ({:.2f}us per line)".format(extractor_time, sample_count, extractor_time * 1000000 / sample_count))
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -1,4 +1,5 @@
 from yget.argument_parser import ArgumentParser
+from yget.download_settings import DownloadSettings
 
 class MockArgumentParser(ArgumentParser):
     def __init__(self):
@@ -8,6 +9,7 @@ class MockArgumentParser(ArgumentParser):
         self.mode_info = None
         self.output_directory = None
         self.options = None
+        self.settings = DownloadSettings()
 
     def set_help_mode(self):
         self.arguments_valid = True
@@ -28,9 +30,17 @@ class MockArgumentParser(ArgumentParser):
         self.mode_info = ("bookmarks", bookmarks)
         self.options = options
 
+    def set_rebuild_archive_mode(self, options):
+        self.arguments_valid = True
+        self.mode_info = ("rebuild-archive", None)
+        self.options = options
+
     def set_output_directory(self, output_directory):
         self.output_directory = output_directory
 
+    def set_settings(self, settings):
+        self.settings = settings
+
     def make_arguments_invalid_message(self):
         return "ARGUMENTS_INVALID_MESSAGE"
 
@@ -38,4 +48,4 @@ class MockArgumentParser(ArgumentParser):
         return "HELP_MESSAGE"
 
     def parse(self):
-        return (self.arguments_valid, self.mode_info, self.output_directory, self.options)
+        return (self.arguments_valid, self.mode_info, self.output_directory, self.options, self.settings)
@@ -2,15 +2,24 @@ from yget.downloader import Downloader
 
 class MockDownloader(Downloader):
     def __init__(self, raise_in_download_videos):
-        super(MockDownloader, self).__init__(None, None, None, None)
+        super(MockDownloader, self).__init__(None, None, None, None, None)
 
         self.raise_in_download_videos = raise_in_download_videos
 
         self.download_video_calls = []
+        self.download_video_sources = []
+        self.rebuild_archive_calls = 0
 
-    def download_videos(self, urls, audio_only=None, wav=None, mp3=None):
+    def download_videos(self, urls, audio_only=None, wav=None, mp3=None, sources=None):
         for url in urls:
             self.download_video_calls.append(url)
 
+        self.download_video_sources.extend(sources or [])
+
         if self.raise_in_download_videos:
             raise "ERROR"
+
+    def rebuild_archive(self):
+        self.rebuild_archive_calls += 1
+
+        return 3
@@ -13,7 +13,7 @@ class MockDownloaderFactory(DownloaderFactory):
         if raise_in_download_videos is not None:
             self.raise_in_download_videos = raise_in_download_videos
 
-    def make_downloader(self, output_directory, verbose, use_netrc):
+    def make_downloader(self, output_directory, verbose, use_netrc, settings):
         self.downloader = MockDownloader(self.raise_in_download_videos)
 
         return self.downloader
@@ -652,3 +652,58 @@ class TestApp(unittest.TestCase):
             raised = True
 
         self.assertTrue(raised)
+
+    def test_app_in_rebuild_archive_mode_rebuilds_and_logs(self):
+        options = (False, False, False, False, False)
+
+        mock_argument_parser = MockArgumentParser()
+        mock_argument_parser.set_rebuild_archive_mode(options)
+
+        mock_downloader_factory = MockDownloaderFactory()
+
+        mock_logger = MockLogger()
+
+        app = self.make_app(mock_argument_parser=mock_argument_parser, mock_downloader_factory=mock_downloader_factory, mock_logger=mock_logger)
+
+        code = app.run()
+
+        mock_downloader = mock_downloader_factory.downloader
+
+        self.assertEqual(mock_downloader.rebuild_archive_calls, 1)
+        self.assertListEqual(mock_downloader.download_video_calls, [])
+        self.assertListEqual(mock_logger.write_line_calls, ["Recorded 3 video(s) in the download archive"])
+        self.assertEqual(code, 0)
+
+    def test_app_in_url_mode_with_short_url_downloads_canonical_url(self):
+        options = (False, False, False, False, False)
+
+        mock_argument_parser = MockArgumentParser()
+        mock_argument_parser.set_url_mode("https://youtu.be/dQw4w9WgXcQ?t=10", options)
+
+        mock_downloader_factory = MockDownloaderFactory()
+
+        app = self.make_app(mock_argument_parser=mock_argument_parser, mock_downloader_factory=mock_downloader_factory)
+
+        code = app.run()
+
+        mock_downloader = mock_downloader_factory.downloader
+
+        self.assertListEqual(mock_downloader.download_video_calls, ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"])
+        self.assertEqual(code, 0)
+
+    def test_app_in_files_mode_passes_file_of_each_url_as_source(self):
+        options = (False, False, False, False, False)
+
+        mock_argument_parser = MockArgumentParser()
+        mock_argument_parser.set_files_mode(["FILE_1", "FILE_2"], options)
+
+        mock_downloader_factory = MockDownloaderFactory()
+
+        app = self.make_app(mock_argument_parser=mock_argument_parser, mock_downloader_factory=mock_downloader_factory)
+
+        code = app.run()
+
+        mock_downloader = mock_downloader_factory.downloader
+
+        self.assertListEqual(mock_downloader.download_video_sources, ["FILE_1", "FILE_1", "FILE_2", "FILE_2"])
+        self.assertEqual(code, 0)
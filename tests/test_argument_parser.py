@@ -67,6 +67,8 @@ class TestArgumentParser(unittest.TestCase):
         expected_help_message += "     URL of the YouTube video to download\n"
         expected_help_message += " -b, --bookmarks=BOOKMARKS_FILE\n"
         expected_help_message += "     Bookmarks formatted file to extract YouTube urls from\n"
+        expected_help_message += "     --rebuild-archive\n"
+        expected_help_message += "     Record every video already in the output directory in the download archive\n"
         expected_help_message += " -h, --help\n"
         expected_help_message += "     Display help information\n"
 
@@ -78,20 +80,72 @@ class TestArgumentParser(unittest.TestCase):
         expected_help_message += "     --mp3          audio-only but with output forced to mp3 format\n"
         expected_help_message += "     --netrc        Use .netrc file for authentication\n"
         expected_help_message += "     Entry must follow the format: machine youtube login <username> password <password>\n"
+        expected_help_message += " -j, --jobs=N       Number of videos to download at the same time (default 1)\n"
+        expected_help_message += "     --extract-jobs=N\n"
+        expected_help_message += "                    Number of urls to extract video information from at the same time (default 1)\n"
+        expected_help_message += "     --postprocess-jobs=N\n"
+        expected_help_message += "                    Number of downloaded videos to run ffmpeg on at the same time (default number of CPU cores)\n"
+        expected_help_message += "     --retries=N    Times to retry a video after a network error or throttling, waiting longer each time (default 3)\n"
+        expected_help_message += "     --adaptive     Raise the number of extractions and downloads while they succeed and lower it when throttled\n"
+        expected_help_message += "     --max-jobs=N   Most extractions or downloads at the same time with --adaptive (default 8)\n"
+        expected_help_message += "     --nice=N       Run ffmpeg with its niceness raised by N so downloads keep priority (Linux only)\n"
+        expected_help_message += "     --ffmpeg-threads=N\n"
+        expected_help_message += "                    Maximum number of threads each ffmpeg run uses\n"
+        expected_help_message += "     --segments=N   Download large files over N connections at once when the server supports it (default 1)\n"
+        expected_help_message += "     --segment-min-size=MB\n"
+        expected_help_message += "                    Smallest file to download over several connections (default 16)\n"
+        expected_help_message += "     --limit-rate=RATE\n"
+        expected_help_message += "                    Maximum total download rate across all transfers, e.g. 50K or 4.2M\n"
+        expected_help_message += "     --limit-rate-per-transfer=RATE\n"
+        expected_help_message += "                    Maximum download rate of each transfer\n"
+        expected_help_message += "     --limit-rate-file=FILE\n"
+        expected_help_message += "                    File holding the total rate limit, re-read when it changes or on SIGHUP\n"
+        expected_help_message += "     --queue-size=N Number of videos waiting between each stage before earlier stages pause (default 16)\n"
+        expected_help_message += "                    Up to 8 times as many wait to download unless --schedule=input and --no-fair are given\n"
+        expected_help_message += "     --schedule=POLICY\n"
+        expected_help_message += "                    Order to download videos in: input, shortest, largest or mixed (shortest first without starving long videos)\n"
+        expected_help_message += "     --no-fair      Do not take turns between input files and bookmarks folders, or between their urls in input order\n"
+        expected_help_message += "     --source-weight=SOURCE=N\n"
+        expected_help_message += "                    Give an input file or bookmarks folder N turns for every turn of the others, e.g. urgent.txt=4\n"
+        expected_help_message += "     --no-cache     Do not read or write the video information cache\n"
+        expected_help_message += "     --refresh      Ignore cached video information but update the cache\n"
+        expected_help_message += "     --cache-dir=CACHE_DIRECTORY\n"
+        expected_help_message += "                    Directory for the video information cache (default ~/.cache/yget)\n"
+        expected_help_message += "     --cache-ttl=KIND=SECONDS\n"
+        expected_help_message += "                    Time to keep cached playlist, video or stream information, e.g. stream=3600\n"
+        expected_help_message += "     --cache-size=MB\n"
+        expected_help_message += "                    Maximum size of the video information cache (default 64)\n"
+        expected_help_message += "     --archive=ARCHIVE_FILE\n"
+        expected_help_message += "                    File recording downloaded videos (default OUTPUT_DIRECTORY/.yget-archive)\n"
+        expected_help_message += "     --no-archive   Do not read or write the download archive\n"
+        expected_help_message += "     --resume       Continue the videos recorded in the journal by an interrupted run\n"
+        expected_help_message += "     --journal=JOURNAL_FILE\n"
+        expected_help_message += "                    File recording the progress of each video (default OUTPUT_DIRECTORY/.yget-journal)\n"
+        expected_help_message += "     --no-journal   Do not write the journal\n"
+        expected_help_message += "     --metrics-file=FILE\n"
+        expected_help_message += "                    Prometheus textfile rewritten with the progress of each stage while running\n"
+        expected_help_message += "     --metrics-summary=FILE\n"
+        expected_help_message += "                    JSON file written with the metrics of the whole run when it ends\n"
+        expected_help_message += "     --metrics-interval=SECONDS\n"
+        expected_help_message += "                    Time between rewrites of the metrics file (default 15)\n"
+        expected_help_message += "     --profile=PROFILE_FILE\n"
+        expected_help_message += "                    Write a cProfile dump of every stage and print the wall and CPU time of each\n"
+        expected_help_message += "     --trace=TRACE_FILE\n"
+        expected_help_message += "                    Write a timeline of every item in each stage and queue for chrome://tracing or Perfetto\n"
 
         self.assertEqual(help_message, expected_help_message)
 
     def test_parse_with_invalid_options_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--wrong", "--args"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_no_additional_argv_entries_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py"])
 
-        arguments_valid, mode_info, output_directory, _ = argument_parser.parse()
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -102,7 +156,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_dash_argv_entry_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-"])
 
-        arguments_valid, mode_info, output_directory, _ = argument_parser.parse()
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -113,7 +167,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_additional_argv_entries_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "URL_1", "URL_2"])
 
-        arguments_valid, mode_info, output_directory, _ = argument_parser.parse()
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -124,7 +178,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_help_mode_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-h"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -134,7 +188,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_help_mode_and_another_mode_parses_as_help_mode(self):
         argument_parser = self.make_argument_parser(["yget.py", "-h", "-b MY_BOOKMARKS"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -144,7 +198,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_long_help_mode_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--help"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -154,7 +208,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_long_help_mode_and_another_mode_parses_as_help_mode(self):
         argument_parser = self.make_argument_parser(["yget.py", "--help", "-b MY_BOOKMARKS"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -164,7 +218,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_output_directory_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-o MY_OUTPUT_DIRECTORY"])
 
-        arguments_valid, mode_info, output_directory, _ = argument_parser.parse()
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -175,7 +229,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_output_directory_without_space_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-oMY_OUTPUT_DIRECTORY"])
 
-        arguments_valid, mode_info, output_directory, _ = argument_parser.parse()
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -186,7 +240,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_long_output_directory_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--output-directory=MY_OUTPUT_DIRECTORY"])
 
-        arguments_valid, mode_info, output_directory, _ = argument_parser.parse()
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -197,21 +251,21 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_output_directory_without_value_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-o"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_long_output_directory_without_value_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--output-directory"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_short_url_mode_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-u MY_URL"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -221,7 +275,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_url_mode_without_space_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-uMY_URL"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -231,7 +285,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_long_url_mode_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--url=MY_URL"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -241,21 +295,21 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_url_mode_without_value_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-u"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_long_url_mode_without_value_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--url"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_short_bookmarks_mode_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-b MY_BOOKMARKS"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -265,7 +319,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_bookmarks_mode_without_space_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-bMY_BOOKMARKS"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -275,7 +329,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_long_bookmarks_mode_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--bookmarks=MY_BOOKMARKS"])
 
-        arguments_valid, mode_info, _, _ = argument_parser.parse()
+        arguments_valid, mode_info, _, _, _ = argument_parser.parse()
         mode, mode_value = mode_info
 
         self.assertTrue(arguments_valid)
@@ -285,21 +339,21 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_short_bookmarks_mode_without_value_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-b"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_long_bookmarks_mode_without_value_parses_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--bookmarks"])
 
-        arguments_valid, _, _, _ = argument_parser.parse()
+        arguments_valid, _, _, _, _ = argument_parser.parse()
 
         self.assertFalse(arguments_valid)
 
     def test_parse_with_short_verbose_option_sets_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "-v"])
 
-        arguments_valid, _, _, options = argument_parser.parse()
+        arguments_valid, _, _, options, _ = argument_parser.parse()
         has_verbose_option, _, _, _, _ = options
 
         self.assertTrue(arguments_valid)
@@ -308,7 +362,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_long_verbose_option_sets_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--verbose"])
 
-        arguments_valid, _, _, options = argument_parser.parse()
+        arguments_valid, _, _, options, _ = argument_parser.parse()
         has_verbose_option, _, _, _, _ = options
 
         self.assertTrue(arguments_valid)
@@ -317,7 +371,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_audio_only_option_sets_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--audio-only"])
 
-        arguments_valid, _, _, options = argument_parser.parse()
+        arguments_valid, _, _, options, _ = argument_parser.parse()
         _, has_audio_only_option, _, _, _ = options
 
         self.assertTrue(arguments_valid)
@@ -326,7 +380,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_wav_option_sets_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--wav"])
 
-        arguments_valid, _, _, options = argument_parser.parse()
+        arguments_valid, _, _, options, _ = argument_parser.parse()
         _, _, has_wav_option, _, _ = options
 
         self.assertTrue(arguments_valid)
@@ -335,7 +389,7 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_mp3_option_sets_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--mp3"])
 
-        arguments_valid, _, _, options = argument_parser.parse()
+        arguments_valid, _, _, options, _ = argument_parser.parse()
         _, _, _, has_mp3_option, _ = options
 
         self.assertTrue(arguments_valid)
@@ -344,9 +398,261 @@ class TestArgumentParser(unittest.TestCase):
     def test_parse_with_netrc_option_sets_correctly(self):
         argument_parser = self.make_argument_parser(["yget.py", "--netrc"])
 
-        arguments_valid, _, _, options = argument_parser.parse()
+        arguments_valid, _, _, options, _ = argument_parser.parse()
         _, _, _, _, has_netrc_option = options
 
         self.assertTrue(arguments_valid)
         self.assertTrue(has_netrc_option)
 
+
+    def test_parse_without_jobs_option_uses_default(self):
+        argument_parser = self.make_argument_parser(["yget.py"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.jobs, 1)
+
+    def test_parse_with_short_jobs_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "-j 4"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.jobs, 4)
+
+    def test_parse_with_long_jobs_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--jobs=8"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.jobs, 8)
+
+    def test_parse_with_non_numeric_jobs_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--jobs=many"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_zero_jobs_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--jobs=0"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_stage_job_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--extract-jobs=2", "--postprocess-jobs=3", "--queue-size=5"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.jobs, 1)
+        self.assertEqual(settings.extract_jobs, 2)
+        self.assertEqual(settings.postprocess_jobs, 3)
+        self.assertEqual(settings.queue_size, 5)
+
+    def test_parse_with_invalid_stage_job_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--postprocess-jobs=-1"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_cache_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--refresh", "--cache-dir=MY_CACHE", "--cache-ttl=stream=60", "--cache-ttl=video=120", "--cache-size=2"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertTrue(settings.use_cache)
+        self.assertTrue(settings.refresh_cache)
+        self.assertEqual(settings.cache_directory, "MY_CACHE")
+        self.assertDictEqual(settings.cache_ttls, {"stream": 60, "video": 120})
+        self.assertEqual(settings.cache_size, 2 * 1024 * 1024)
+
+    def test_parse_with_no_cache_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--no-cache"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertFalse(settings.use_cache)
+
+    def test_parse_with_unknown_cache_ttl_kind_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--cache-ttl=thumbnail=60"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_rebuild_archive_mode_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--rebuild-archive", "-o MY_OUTPUT_DIRECTORY"])
+
+        arguments_valid, mode_info, output_directory, _, _ = argument_parser.parse()
+        mode, mode_value = mode_info
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(mode, "rebuild-archive")
+        self.assertEqual(mode_value, None)
+        self.assertEqual(output_directory, "MY_OUTPUT_DIRECTORY")
+
+    def test_parse_with_archive_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--archive=MY_ARCHIVE", "--no-archive"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.archive_file, "MY_ARCHIVE")
+        self.assertFalse(settings.use_archive)
+
+    def test_parse_with_ffmpeg_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--nice=10", "--ffmpeg-threads=2"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.nice, 10)
+        self.assertEqual(settings.ffmpeg_threads, 2)
+
+    def test_parse_with_out_of_range_nice_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--nice=20"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_segment_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--segments=4", "--segment-min-size=1"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.segments, 4)
+        self.assertEqual(settings.segment_min_size, 1024 * 1024)
+
+    def test_parse_with_limit_rate_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--limit-rate=2M", "--limit-rate-per-transfer=500K", "--limit-rate-file=rate.txt"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.limit_rate, 2 * 1024 * 1024)
+        self.assertEqual(settings.limit_rate_per_transfer, 500 * 1024)
+        self.assertEqual(settings.limit_rate_file, "rate.txt")
+
+    def test_parse_with_invalid_limit_rate_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--limit-rate=fast"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_adaptive_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--adaptive", "--max-jobs=12"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertTrue(settings.adaptive)
+        self.assertEqual(settings.max_jobs, 12)
+
+    def test_parse_with_retries_option_sets_correctly(self):
+        for value, retries in (("5", 5), ("0", 0)):
+            argument_parser = self.make_argument_parser(["yget.py", "--retries=" + value])
+
+            arguments_valid, _, _, _, settings = argument_parser.parse()
+
+            self.assertTrue(arguments_valid)
+            self.assertEqual(settings.retries, retries)
+
+    def test_parse_with_invalid_retries_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--retries=-1"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_journal_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--resume", "--journal=MY_JOURNAL"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertTrue(settings.resume)
+        self.assertEqual(settings.journal_file, "MY_JOURNAL")
+        self.assertTrue(settings.use_journal)
+
+    def test_parse_with_no_journal_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--no-journal"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertFalse(settings.use_journal)
+
+    def test_parse_with_metrics_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--metrics-file=yget.prom", "--metrics-summary=summary.json", "--metrics-interval=5"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.metrics_file, "yget.prom")
+        self.assertEqual(settings.metrics_summary_file, "summary.json")
+        self.assertEqual(settings.metrics_interval, 5)
+
+    def test_parse_with_profile_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--profile=yget.prof"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.profile_file, "yget.prof")
+
+    def test_parse_with_trace_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--trace=trace.json"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.trace_file, "trace.json")
+
+    def test_parse_with_invalid_metrics_interval_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--metrics-interval=0"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_schedule_option_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--schedule=shortest"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertEqual(settings.schedule, "shortest")
+
+    def test_parse_with_invalid_schedule_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--schedule=random"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
+
+    def test_parse_with_fair_options_sets_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--no-fair", "--source-weight=urgent.txt=4", "--source-weight=Music=2"])
+
+        arguments_valid, _, _, _, settings = argument_parser.parse()
+
+        self.assertTrue(arguments_valid)
+        self.assertFalse(settings.fair)
+        self.assertDictEqual(settings.source_weights, {"urgent.txt": 4, "Music": 2})
+
+    def test_parse_with_invalid_source_weight_option_parses_correctly(self):
+        argument_parser = self.make_argument_parser(["yget.py", "--source-weight=urgent.txt"])
+
+        arguments_valid, _, _, _, _ = argument_parser.parse()
+
+        self.assertFalse(arguments_valid)
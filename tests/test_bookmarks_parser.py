@@ -409,11 +409,11 @@ class TestBookmarksParser(unittest.TestCase):
         valid, urls = make_bookmarks_parser.parse(self.multiple_level_bookmarks_file_data_with_valid_urls)
 
         expected_urls = [
-            "https://youtube.com/watch?v=00000000000",
-            "https://youtube.com/watch?v=11111111111",
-            "https://youtube.com/watch?v=22222222222",
-            "https://youtube.com/watch?list=0000000000000000000000000000000000&amp;v=44444444444",
-            "https://youtube.com/watch?v=33333333333&amp;list=0000000000000000000000000000000000"
+            "https://www.youtube.com/watch?v=00000000000",
+            "https://www.youtube.com/watch?v=11111111111",
+            "https://www.youtube.com/watch?v=22222222222",
+            "https://www.youtube.com/playlist?list=0000000000000000000000000000000000",
+            "https://www.youtube.com/playlist?list=0000000000000000000000000000000000"
         ]
 
         expected_line_list = [
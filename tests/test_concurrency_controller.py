@@ -0,0 +1,63 @@
+import unittest
+
+from yget.concurrency_controller import ConcurrencyController
+
+class TestConcurrencyController(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.messages = []
+
+    def make_controller(self, initial=2, maximum=4):
+        return ConcurrencyController("download", initial, maximum, clock=lambda: self.now, log=self.messages.append)
+
+    def test_init_clamps_initial_limit(self):
+        self.assertEqual(self.make_controller(initial=10, maximum=4).limit, 4)
+        self.assertEqual(self.make_controller(initial=0, maximum=4).limit, 1)
+
+    def test_record_success_increases_after_limit_successes(self):
+        controller = self.make_controller()
+
+        controller.record_success()
+        self.assertEqual(controller.limit, 2)
+
+        controller.record_success()
+        self.assertEqual(controller.limit, 3)
+        self.assertListEqual(self.messages, ["[download] concurrency 2 -> 3: 2 successes in a row"])
+
+    def test_record_success_stops_at_maximum(self):
+        controller = self.make_controller()
+
+        for _ in range(20):
+            controller.record_success()
+
+        self.assertEqual(controller.limit, 4)
+
+    def test_record_throttled_halves_limit_once_per_cooldown(self):
+        controller = self.make_controller(initial=4)
+
+        controller.record_throttled("HTTP Error 429: Too Many Requests")
+        controller.record_throttled("HTTP Error 429: Too Many Requests")
+
+        self.assertEqual(controller.limit, 2)
+        self.assertEqual(len(self.messages), 2)
+
+        self.now += ConcurrencyController.cooldown
+        controller.record_throttled("HTTP Error 429: Too Many Requests")
+
+        self.assertEqual(controller.limit, 1)
+
+    def test_record_success_with_falling_throughput_decreases_limit(self):
+        controller = self.make_controller(initial=4)
+
+        controller.record_success(1000)
+
+        for _ in range(5):
+            controller.record_success(100)
+
+        self.assertEqual(controller.limit, 3)
+        self.assertIn("per-transfer throughput fell", self.messages[0])
+
+    def test_is_throttled_matches_rate_limit_errors(self):
+        self.assertTrue(ConcurrencyController.is_throttled(Exception("ERROR: unable to download video data: HTTP Error 429: Too Many Requests")))
+        self.assertTrue(ConcurrencyController.is_throttled(Exception("HTTP Error 403: Forbidden")))
+        self.assertFalse(ConcurrencyController.is_throttled(Exception("Video unavailable")))
@@ -0,0 +1,66 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from yget.directory_snapshot import DirectorySnapshot
+
+class TestDirectorySnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def touch(self, name):
+        with open(os.path.join(self.directory, name), "w"):
+            pass
+
+    def make_root(self, name):
+        return os.path.join(self.directory, name)
+
+    def test_get_extensions_with_missing_root_returns_empty(self):
+        directory_snapshot = DirectorySnapshot(self.directory)
+
+        self.assertSetEqual(directory_snapshot.get_extensions(self.make_root("Title (ID)")), set())
+
+    def test_get_extensions_matches_every_extension_of_root(self):
+        self.touch("Title (ID).mp4")
+        self.touch("Title (ID).f137.mp4.part")
+        self.touch("Title (ID) 2.mp4")
+
+        directory_snapshot = DirectorySnapshot(self.directory)
+
+        self.assertSetEqual(directory_snapshot.get_extensions(self.make_root("Title (ID)")), {".mp4", ".part"})
+
+    def test_get_extensions_with_dots_in_title_matches_glob(self):
+        self.touch("Mr. Title (ID).mp3")
+
+        directory_snapshot = DirectorySnapshot(self.directory)
+
+        self.assertSetEqual(directory_snapshot.get_extensions(self.make_root("Mr. Title (ID)")), {".mp3"})
+        self.assertSetEqual(directory_snapshot.get_extensions(self.make_root("Mr")), {".mp3"})
+
+    def test_add_and_remove_update_extensions(self):
+        self.touch("Title (ID).mp4.part")
+
+        directory_snapshot = DirectorySnapshot(self.directory)
+        directory_snapshot.remove(self.make_root("Title (ID).mp4.part"))
+        directory_snapshot.add(self.make_root("Title (ID).mp4"))
+
+        self.assertSetEqual(directory_snapshot.get_extensions(self.make_root("Title (ID)")), {".mp4"})
+
+    def test_remove_keeps_extensions_of_other_files(self):
+        self.touch("Title (ID).mp4")
+        self.touch("Title (ID).f1.mp4")
+
+        directory_snapshot = DirectorySnapshot(self.directory)
+        directory_snapshot.remove(self.make_root("Title (ID).mp4"))
+
+        self.assertSetEqual(directory_snapshot.get_extensions(self.make_root("Title (ID)")), {".mp4"})
+
+    def test_covers_only_files_directly_in_directory(self):
+        directory_snapshot = DirectorySnapshot(self.directory)
+
+        self.assertTrue(directory_snapshot.covers(self.make_root("Title (ID).mp4")))
+        self.assertFalse(directory_snapshot.covers(os.path.join(self.directory, "sub", "Title (ID).mp4")))
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from yget.download_archive import DownloadArchive
+
+class TestDownloadArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, DownloadArchive.file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def touch(self, name):
+        with open(os.path.join(self.directory, name), "w"):
+            pass
+
+    def test_contains_with_missing_file_returns_false(self):
+        download_archive = DownloadArchive(self.path)
+
+        self.assertFalse(download_archive.contains("rdwz7QiG0lk"))
+
+    def test_add_persists_between_instances(self):
+        DownloadArchive(self.path).add("rdwz7QiG0lk")
+
+        download_archive = DownloadArchive(self.path)
+
+        self.assertTrue(download_archive.contains("rdwz7QiG0lk"))
+        self.assertFalse(download_archive.contains("rdwz7QiG0lk", "vimeo"))
+
+    def test_add_writes_youtube_dl_archive_format(self):
+        download_archive = DownloadArchive(self.path)
+
+        download_archive.add("rdwz7QiG0lk")
+        download_archive.add("rdwz7QiG0lk")
+        download_archive.add("12345", "Vimeo")
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "youtube rdwz7QiG0lk\nvimeo 12345\n")
+
+    def test_rebuild_records_completed_library_files(self):
+        self.touch("A title (rdwz7QiG0lk).mp4")
+        self.touch("Another (title) (kavB05H3g90).m4a")
+        self.touch("Partial (aaaaaaaaaaa).mp4.part")
+        self.touch("Partial (bbbbbbbbbbb).part")
+        self.touch("notes.txt")
+
+        download_archive = DownloadArchive(self.path)
+        count = download_archive.rebuild(self.directory)
+
+        self.assertEqual(count, 2)
+        self.assertTrue(DownloadArchive(self.path).contains("rdwz7QiG0lk"))
+        self.assertTrue(DownloadArchive(self.path).contains("kavB05H3g90"))
+        self.assertFalse(DownloadArchive(self.path).contains("bbbbbbbbbbb"))
@@ -0,0 +1,99 @@
+import unittest
+
+from yget.download_scheduler import DownloadScheduler
+from yget.pipeline import PipelineStage
+
+class TestDownloadScheduler(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+
+    def make_scheduler(self, policy):
+        return DownloadScheduler(policy, lambda item: item[1], clock=lambda: self.now)
+
+    def drain(self, scheduler):
+        items = []
+
+        while not scheduler.empty():
+            items.append(scheduler.get_nowait())
+
+        return items
+
+    def put_all(self, scheduler, items):
+        for item in items:
+            scheduler.put(item)
+
+    def test_construction_with_unknown_policy_throws(self):
+        with self.assertRaises(ValueError):
+            self.make_scheduler("random")
+
+    def test_input_policy_keeps_order(self):
+        scheduler = self.make_scheduler(DownloadScheduler.policy_input)
+        self.put_all(scheduler, [("A", 300), ("B", 10), ("C", 60)])
+
+        self.assertListEqual([name for name, _ in self.drain(scheduler)], ["A", "B", "C"])
+
+    def test_shortest_policy_orders_by_size_with_unknown_last(self):
+        scheduler = self.make_scheduler(DownloadScheduler.policy_shortest)
+        self.put_all(scheduler, [("A", 300), ("B", None), ("C", 10), ("D", 60), ("E", 10)])
+
+        self.assertListEqual([name for name, _ in self.drain(scheduler)], ["C", "E", "D", "A", "B"])
+
+    def test_largest_policy_orders_by_size(self):
+        scheduler = self.make_scheduler(DownloadScheduler.policy_largest)
+        self.put_all(scheduler, [("A", 300), ("B", 10), ("C", 600)])
+
+        self.assertListEqual([name for name, _ in self.drain(scheduler)], ["C", "A", "B"])
+
+    def test_stop_items_come_after_every_item(self):
+        scheduler = self.make_scheduler(DownloadScheduler.policy_shortest)
+        scheduler.put(PipelineStage.stop_item)
+        self.put_all(scheduler, [("A", 300), ("B", None)])
+
+        self.assertListEqual(self.drain(scheduler), [("A", 300), ("B", None), PipelineStage.stop_item])
+
+    def test_mixed_policy_takes_starved_item_first(self):
+        scheduler = self.make_scheduler(DownloadScheduler.policy_mixed)
+        scheduler.put(("LONG", 10800))
+
+        self.now += DownloadScheduler.starvation_seconds
+        self.put_all(scheduler, [("A", 10), ("B", 20)])
+
+        self.assertEqual(scheduler.get_nowait(), ("LONG", 10800))
+        self.assertListEqual([name for name, _ in self.drain(scheduler)], ["A", "B"])
+
+    def test_mixed_policy_prefers_short_items_before_starvation(self):
+        scheduler = self.make_scheduler(DownloadScheduler.policy_mixed)
+        self.put_all(scheduler, [("LONG", 10800), ("A", 10), ("B", 20)])
+
+        self.assertListEqual([name for name, _ in self.drain(scheduler)], ["A", "B", "LONG"])
+        self.assertEqual(scheduler.qsize(), 0)
+
+    def make_fair_scheduler(self, weights=None, policy=DownloadScheduler.policy_input):
+        return DownloadScheduler(policy, lambda item: item[2], get_source=lambda item: item[:2], weights=weights, clock=lambda: self.now)
+
+    def test_fair_scheduler_takes_turns_between_urls_of_a_source(self):
+        scheduler = self.make_fair_scheduler()
+        self.put_all(scheduler, [("FILE", "PLAYLIST", i) for i in range(4)] + [("FILE", "URL1", 0), ("FILE", "URL2", 0)])
+
+        self.assertListEqual([job for _, job, _ in self.drain(scheduler)], ["PLAYLIST", "URL1", "URL2", "PLAYLIST", "PLAYLIST", "PLAYLIST"])
+
+    def test_fair_scheduler_orders_urls_of_a_source_by_policy(self):
+        scheduler = self.make_fair_scheduler(policy=DownloadScheduler.policy_shortest)
+        self.put_all(scheduler, [("FILE", "LONG", 10800), ("FILE", "A", 20), ("FILE", "B", 10), ("FILE", "C", 30)])
+
+        self.assertListEqual([job for _, job, _ in self.drain(scheduler)], ["B", "A", "C", "LONG"])
+
+    def test_fair_scheduler_takes_turns_between_sources_ordered_by_policy(self):
+        scheduler = self.make_fair_scheduler(policy=DownloadScheduler.policy_shortest)
+        self.put_all(scheduler, [("FILE1", "LONG", 10800), ("FILE1", "A", 20), ("FILE2", "B", 30), ("FILE2", "C", 10)])
+
+        self.assertListEqual([job for _, job, _ in self.drain(scheduler)], ["A", "C", "LONG", "B"])
+
+    def test_fair_scheduler_weights_sources(self):
+        scheduler = self.make_fair_scheduler({"URGENT": 2})
+        self.put_all(scheduler, [("BATCH", "PLAYLIST", i) for i in range(6)] + [("URGENT", "URL{}".format(i), 0) for i in range(4)])
+
+        sources = [source for source, _, _ in self.drain(scheduler)]
+
+        self.assertListEqual(sources[:6], ["URGENT", "BATCH", "URGENT", "URGENT", "BATCH", "URGENT"])
+        self.assertListEqual(sources[6:], ["BATCH"] * 4)
@@ -0,0 +1,40 @@
+import unittest
+
+from yget.download_session import DownloadSession
+
+class TestDownloadSession(unittest.TestCase):
+    def make_download_options(self, **options):
+        download_options = {
+            "quiet": True,
+            "postprocessors": [{"key": "FFmpegMetadata"}]
+        }
+        download_options.update(options)
+
+        return download_options
+
+    def test_apply_options_keeps_youtube_downloader(self):
+        with DownloadSession(self.make_download_options()) as session:
+            youtube_downloader = session.youtube_downloader
+
+            session.apply_options(self.make_download_options(postprocessor_args=["-metadata", "album=ALBUM"]))
+
+            self.assertIs(session.youtube_downloader, youtube_downloader)
+            self.assertListEqual(youtube_downloader.params["postprocessor_args"], ["-metadata", "album=ALBUM"])
+
+    def test_apply_options_with_new_postprocessors_replaces_postprocessors(self):
+        with DownloadSession(self.make_download_options()) as session:
+            session.apply_options(self.make_download_options(postprocessors=[{"key": "FFmpegExtractAudio", "preferredcodec": "mp3"}]))
+
+            postprocessors = session.youtube_downloader._pps
+
+            self.assertEqual(len(postprocessors), 1)
+            self.assertEqual(type(postprocessors[0]).__name__, "FFmpegExtractAudioPP")
+
+    def test_apply_options_with_new_credentials_replaces_youtube_downloader(self):
+        with DownloadSession(self.make_download_options()) as session:
+            youtube_downloader = session.youtube_downloader
+
+            session.apply_options(self.make_download_options(username="USERNAME", password="PASSWORD"))
+
+            self.assertIsNot(session.youtube_downloader, youtube_downloader)
+            self.assertEqual(session.youtube_downloader.params["username"], "USERNAME")
@@ -0,0 +1,460 @@
+import contextlib
+import io
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import youtube_dl
+
+from youtube_dl.extractor.common import InfoExtractor
+
+from yget.download_settings import DownloadSettings
+from yget.downloader import Downloader, DownloaderOptionsBuilder, DownloadCounters, DownloadJob, DownloadItem
+from yget.job_journal import JobJournal
+from yget.metrics import Metrics
+from yget.pipeline import RetryLater
+
+class FakePlaylistDownloader(object):
+    def __init__(self, emitted, failing_index=None):
+        self.emitted = emitted
+        self.failing_index = failing_index
+        self.extracted_urls = []
+
+    def extract_info(self, url, download=True, ie_key=None, process=True):
+        self.extracted_urls.append((url, process))
+
+        def entries():
+            for i in range(3):
+                # Each page is only requested once the previous entries have been queued
+                if len(self.emitted) != i:
+                    raise AssertionError("entries were not streamed")
+
+                if i == self.failing_index:
+                    raise youtube_dl.utils.DownloadError("ERROR: Video unavailable")
+
+                yield {"_type": "url", "ie_key": "Youtube", "id": "ID{}".format(i), "url": "ID{}".format(i), "title": "TITLE"}
+
+        return {"_type": "playlist", "id": "PLAYLIST_ID", "title": "PLAYLIST", "entries": entries()}
+
+class FakeJobJournal(object):
+    def __init__(self):
+        self.added_entries = []
+
+    def add_entries(self, url, album, infos):
+        self.added_entries.append((url, album, infos))
+
+class FakeProgressRenderer(object):
+    def __init__(self):
+        self.suspended = False
+
+    @contextlib.contextmanager
+    def suspend(self):
+        self.suspended = True
+
+        try:
+            yield
+        finally:
+            self.suspended = False
+
+class FakeAuthenticationProvider(object):
+    def __init__(self, progress_renderer, accept=True):
+        self.progress_renderer = progress_renderer
+        self.accept = accept
+        self.prompted_while_suspended = None
+
+    def request_authentication_parameters(self, authentication_params):
+        self.prompted_while_suspended = self.progress_renderer.suspended
+
+        if not self.accept:
+            return False
+
+        authentication_params.update({"username": "USERNAME", "password": "PASSWORD"})
+
+        return True
+
+class FakePostprocessDownloader(object):
+    def __init__(self):
+        self.params = {}
+        self.postprocessed = []
+
+    def post_process(self, filename, info):
+        self.postprocessed.append((filename, info))
+
+class FakeSession(object):
+    def __init__(self, youtube_downloader):
+        self.youtube_downloader = youtube_downloader
+
+    def apply_options(self, download_options):
+        pass
+
+class MediaRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        body = b"\0" * 1024
+
+        with server.lock:
+            server.requested_paths.append(self.path)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class JournalTestIE(InfoExtractor):
+    _VALID_URL = r"yget-test:(?P<kind>video|playlist):(?P<id>[0-9]+)"
+
+    server_url = None
+    unavailable_ids = set()
+
+    def _real_extract(self, url):
+        kind, number = re.match(JournalTestIE._VALID_URL, url).group("kind", "id")
+
+        if kind == "playlist":
+            entries = (self.url_result("yget-test:video:{}".format(i), JournalTestIE.ie_key(), "ID{}".format(i)) for i in range(int(number)))
+
+            return self.playlist_result(entries, "PLAYLIST_ID", "PLAYLIST")
+
+        if "ID" + number in JournalTestIE.unavailable_ids:
+            raise youtube_dl.utils.ExtractorError("Video unavailable", expected=True)
+
+        return {
+            "id": "ID" + number,
+            "title": "TITLE",
+            "formats": [
+                {"format_id": "140", "url": "{}/media/{}.m4a".format(JournalTestIE.server_url, number), "ext": "m4a", "vcodec": "none", "acodec": "mp4a", "protocol": "http"},
+                {"format_id": "18", "url": "{}/media/{}.mp4".format(JournalTestIE.server_url, number), "ext": "mp4", "vcodec": "avc1", "acodec": "mp4a", "protocol": "http"}
+            ]
+        }
+
+class JournalTestDownloader(Downloader):
+    def create_download_options(self):
+        download_options = super(JournalTestDownloader, self).create_download_options()
+
+        # Tagging needs ffmpeg, which the tests do not
+        download_options.download_options["postprocessors"] = []
+
+        return download_options
+
+class TestDownloadVideos(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MediaRequestHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requested_paths = []
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        JournalTestIE.server_url = "http://127.0.0.1:{}".format(self.server.server_address[1])
+        JournalTestIE.unavailable_ids = set()
+
+        add_default_info_extractors = youtube_dl.YoutubeDL.add_default_info_extractors
+
+        def add_test_info_extractor(youtube_downloader):
+            youtube_downloader.add_info_extractor(JournalTestIE())
+            add_default_info_extractors(youtube_downloader)
+
+        patcher = mock.patch.object(youtube_dl.YoutubeDL, "add_default_info_extractors", add_test_info_extractor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def download_videos(self, urls, resume=False, audio_only=False, output_directory=None, cache_directory=None, sources=None):
+        settings = DownloadSettings()
+        settings.use_cache = cache_directory is not None
+        settings.cache_directory = cache_directory
+        settings.resume = resume
+
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            JournalTestDownloader(output_directory or self.directory, False, True, settings, None).download_videos(urls, audio_only, sources=sources)
+
+        return output.getvalue()
+
+    def get_journal_path(self):
+        return JobJournal.get_default_path(self.directory)
+
+    def test_download_videos_removes_journal_after_run_without_failures(self):
+        output = self.download_videos(["yget-test:playlist:3"])
+
+        self.assertIn("Downloaded 3 video(s), skipped 0 video(s), failed 0 video(s)", output)
+        self.assertTrue(all(os.path.exists(os.path.join(self.directory, "TITLE (ID{}).mp4".format(i))) for i in range(3)))
+        self.assertFalse(os.path.exists(self.get_journal_path()))
+
+    def test_download_videos_resumes_failed_videos_from_journal(self):
+        JournalTestIE.unavailable_ids = {"ID1"}
+
+        output = self.download_videos(["yget-test:playlist:3"])
+
+        self.assertIn("Downloaded 2 video(s), skipped 0 video(s), failed 1 video(s)", output)
+        self.assertEqual(JobJournal.load(self.get_journal_path())["yget-test:playlist:3"]["state"], JobJournal.state_extracted)
+
+        JournalTestIE.unavailable_ids = set()
+        self.server.requested_paths = []
+
+        output = self.download_videos(["yget-test:playlist:3"], resume=True)
+
+        self.assertIn("Resuming 1 url(s) from the journal", output)
+        self.assertIn("Downloaded 1 video(s), skipped 2 video(s), failed 0 video(s)", output)
+        self.assertListEqual(self.server.requested_paths, ["/media/1.mp4"])
+        self.assertFalse(os.path.exists(self.get_journal_path()))
+
+    def test_download_videos_counts_items_failed_when_session_cannot_start(self):
+        with mock.patch.object(JournalTestDownloader, "create_postprocess_session", side_effect=OSError("ERROR")):
+            output = self.download_videos(["yget-test:playlist:3"])
+
+        self.assertIn("could not start a postprocess session: ERROR", output)
+        self.assertIn("Downloaded 0 video(s), skipped 0 video(s), failed 3 video(s)", output)
+        self.assertTrue(os.path.exists(self.get_journal_path()))
+
+    def test_download_videos_does_not_reuse_cached_streams_of_other_format(self):
+        cache_directory = os.path.join(self.directory, "cache")
+        audio_directory = os.path.join(self.directory, "audio")
+        os.mkdir(audio_directory)
+
+        self.download_videos(["yget-test:video:0"], cache_directory=cache_directory)
+        self.download_videos(["yget-test:video:0"], audio_only=True, output_directory=audio_directory, cache_directory=cache_directory)
+
+        # Extracting the audio needs ffmpeg, the downloaded stream is what matters here
+        self.assertTrue(os.path.exists(os.path.join(audio_directory, "TITLE (ID0).m4a")))
+        self.assertFalse(os.path.exists(os.path.join(audio_directory, "TITLE (ID0).mp4")))
+        self.assertListEqual(self.server.requested_paths, ["/media/0.mp4", "/media/0.m4a"])
+
+    def test_download_videos_lists_other_sources_while_playlist_is_listed(self):
+        self.download_videos(["yget-test:playlist:200", "yget-test:video:1000"], sources=["FILE1", "FILE2"])
+
+        self.assertEqual(len(self.server.requested_paths), 201)
+        self.assertLess(self.server.requested_paths.index("/media/1000.mp4"), DownloadSettings.default_queue_size)
+
+class TestDownloader(unittest.TestCase):
+    def make_downloader(self):
+        return Downloader(".", False, True, DownloadSettings(), None)
+
+    def make_formats(self):
+        return [
+            {"format_id": "140", "ext": "m4a", "vcodec": "none", "acodec": "mp4a", "filesize": 1000, "url": "URL"},
+            {"format_id": "18", "ext": "mp4", "vcodec": "avc1", "acodec": "mp4a", "filesize": 5000, "url": "URL"}
+        ]
+
+    def test_default_options_download_video_format(self):
+        download_options = DownloaderOptionsBuilder()
+
+        self.assertEqual(download_options.make_download_options()["format"], "mp4/bestvideo")
+        self.assertFalse(download_options.audio_only)
+
+    def test_audio_options_download_audio_format(self):
+        for set_audio in (DownloaderOptionsBuilder.set_audio_only, DownloaderOptionsBuilder.set_wav, DownloaderOptionsBuilder.set_mp3):
+            download_options = DownloaderOptionsBuilder()
+            set_audio(download_options)
+
+            self.assertEqual(download_options.make_download_options()["format"], "bestaudio/best")
+            self.assertTrue(download_options.audio_only)
+
+    def test_audio_options_do_not_change_other_builders(self):
+        DownloaderOptionsBuilder().set_mp3()
+
+        self.assertEqual(DownloaderOptionsBuilder().make_download_options()["format"], "mp4/bestvideo")
+
+    def test_ffmpeg_threads_are_added_to_postprocessor_args(self):
+        download_options = DownloaderOptionsBuilder()
+        download_options.set_album("ALBUM")
+        download_options.set_ffmpeg_threads(2)
+
+        self.assertListEqual(download_options.make_download_options()["postprocessor_args"], ["-metadata", "album=ALBUM", "-threads", "2"])
+
+    def test_transfer_options_leave_fixups_to_postprocess_stage(self):
+        self.assertEqual(DownloaderOptionsBuilder().make_transfer_options()["fixup"], "never")
+
+    def test_postprocess_video_does_not_run_transfer_postprocessors_again(self):
+        downloader = self.make_downloader()
+        youtube_downloader = FakePostprocessDownloader()
+        counters = DownloadCounters()
+        item = DownloadItem(DownloadJob("URL", DownloaderOptionsBuilder(), False), {"id": "ID", "__postprocessors": ["MERGER"], "__files_to_merge": ["A", "B"]})
+        item.filename = "FILE"
+
+        downloader.postprocess_video(FakeSession(youtube_downloader), item, counters)
+
+        filename, info = youtube_downloader.postprocessed[0]
+
+        self.assertEqual(filename, "FILE")
+        self.assertListEqual(info["__postprocessors"], [])
+        self.assertNotIn("__files_to_merge", info)
+        self.assertEqual(counters.downloaded, 1)
+
+    def test_get_bytes_saved_compares_against_video_format(self):
+        downloader = self.make_downloader()
+        formats = self.make_formats()
+
+        info = dict(formats[0])
+        info["formats"] = formats
+
+        with youtube_dl.YoutubeDL({"quiet": True}) as youtube_downloader:
+            self.assertEqual(downloader.get_bytes_saved(youtube_downloader, info), 4000)
+
+    def test_get_bytes_saved_without_sizes_returns_zero(self):
+        downloader = self.make_downloader()
+        formats = self.make_formats()
+
+        for f in formats:
+            del f["filesize"]
+
+        info = dict(formats[0])
+        info["formats"] = formats
+
+        with youtube_dl.YoutubeDL({"quiet": True}) as youtube_downloader:
+            self.assertEqual(downloader.get_bytes_saved(youtube_downloader, info), 0)
+
+    def test_limit_rate_charges_bytes_since_previous_report(self):
+        downloader = self.make_downloader()
+        consumed = []
+        downloader.rate_limiter.consume = consumed.append
+
+        downloader.limit_rate({"status": "downloading", "filename": "a", "downloaded_bytes": 5000})
+        downloader.limit_rate({"status": "downloading", "filename": "a", "downloaded_bytes": 6000})
+        downloader.limit_rate({"status": "downloading", "filename": "b", "downloaded_bytes": 100})
+        downloader.limit_rate({"status": "downloading", "filename": "a", "downloaded_bytes": 6500})
+        downloader.limit_rate({"status": "finished", "filename": "a", "downloaded_bytes": 6500})
+
+        self.assertListEqual(consumed, [1000, 500])
+        self.assertDictEqual(downloader.transfer_bytes, {"b": 100})
+
+    def test_report_failure_retries_transient_errors_until_attempts_run_out(self):
+        downloader = self.make_downloader()
+        job = DownloadJob("URL", None, False)
+        error = youtube_dl.utils.DownloadError("ERROR: HTTP Error 503: Service Unavailable")
+
+        for _ in range(downloader.retry_scheduler.max_attempts - 1):
+            with self.assertRaises(RetryLater):
+                downloader.report_failure("URL", None, job, error)
+
+        downloader.report_failure("URL", None, job, error)
+
+        self.assertEqual(job.attempts, downloader.retry_scheduler.max_attempts)
+
+    def test_report_failure_does_not_retry_unavailable_videos(self):
+        downloader = self.make_downloader()
+        job = DownloadJob("URL", None, False)
+
+        downloader.report_failure("URL", None, job, youtube_dl.utils.DownloadError("ERROR: Video unavailable"))
+
+        self.assertEqual(job.attempts, 1)
+
+    def test_report_failure_counts_retries_and_errors_by_stage(self):
+        downloader = self.make_downloader()
+        downloader.metrics = Metrics()
+        downloader.metrics.add_counter("yget_retries_total", "")
+        downloader.metrics.add_counter("yget_errors_total", "")
+        item = DownloadItem(DownloadJob("URL", None, False), {"id": "ID"})
+
+        with self.assertRaises(RetryLater):
+            downloader.report_failure("URL", "ID", item, youtube_dl.utils.DownloadError("ERROR: HTTP Error 503: Service Unavailable"))
+
+        downloader.report_failure("URL", "ID", item, youtube_dl.utils.DownloadError("ERROR: Video unavailable"))
+
+        samples = downloader.metrics.get_samples()
+
+        self.assertEqual(samples[("yget_retries_total", (("class", "transient"), ("stage", "download")))], 1)
+        self.assertEqual(samples[("yget_errors_total", (("class", "unavailable"), ("stage", "download")))], 1)
+
+    def test_get_download_queue_size_keeps_a_bound_when_fair(self):
+        downloader = self.make_downloader()
+
+        self.assertEqual(downloader.get_download_queue_size(), DownloadSettings.default_queue_size * Downloader.scheduling_window)
+
+        downloader.settings.fair = False
+
+        self.assertEqual(downloader.get_download_queue_size(), DownloadSettings.default_queue_size)
+
+    def test_request_authentication_suspends_progress_while_prompting(self):
+        progress_renderer = FakeProgressRenderer()
+        authentication_provider = FakeAuthenticationProvider(progress_renderer)
+        downloader = Downloader(".", False, False, DownloadSettings(), authentication_provider)
+        downloader.progress_renderer = progress_renderer
+        authentication_params = {}
+
+        self.assertTrue(downloader.request_authentication(authentication_params, {}))
+        self.assertTrue(authentication_provider.prompted_while_suspended)
+        self.assertFalse(progress_renderer.suspended)
+        self.assertEqual(authentication_params["username"], "USERNAME")
+
+    def test_declined_sign_in_counts_video_as_failed(self):
+        downloader = Downloader(".", False, True, DownloadSettings(), FakeAuthenticationProvider(FakeProgressRenderer(), accept=False))
+        downloader.metrics = Metrics()
+        downloader.metrics.add_counter("yget_errors_total", "")
+        downloader.resolve_video_info = mock.Mock(side_effect=youtube_dl.utils.DownloadError("ERROR: Please sign in to view this video"))
+        counters = DownloadCounters()
+        item = DownloadItem(DownloadJob("URL", DownloaderOptionsBuilder(), True), {"id": "ID"})
+
+        downloader.download_video(FakeSession(None), item, {}, counters, None)
+
+        self.assertEqual(counters.failed, 1)
+        self.assertEqual(downloader.metrics.get_samples()[("yget_errors_total", (("class", "auth"), ("stage", "download")))], 1)
+
+    def test_extract_videos_streams_flat_playlist_entries(self):
+        downloader = self.make_downloader()
+        emitted = []
+        youtube_downloader = FakePlaylistDownloader(emitted)
+        job = DownloadJob("PLAYLIST_URL", DownloaderOptionsBuilder(), False)
+
+        downloader.extract_videos(FakeSession(youtube_downloader), job, {}, DownloadCounters(), emitted.append)
+
+        self.assertListEqual(youtube_downloader.extracted_urls, [("PLAYLIST_URL", False)])
+        self.assertListEqual([item.info["id"] for item in emitted], ["ID0", "ID1", "ID2"])
+        self.assertListEqual([item.info["playlist_index"] for item in emitted], [1, 2, 3])
+        self.assertEqual(emitted[0].info["playlist"], "PLAYLIST")
+        self.assertEqual(emitted[0].info["extractor_key"], "Youtube")
+
+    def test_extract_videos_records_playlist_entries(self):
+        downloader = self.make_downloader()
+        downloader.job_journal = FakeJobJournal()
+        emitted = []
+        job = DownloadJob("PLAYLIST_URL", DownloaderOptionsBuilder(), False)
+
+        downloader.extract_videos(FakeSession(FakePlaylistDownloader(emitted)), job, {}, DownloadCounters(), emitted.append)
+
+        self.assertEqual(len(downloader.job_journal.added_entries), 1)
+        self.assertListEqual([entry["id"] for entry in downloader.job_journal.added_entries[0][2]], ["ID0", "ID1", "ID2"])
+
+    def test_extract_videos_counts_playlist_failing_part_way_as_failed(self):
+        downloader = self.make_downloader()
+        downloader.job_journal = FakeJobJournal()
+        counters = DownloadCounters()
+        emitted = []
+        job = DownloadJob("PLAYLIST_URL", DownloaderOptionsBuilder(), False)
+
+        downloader.extract_videos(FakeSession(FakePlaylistDownloader(emitted, 2)), job, {}, counters, emitted.append)
+
+        self.assertListEqual([item.info["id"] for item in emitted], ["ID0", "ID1"])
+        self.assertEqual(counters.failed, 1)
+        self.assertListEqual(downloader.job_journal.added_entries, [])
+
+    def test_emit_video_keeps_first_occurrence_across_jobs(self):
+        downloader = self.make_downloader()
+        counters = DownloadCounters()
+        emitted = []
+        first_job = DownloadJob("PLAYLIST_URL1", DownloaderOptionsBuilder(), False)
+        second_job = DownloadJob("PLAYLIST_URL2", DownloaderOptionsBuilder(), False)
+
+        downloader.emit_video(first_job, {"id": "ID1"}, counters, emitted.append)
+        downloader.emit_video(second_job, {"id": "ID1"}, counters, emitted.append)
+        downloader.emit_video(second_job, {"id": "ID2"}, counters, emitted.append)
+        downloader.emit_video(second_job, {"id": "ID2"}, counters, emitted.append)
+
+        self.assertListEqual([(item.job, item.info["id"]) for item in emitted], [(first_job, "ID1"), (second_job, "ID2")])
+        self.assertEqual(counters.duplicates, 1)
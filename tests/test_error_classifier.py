@@ -0,0 +1,34 @@
+import socket
+import sys
+import unittest
+import urllib.error
+
+import youtube_dl
+
+from yget.error_classifier import ErrorClassifier
+
+class TestErrorClassifier(unittest.TestCase):
+    def test_classify_http_errors_by_status(self):
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: unable to download video data: HTTP Error 429: Too Many Requests")), ErrorClassifier.transient)
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: unable to download video data: HTTP Error 503: Service Unavailable")), ErrorClassifier.transient)
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: unable to download video data: HTTP Error 404: Not Found")), ErrorClassifier.unavailable)
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: HTTP Error 401: Unauthorized")), ErrorClassifier.auth)
+
+    def test_classify_youtube_messages(self):
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: Please sign in to view this video")), ErrorClassifier.auth)
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: Video unavailable")), ErrorClassifier.unavailable)
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: This video is private")), ErrorClassifier.unavailable)
+
+    def test_classify_wrapped_network_error_as_transient(self):
+        try:
+            raise socket.timeout("read timed out")
+        except socket.timeout:
+            error = youtube_dl.utils.DownloadError("ERROR: something went wrong", sys.exc_info())
+
+        self.assertEqual(ErrorClassifier.classify(error), ErrorClassifier.transient)
+        self.assertEqual(ErrorClassifier.classify(urllib.error.URLError("no route")), ErrorClassifier.transient)
+        self.assertEqual(ErrorClassifier.classify(ConnectionResetError(104, "reset")), ErrorClassifier.transient)
+
+    def test_classify_unknown_error_as_fatal(self):
+        self.assertEqual(ErrorClassifier.classify(KeyError("url")), ErrorClassifier.fatal)
+        self.assertEqual(ErrorClassifier.classify(Exception("ERROR: Unsupported URL")), ErrorClassifier.fatal)
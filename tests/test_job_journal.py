@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from yget.job_journal import JobJournal
+
+class TestJobJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = JobJournal.get_default_path(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load_missing_journal_returns_no_jobs(self):
+        self.assertDictEqual(JobJournal.load(self.path), {})
+
+    def test_load_replays_job_and_item_states(self):
+        job_journal = JobJournal(self.path)
+        job_journal.add_job("URL1")
+        job_journal.add_job("URL2")
+        job_journal.add_entries("URL1", "ALBUM", [{"id": "ID1", "title": "TITLE1", "ext": "mp4", "formats": []}, {"id": "ID2", "title": "TITLE2", "ext": "mp4"}])
+        job_journal.set_state("URL1", "ID1", JobJournal.state_downloaded, "FILE1")
+        job_journal.set_state("URL1", "ID1", JobJournal.state_postprocessed)
+        job_journal.set_state("URL1", "ID2", JobJournal.state_downloaded, "FILE2")
+        job_journal.close()
+
+        jobs = JobJournal.load(self.path)
+
+        self.assertEqual(jobs["URL1"]["state"], JobJournal.state_extracted)
+        self.assertEqual(jobs["URL1"]["album"], "ALBUM")
+        self.assertListEqual(jobs["URL1"]["entries"], [{"id": "ID1", "title": "TITLE1", "ext": "mp4"}, {"id": "ID2", "title": "TITLE2", "ext": "mp4"}])
+        self.assertDictEqual(jobs["URL1"]["items"], {
+            "ID1": {"state": JobJournal.state_postprocessed, "filename": "FILE1"},
+            "ID2": {"state": JobJournal.state_downloaded, "filename": "FILE2"}
+        })
+        self.assertEqual(jobs["URL2"]["state"], JobJournal.state_pending)
+
+    def test_make_entry_keeps_url_of_flat_entries_only(self):
+        self.assertDictEqual(JobJournal.make_entry({"_type": "url", "ie_key": "IE", "id": "ID1", "url": "URL1"}), {"ie_key": "IE", "id": "ID1", "url": "URL1"})
+        self.assertDictEqual(JobJournal.make_entry({"id": "ID2", "url": "STREAM_URL", "extractor_key": "IE"}), {"id": "ID2", "extractor_key": "IE"})
+
+    def test_load_ignores_truncated_last_record(self):
+        job_journal = JobJournal(self.path)
+        job_journal.add_job("URL1")
+        job_journal.close()
+
+        with open(self.path, "a") as f:
+            f.write('{"url": "URL2", "sta')
+
+        self.assertListEqual(list(JobJournal.load(self.path)), ["URL1"])
+
+    def test_resume_appends_to_existing_journal(self):
+        job_journal = JobJournal(self.path)
+        job_journal.add_job("URL1")
+        job_journal.close()
+
+        job_journal = JobJournal(self.path, resume=True)
+        job_journal.add_job("URL2")
+        job_journal.close()
+
+        self.assertListEqual(sorted(JobJournal.load(self.path)), ["URL1", "URL2"])
+
+    def test_write_syncs_in_batches(self):
+        job_journal = JobJournal(self.path, clock=lambda: 0.0)
+
+        for i in range(JobJournal.batch_size - 1):
+            job_journal.add_job("URL{}".format(i))
+
+        self.assertEqual(job_journal.unsynced, JobJournal.batch_size - 1)
+
+        job_journal.add_job("URL")
+
+        self.assertEqual(job_journal.unsynced, 0)
+
+        job_journal.remove()
+        job_journal.close()
+
+        self.assertFalse(os.path.exists(self.path))
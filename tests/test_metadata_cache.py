@@ -0,0 +1,151 @@
+import shutil
+import tempfile
+import time
+import unittest
+
+from yget.metadata_cache import MetadataCache
+
+class TestMetadataCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_metadata_cache(self, ttls=None, max_size=None, refresh=False):
+        return MetadataCache(self.directory, ttls, max_size, refresh)
+
+    def make_video_info(self, video_id):
+        return {
+            "id": video_id,
+            "title": "TITLE",
+            "ext": "mp4",
+            "url": "https://host/videoplayback?expire=4000000000",
+            "formats": [{"format_id": "18"}]
+        }
+
+    def test_get_with_missing_key_returns_none(self):
+        metadata_cache = self.make_metadata_cache()
+
+        self.assertIsNone(metadata_cache.get(MetadataCache.kind_video, "ID"))
+
+    def test_get_within_ttl_returns_value(self):
+        metadata_cache = self.make_metadata_cache(ttls={MetadataCache.kind_video: 10})
+
+        metadata_cache.set(MetadataCache.kind_video, "ID", {"title": "TITLE"}, now=100)
+
+        self.assertDictEqual(metadata_cache.get(MetadataCache.kind_video, "ID", now=109), {"title": "TITLE"})
+
+    def test_get_after_ttl_returns_none(self):
+        metadata_cache = self.make_metadata_cache(ttls={MetadataCache.kind_video: 10})
+
+        metadata_cache.set(MetadataCache.kind_video, "ID", {"title": "TITLE"}, now=100)
+
+        self.assertIsNone(metadata_cache.get(MetadataCache.kind_video, "ID", now=110))
+
+    def test_get_with_refresh_returns_none(self):
+        self.make_metadata_cache().set(MetadataCache.kind_video, "ID", {"title": "TITLE"})
+
+        metadata_cache = self.make_metadata_cache(refresh=True)
+
+        self.assertIsNone(metadata_cache.get(MetadataCache.kind_video, "ID"))
+
+    def test_set_over_max_size_evicts_least_recently_used(self):
+        metadata_cache = self.make_metadata_cache(max_size=100)
+
+        metadata_cache.set(MetadataCache.kind_video, "ID_1", {"title": "A" * 30}, now=100)
+        metadata_cache.set(MetadataCache.kind_video, "ID_2", {"title": "B" * 30}, now=101)
+        metadata_cache.get(MetadataCache.kind_video, "ID_1", now=102)
+        metadata_cache.set(MetadataCache.kind_video, "ID_3", {"title": "C" * 30}, now=103)
+
+        self.assertIsNotNone(metadata_cache.get(MetadataCache.kind_video, "ID_1", now=104))
+        self.assertIsNone(metadata_cache.get(MetadataCache.kind_video, "ID_2", now=104))
+        self.assertIsNotNone(metadata_cache.get(MetadataCache.kind_video, "ID_3", now=104))
+
+    def test_get_keeps_access_times_until_close(self):
+        metadata_cache = self.make_metadata_cache()
+
+        now = time.time()
+
+        metadata_cache.set(MetadataCache.kind_video, "ID", {"title": "TITLE"}, now=now)
+        metadata_cache.get(MetadataCache.kind_video, "ID", now=now + 5)
+
+        accessed, = metadata_cache.connection.execute("SELECT accessed FROM entries").fetchone()
+        self.assertEqual(accessed, now)
+
+        metadata_cache.close()
+
+        metadata_cache = self.make_metadata_cache()
+        accessed, = metadata_cache.connection.execute("SELECT accessed FROM entries").fetchone()
+        self.assertEqual(accessed, now + 5)
+
+    def test_set_keeps_running_total_size(self):
+        metadata_cache = self.make_metadata_cache(ttls={MetadataCache.kind_video: 10})
+
+        metadata_cache.set(MetadataCache.kind_video, "ID_1", {"title": "A" * 30}, now=100)
+        metadata_cache.set(MetadataCache.kind_video, "ID_2", {"title": "B" * 30}, now=100)
+        metadata_cache.set(MetadataCache.kind_video, "ID_1", {"title": "A"}, now=105)
+        metadata_cache.get(MetadataCache.kind_video, "ID_2", now=110)
+
+        total_size, = metadata_cache.connection.execute("SELECT SUM(size) FROM entries").fetchone()
+
+        self.assertEqual(metadata_cache.total_size, total_size)
+
+    def test_connection_does_not_sync_every_commit(self):
+        synchronous, = self.make_metadata_cache().connection.execute("PRAGMA synchronous").fetchone()
+
+        self.assertEqual(synchronous, 1)
+
+    def test_set_info_with_playlist_round_trips_trimmed_entries(self):
+        metadata_cache = self.make_metadata_cache()
+
+        metadata_cache.set_info("URL", {"title": "PLAYLIST", "entries": [self.make_video_info("ID_1"), self.make_video_info("ID_2")]}, "FORMAT")
+
+        info = metadata_cache.get_info("URL", "FORMAT")
+
+        self.assertEqual(info["title"], "PLAYLIST")
+        self.assertListEqual([entry["id"] for entry in info["entries"]], ["ID_1", "ID_2"])
+        self.assertNotIn("formats", info["entries"][0])
+        self.assertIn("url", info["entries"][0])
+
+    def test_get_info_with_expired_streams_returns_video_metadata(self):
+        metadata_cache = self.make_metadata_cache(ttls={MetadataCache.kind_stream: 1})
+
+        metadata_cache.set_info("URL", self.make_video_info("ID"))
+        metadata_cache.set(MetadataCache.kind_stream, MetadataCache.make_stream_key("ID", "FORMAT"), self.make_video_info("ID"), now=0)
+
+        info = metadata_cache.get_info("URL", "FORMAT")
+
+        self.assertEqual(info["id"], "ID")
+        self.assertEqual(info["title"], "TITLE")
+        self.assertNotIn("url", info)
+
+    def test_get_video_info_only_returns_streams_selected_by_same_format(self):
+        metadata_cache = self.make_metadata_cache()
+
+        metadata_cache.set_video_info(self.make_video_info("ID"), "mp4/bestvideo")
+
+        self.assertIn("url", metadata_cache.get_video_info("ID", "mp4/bestvideo"))
+        self.assertNotIn("url", metadata_cache.get_video_info("ID", "bestaudio/best"))
+        self.assertNotIn("url", metadata_cache.get_video_info("ID"))
+
+    def test_get_info_with_missing_entry_returns_flat_entry(self):
+        metadata_cache = self.make_metadata_cache()
+
+        metadata_cache.set_listing("URL", True, "PLAYLIST", [
+            self.make_video_info("ID_1"),
+            {"_type": "url", "ie_key": "Youtube", "id": "ID_2", "url": "ID_2", "title": "TITLE", "duration": 60}
+        ])
+        metadata_cache.set_video_info(self.make_video_info("ID_1"), "FORMAT")
+
+        info = metadata_cache.get_info("URL", "FORMAT")
+
+        self.assertEqual(info["entries"][0]["url"], self.make_video_info("ID_1")["url"])
+        self.assertDictEqual(info["entries"][1], {"_type": "url", "ie_key": "Youtube", "id": "ID_2", "url": "ID_2", "title": "TITLE", "duration": 60})
+
+    def test_get_info_with_listing_of_ids_only_returns_none(self):
+        metadata_cache = self.make_metadata_cache()
+
+        metadata_cache.set(MetadataCache.kind_playlist, "URL", {"playlist": True, "title": "PLAYLIST", "ids": ["ID_1"]})
+
+        self.assertIsNone(metadata_cache.get_info("URL"))
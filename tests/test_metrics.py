@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from yget.metrics import Histogram, Metrics
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.now = 0.0
+        self.messages = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_metrics(self, textfile_path=None, summary_path=None):
+        return Metrics(textfile_path, summary_path, clock=lambda: self.now, log=self.messages.append)
+
+    def test_histogram_observe_counts_each_value_once(self):
+        histogram = Histogram([1, 5, 10])
+
+        for value in (0.5, 1, 3, 7, 20):
+            histogram.observe(value)
+
+        self.assertListEqual(histogram.counts, [2, 1, 1])
+        self.assertListEqual(histogram.get_cumulative_counts(), [2, 3, 4])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.sum, 31.5)
+        self.assertEqual(histogram.max, 20)
+
+    def test_increment_adds_per_label_set(self):
+        metrics = self.make_metrics()
+        metrics.add_counter("yget_retries_total", "Retries")
+
+        metrics.increment("yget_retries_total", labels={"stage": "download"})
+        metrics.increment("yget_retries_total", 2, {"stage": "download"})
+        metrics.increment("yget_retries_total", labels={"stage": "extract"})
+
+        samples = metrics.get_samples()
+
+        self.assertEqual(samples[("yget_retries_total", (("stage", "download"),))], 3)
+        self.assertEqual(samples[("yget_retries_total", (("stage", "extract"),))], 1)
+
+    def test_make_prometheus_text_formats_all_kinds(self):
+        metrics = self.make_metrics()
+        metrics.add_counter("yget_transfer_bytes_total", "Bytes downloaded")
+        metrics.add_histogram("yget_transfer_seconds", "Transfer time", [1, 10])
+        metrics.add_sampled("yget_queue_depth", Metrics.gauge, "Queued items", lambda: 4, {"stage": "download"})
+
+        metrics.increment("yget_transfer_bytes_total", 1024)
+        metrics.observe("yget_transfer_seconds", 0.5)
+        metrics.observe("yget_transfer_seconds", 5.0)
+
+        self.assertEqual(metrics.make_prometheus_text(),
+            "# HELP yget_queue_depth Queued items\n"
+            "# TYPE yget_queue_depth gauge\n"
+            "yget_queue_depth{stage=\"download\"} 4\n"
+            "# HELP yget_transfer_bytes_total Bytes downloaded\n"
+            "# TYPE yget_transfer_bytes_total counter\n"
+            "yget_transfer_bytes_total 1024\n"
+            "# HELP yget_transfer_seconds Transfer time\n"
+            "# TYPE yget_transfer_seconds histogram\n"
+            "yget_transfer_seconds_bucket{le=\"1.0\"} 1\n"
+            "yget_transfer_seconds_bucket{le=\"10.0\"} 2\n"
+            "yget_transfer_seconds_bucket{le=\"+Inf\"} 2\n"
+            "yget_transfer_seconds_sum 5.5\n"
+            "yget_transfer_seconds_count 2\n")
+
+    def test_make_summary_groups_by_kind(self):
+        metrics = self.make_metrics()
+        metrics.add_sampled("yget_videos_total", Metrics.counter, "Videos", lambda: 3, {"result": "downloaded"})
+        metrics.add_histogram("yget_postprocess_seconds", "Postprocess time", [1, 10])
+        metrics.observe("yget_postprocess_seconds", 2.0)
+        metrics.observe("yget_postprocess_seconds", 4.0)
+        self.now = 12.0
+
+        summary = metrics.make_summary()
+
+        self.assertEqual(summary["elapsed_seconds"], 12.0)
+        self.assertDictEqual(summary["counters"], {"yget_videos_total{result=\"downloaded\"}": 3})
+        self.assertDictEqual(summary["histograms"]["yget_postprocess_seconds"], {"count": 2, "sum": 6.0, "mean": 3.0, "max": 4.0, "buckets": {"1": 0, "10": 2}})
+
+    def test_stop_writes_textfile_and_summary(self):
+        textfile_path = os.path.join(self.directory, "yget.prom")
+        summary_path = os.path.join(self.directory, "summary.json")
+        metrics = self.make_metrics(textfile_path, summary_path)
+        metrics.add_counter("yget_transfer_bytes_total", "Bytes downloaded")
+        metrics.increment("yget_transfer_bytes_total", 10)
+
+        metrics.start()
+        metrics.stop()
+
+        with open(textfile_path) as f:
+            self.assertIn("yget_transfer_bytes_total 10\n", f.read())
+
+        with open(summary_path) as f:
+            self.assertEqual(json.load(f)["counters"]["yget_transfer_bytes_total"], 10)
+
+        self.assertFalse(os.path.exists(textfile_path + ".tmp"))
+
+    def test_sampled_values_that_fail_are_left_out(self):
+        metrics = self.make_metrics()
+        metrics.add_sampled("yget_queue_depth", Metrics.gauge, "Queued items", lambda: 1 / 0)
+
+        self.assertEqual(metrics.get_samples(), {})
+
+    def test_write_errors_are_reported(self):
+        metrics = self.make_metrics(os.path.join(self.directory, "missing", "yget.prom"))
+
+        metrics.write_textfile()
+
+        self.assertEqual(len(self.messages), 1)
+
+if __name__ == "__main__":
+    unittest.main()
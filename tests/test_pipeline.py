@@ -0,0 +1,181 @@
+import threading
+import time
+import unittest
+
+from yget.concurrency_controller import ConcurrencyController
+from yget.pipeline import Pipeline, PipelineStage, RetryLater
+from yget.stage_profiler import StageProfiler
+from yget.trace_recorder import TraceRecorder
+
+class TestPipeline(unittest.TestCase):
+    def test_construction_with_no_stages_throws(self):
+        with self.assertRaises(ValueError) as wrapped_e:
+            Pipeline([])
+
+        self.assertIn("stages must be non-empty", str(wrapped_e.exception))
+
+    def test_items_flow_through_every_stage(self):
+        lock = threading.Lock()
+        results = []
+
+        def expand(item, emit, session):
+            for i in range(item):
+                emit(i)
+
+        def double(item, emit, session):
+            emit(item * 2)
+
+        def collect(item, emit, session):
+            with lock:
+                results.append(item)
+
+        pipeline = Pipeline([
+            PipelineStage("expand", 2, expand, 1),
+            PipelineStage("double", 3, double, 1),
+            PipelineStage("collect", 1, collect, 1)
+        ])
+
+        pipeline.run([3, 2])
+
+        self.assertListEqual(sorted(results), [0, 0, 2, 2, 4])
+
+    def test_unhandled_stage_error_propagates_after_draining(self):
+        results = []
+
+        def fail_on_one(item, emit, session):
+            if item == 1:
+                raise ValueError("ERROR")
+
+            results.append(item)
+
+        pipeline = Pipeline([PipelineStage("fail", 1, fail_on_one)])
+
+        with self.assertRaises(ValueError):
+            pipeline.run([0, 1, 2])
+
+        self.assertListEqual(results, [0, 2])
+
+    def test_each_worker_reuses_one_session(self):
+        lock = threading.Lock()
+        sessions = []
+        used_sessions = []
+
+        class Session(object):
+            def __enter__(self):
+                with lock:
+                    sessions.append(self)
+
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+        def use_session(item, emit, session):
+            with lock:
+                used_sessions.append(session)
+
+        pipeline = Pipeline([PipelineStage("session", 2, use_session, session_factory=Session)])
+
+        pipeline.run(range(10))
+
+        self.assertEqual(len(sessions), 2)
+        self.assertEqual(len(used_sessions), 10)
+        self.assertTrue(all(session in sessions for session in used_sessions))
+
+    def test_items_left_by_failed_session_go_to_failure_handler(self):
+        failed = []
+
+        def fail_session():
+            raise ValueError("ERROR")
+
+        def record_failure(item, error):
+            failed.append((item, str(error)))
+
+        pipeline = Pipeline([PipelineStage("session", 1, lambda item, emit, session: None, session_factory=fail_session, failure_handler=record_failure)])
+
+        pipeline.run(range(3))
+
+        self.assertListEqual(failed, [(0, "ERROR"), (1, "ERROR"), (2, "ERROR")])
+
+    def test_controller_limits_items_in_flight(self):
+        lock = threading.Lock()
+        in_flight = [0]
+        most_in_flight = [0]
+
+        def track(item, emit, session):
+            with lock:
+                in_flight[0] += 1
+                most_in_flight[0] = max(most_in_flight[0], in_flight[0])
+
+            time.sleep(0.01)
+
+            with lock:
+                in_flight[0] -= 1
+
+        controller = ConcurrencyController("track", 2, 2, log=lambda message: None)
+        pipeline = Pipeline([PipelineStage("track", 6, track, controller=controller)])
+
+        pipeline.run(range(12))
+
+        self.assertEqual(most_in_flight[0], 2)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_retried_items_are_processed_before_stopping(self):
+        lock = threading.Lock()
+        attempts = {}
+        results = []
+
+        def flaky(item, emit, session):
+            with lock:
+                attempts[item] = attempts.get(item, 0) + 1
+
+                if attempts[item] < 3:
+                    raise RetryLater(0.01)
+
+            emit(item)
+
+        def collect(item, emit, session):
+            with lock:
+                results.append(item)
+
+        pipeline = Pipeline([
+            PipelineStage("flaky", 2, flaky, 1),
+            PipelineStage("collect", 1, collect, 1)
+        ])
+
+        pipeline.run(range(4))
+
+        self.assertListEqual(sorted(results), [0, 1, 2, 3])
+        self.assertTrue(all(count == 3 for count in attempts.values()))
+
+    def test_profiler_measures_every_item_of_each_stage(self):
+        profiler = StageProfiler(None)
+
+        pipeline = Pipeline([
+            PipelineStage("expand", 2, lambda item, emit, session: [emit(i) for i in range(item)], 1),
+            PipelineStage("collect", 1, lambda item, emit, session: None, 1)
+        ], profiler)
+
+        pipeline.run([3, 2])
+
+        self.assertEqual(profiler.stage_times["expand"].items, 2)
+        self.assertEqual(profiler.stage_times["collect"].items, 5)
+        self.assertEqual(len(profiler.profiles), 3 if StageProfiler.per_thread else 0)
+
+    def test_tracer_records_stage_and_queue_spans_of_every_item(self):
+        tracer = TraceRecorder(None)
+
+        pipeline = Pipeline([
+            PipelineStage("expand", 2, lambda item, emit, session: [emit(i) for i in range(item)], 1),
+            PipelineStage("collect", 1, lambda item, emit, session: None, 1)
+        ], tracer=tracer)
+
+        pipeline.run([3, 2])
+
+        spans = [event["name"] for event in tracer.events if event["ph"] == "X"]
+        waits = [event["name"] for event in tracer.events if event["ph"] == "b"]
+
+        self.assertEqual(spans.count("expand"), 2)
+        self.assertEqual(spans.count("collect"), 5)
+        self.assertEqual(waits.count("expand queue"), 2)
+        self.assertEqual(waits.count("collect queue"), 5)
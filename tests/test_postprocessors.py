@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from unittest import mock
+
+import youtube_dl
+
+from youtube_dl.postprocessor.ffmpeg import FFmpegFixupM4aPP, FFmpegFixupStretchedPP, FFmpegMetadataPP
+from yget.postprocessors import FFmpegExtractAudioMetadataPP, Postprocessors
+
+class RecordingFFmpegPostProcessor(object):
+    def __init__(self):
+        self.calls = []
+
+    def run_ffmpeg_multiple_files(self, postprocessor, input_paths, out_path, opts):
+        self.calls.append((type(postprocessor).__name__, input_paths, out_path, opts))
+
+        with open(out_path, "w"):
+            pass
+
+class TestPostprocessors(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.recorder = RecordingFFmpegPostProcessor()
+        self.youtube_downloader = youtube_dl.YoutubeDL({"quiet": True, "postprocessor_args": ["-metadata", "album=ALBUM"]})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_postprocessor(self, preferredcodec):
+        postprocessor = FFmpegExtractAudioMetadataPP(self.youtube_downloader, preferredcodec=preferredcodec)
+        postprocessor.check_version = lambda: None
+        postprocessor.run_ffmpeg_multiple_files = lambda input_paths, out_path, opts: self.recorder.run_ffmpeg_multiple_files(postprocessor, input_paths, out_path, opts + postprocessor._configuration_args())
+
+        return postprocessor
+
+    def make_information(self, ext, acodec):
+        path = os.path.join(self.directory, "Title (ID).{}".format(ext))
+
+        with open(path, "w"):
+            pass
+
+        return {"filepath": path, "ext": ext, "acodec": acodec, "title": "TITLE", "uploader": "UPLOADER"}
+
+    def test_get_postprocessor_resolves_custom_and_youtube_dl_keys(self):
+        self.assertIs(Postprocessors.get_postprocessor("FFmpegExtractAudioMetadata"), FFmpegExtractAudioMetadataPP)
+        self.assertEqual(Postprocessors.get_postprocessor("FFmpegMetadata").__name__, "FFmpegMetadataPP")
+
+    def test_get_known_codec_normalises_extractor_codecs(self):
+        self.assertEqual(FFmpegExtractAudioMetadataPP.get_known_codec({"acodec": "mp4a.40.2"}), "aac")
+        self.assertEqual(FFmpegExtractAudioMetadataPP.get_known_codec({"acodec": "opus"}), "opus")
+        self.assertIsNone(FFmpegExtractAudioMetadataPP.get_known_codec({"acodec": "none"}))
+        self.assertIsNone(FFmpegExtractAudioMetadataPP.get_known_codec({}))
+
+    def test_run_with_matching_codec_copies_and_tags_in_one_run(self):
+        postprocessor = self.make_postprocessor("best")
+
+        files_to_delete, information = postprocessor.run(self.make_information("webm", "opus"))
+
+        self.assertEqual(len(self.recorder.calls), 1)
+
+        _, _, out_path, opts = self.recorder.calls[0]
+
+        self.assertTrue(out_path.endswith(".opus"))
+        self.assertIn("copy", opts)
+        self.assertIn("title=TITLE", opts)
+        self.assertIn("artist=UPLOADER", opts)
+        self.assertIn("album=ALBUM", opts)
+        self.assertEqual(information["ext"], "opus")
+        self.assertEqual(len(files_to_delete), 1)
+
+    def test_run_with_different_codec_converts_and_tags_in_one_run(self):
+        postprocessor = self.make_postprocessor("mp3")
+
+        postprocessor.run(self.make_information("m4a", "mp4a.40.2"))
+
+        self.assertEqual(len(self.recorder.calls), 1)
+
+        _, _, out_path, opts = self.recorder.calls[0]
+
+        self.assertTrue(out_path.endswith(".mp3"))
+        self.assertIn("libmp3lame", opts)
+        self.assertIn("title=TITLE", opts)
+
+    def test_run_with_same_output_file_tags_in_place(self):
+        postprocessor = self.make_postprocessor("mp3")
+
+        information = self.make_information("mp3", "mp3")
+
+        original_run_ffmpeg_multiple_files = FFmpegMetadataPP.run_ffmpeg_multiple_files
+        FFmpegMetadataPP.run_ffmpeg_multiple_files = lambda pp, input_paths, out_path, opts: self.recorder.run_ffmpeg_multiple_files(pp, input_paths, out_path, opts)
+
+        try:
+            postprocessor.run(information)
+        finally:
+            FFmpegMetadataPP.run_ffmpeg_multiple_files = original_run_ffmpeg_multiple_files
+
+        self.assertEqual(len(self.recorder.calls), 1)
+        self.assertEqual(self.recorder.calls[0][0], "FFmpegMetadataPP")
+
+    def test_run_with_chapters_adds_chapters_to_the_same_run(self):
+        postprocessor = self.make_postprocessor("mp3")
+
+        information = self.make_information("m4a", "mp4a.40.2")
+        information["chapters"] = [{"start_time": 0, "end_time": 61.5, "title": "Intro; part=1"}, {"start_time": 61.5, "end_time": 120}]
+
+        postprocessor.run(information)
+
+        self.assertEqual(len(self.recorder.calls), 1)
+
+        _, input_paths, _, opts = self.recorder.calls[0]
+
+        self.assertEqual(len(input_paths), 2)
+        self.assertTrue(input_paths[1].endswith(".meta"))
+        self.assertFalse(os.path.exists(input_paths[1]))
+        self.assertEqual(opts[opts.index("-map_metadata") + 1], "1")
+        self.assertIn("title=TITLE", opts)
+
+    def test_make_chapters_metadata_escapes_titles(self):
+        metadata = FFmpegExtractAudioMetadataPP.make_chapters_metadata([{"start_time": 0, "end_time": 61.5, "title": "Intro; part=1"}])
+
+        self.assertEqual(metadata, ";FFMETADATA1\n[CHAPTER]\nTIMEBASE=1/1000\nSTART=0\nEND=61500\ntitle=Intro\\; part\\=1\n")
+
+    def test_get_fixups_adds_available_fixups_process_info_would(self):
+        with mock.patch.object(FFmpegFixupM4aPP, "available", True), mock.patch.object(FFmpegFixupStretchedPP, "available", False):
+            fixups = Postprocessors.get_fixups(self.youtube_downloader, {"container": "m4a_dash", "stretched_ratio": 2, "protocol": "https"})
+
+        self.assertListEqual([type(fixup).__name__ for fixup in fixups], ["FFmpegFixupM4aPP"])
+        self.assertListEqual(Postprocessors.get_fixups(self.youtube_downloader, {"protocol": "https"}), [])
+
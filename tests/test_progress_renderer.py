@@ -0,0 +1,140 @@
+import io
+import unittest
+
+from yget.progress_renderer import ProgressRenderer
+
+class TestProgressRenderer(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.stream = io.StringIO()
+        self.queued = 0
+
+    def make_renderer(self, is_tty, rate_limit=None):
+        return ProgressRenderer(self.stream, lambda: self.queued, lambda: rate_limit, is_tty, lambda: self.now)
+
+    @staticmethod
+    def downloading(filename, downloaded_bytes, total_bytes=None):
+        return {"status": "downloading", "filename": filename, "downloaded_bytes": downloaded_bytes, "total_bytes": total_bytes}
+
+    def test_update_writes_nothing_on_tty(self):
+        renderer = self.make_renderer(True)
+
+        for downloaded_bytes in range(0, 1000, 10):
+            renderer.update(self.downloading("a.mp4", downloaded_bytes, 1000))
+
+        self.assertEqual(self.stream.getvalue(), "")
+
+    def test_render_shows_transfers_and_batch_totals_on_tty(self):
+        self.queued = 3
+        renderer = self.make_renderer(True, 2048)
+
+        renderer.update(self.downloading("/out/a.mp4", 0, 4000))
+        renderer.update(self.downloading("/out/b.mp4", 0, 2000))
+        renderer.render()
+
+        self.now = 1.0
+        renderer.update(self.downloading("/out/a.mp4", 1000, 4000))
+        renderer.update(self.downloading("/out/b.mp4", 1000, 2000))
+        renderer.render()
+
+        self.assertListEqual(renderer.drawn_lines, [
+            "[ 25.0%] 1000.00B/s ETA 00:03 a.mp4",
+            "[ 50.0%] 1000.00B/s ETA 00:01 b.mp4",
+            "[download] 2 active, 5 left, 0 done, 1.95KiB/s ETA 00:02 (limit 2.00KiB/s)"])
+
+    def test_render_clears_previous_lines_on_tty(self):
+        renderer = self.make_renderer(True)
+
+        renderer.update(self.downloading("a.mp4", 0))
+        renderer.render()
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        renderer.render()
+
+        self.assertTrue(self.stream.getvalue().startswith("\r\x1b[K\x1b[A\x1b[K"))
+
+    def test_write_line_is_written_above_progress_on_tty(self):
+        renderer = self.make_renderer(True)
+
+        renderer.update(self.downloading("a.mp4", 0))
+        renderer.render()
+        lines = renderer.drawn_lines
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        renderer.write_line("message")
+
+        self.assertEqual(self.stream.getvalue(), "\r\x1b[K\x1b[A\x1b[Kmessage\n" + "\n".join(lines))
+        self.assertListEqual(renderer.drawn_lines, lines)
+
+    def test_suspend_clears_progress_and_holds_messages_until_resumed(self):
+        renderer = self.make_renderer(True)
+
+        renderer.update(self.downloading("a.mp4", 0))
+        renderer.render()
+
+        with renderer.suspend():
+            self.stream.truncate(0)
+            self.stream.seek(0)
+
+            renderer.render()
+            renderer.write_line("message")
+
+            self.assertEqual(self.stream.getvalue(), "")
+
+        self.assertEqual(self.stream.getvalue(), "message\n")
+
+        renderer.render()
+
+        self.assertNotEqual(renderer.drawn_lines, [])
+
+    def test_update_writes_start_and_finish_lines_without_tty(self):
+        renderer = self.make_renderer(False)
+
+        renderer.update(self.downloading("a.mp4", 0, 2048))
+        renderer.update(self.downloading("a.mp4", 1024, 2048))
+        self.now = 65.0
+        renderer.update({"status": "finished", "filename": "a.mp4", "downloaded_bytes": 2048, "total_bytes": 2048})
+
+        self.assertEqual(self.stream.getvalue(), "Downloading a.mp4\nDownloaded a.mp4 (2.00KiB in 01:05)\n")
+        self.assertEqual(renderer.completed, 1)
+
+    def test_render_logs_sparsely_without_tty(self):
+        renderer = self.make_renderer(False)
+
+        renderer.update(self.downloading("a.mp4", 0, 2048))
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        self.now = ProgressRenderer.log_interval / 2
+        renderer.render()
+        self.assertEqual(self.stream.getvalue(), "")
+
+        self.now = ProgressRenderer.log_interval
+        renderer.update(self.downloading("a.mp4", 1024, 2048))
+        renderer.render()
+        self.assertEqual(self.stream.getvalue(), "[ 50.0%] 68.27B/s ETA 00:15 a.mp4\n[download] 1 active, 1 left, 0 done, 68.27B/s ETA 00:15\n")
+
+    def test_update_forgets_failed_transfers(self):
+        renderer = self.make_renderer(True)
+
+        renderer.update(self.downloading("a.mp4", 0))
+        renderer.update({"status": "error", "filename": "a.mp4"})
+
+        self.assertEqual(len(renderer.transfers), 0)
+        self.assertEqual(renderer.completed, 0)
+
+    def test_stop_clears_progress_lines(self):
+        renderer = self.make_renderer(True)
+
+        renderer.start()
+        renderer.update(self.downloading("a.mp4", 0))
+        renderer.render()
+        renderer.stop()
+
+        self.assertTrue(self.stream.getvalue().endswith("\r\x1b[K\x1b[A\x1b[K"))
+        self.assertListEqual(renderer.drawn_lines, [])
+
+if __name__ == "__main__":
+    unittest.main()
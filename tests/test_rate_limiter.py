@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from yget.rate_limiter import RateLimiter
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.fake_clock = FakeClock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_rate_limiter(self, rate=None, control_file=None):
+        return RateLimiter(rate, control_file, self.fake_clock.clock, self.fake_clock.sleep)
+
+    def write_control_file(self, value, mtime):
+        path = os.path.join(self.directory, "rate")
+
+        with open(path, "w") as f:
+            f.write(value)
+
+        os.utime(path, (mtime, mtime))
+
+        return path
+
+    def test_parse_rate_accepts_suffixes(self):
+        self.assertEqual(RateLimiter.parse_rate("500K"), 500 * 1024)
+        self.assertEqual(RateLimiter.parse_rate("2M\n"), 2 * 1024 * 1024)
+        self.assertIsNone(RateLimiter.parse_rate("fast"))
+        self.assertIsNone(RateLimiter.parse_rate(""))
+
+    def test_consume_without_rate_never_sleeps(self):
+        rate_limiter = self.make_rate_limiter()
+
+        rate_limiter.consume(10 ** 9)
+
+        self.assertListEqual(self.fake_clock.sleeps, [])
+
+    def test_consume_over_rate_sleeps_for_debt(self):
+        rate_limiter = self.make_rate_limiter(rate=1000)
+
+        rate_limiter.consume(500)
+        rate_limiter.consume(500)
+
+        self.assertAlmostEqual(sum(self.fake_clock.sleeps), 1.0)
+
+    def test_consume_after_idle_uses_saved_burst(self):
+        rate_limiter = self.make_rate_limiter(rate=1000)
+
+        self.fake_clock.now += 10
+        rate_limiter.consume(1000)
+
+        self.assertListEqual(self.fake_clock.sleeps, [])
+
+    def test_total_rate_is_shared_between_transfers(self):
+        rate_limiter = self.make_rate_limiter(rate=1000)
+
+        for _ in range(10):
+            rate_limiter.consume(100)
+            rate_limiter.consume(100)
+
+        self.assertAlmostEqual(self.fake_clock.now, 2.0)
+
+    def test_control_file_sets_and_updates_rate(self):
+        control_file = self.write_control_file("1K", 100)
+
+        rate_limiter = self.make_rate_limiter(control_file=control_file)
+
+        self.assertEqual(rate_limiter.get_rate(), 1024)
+
+        self.write_control_file("0", 200)
+        self.fake_clock.now += RateLimiter.control_file_interval
+        rate_limiter.consume(1)
+
+        self.assertIsNone(rate_limiter.get_rate())
+
+    def test_request_reload_rereads_control_file(self):
+        control_file = self.write_control_file("1K", 100)
+
+        rate_limiter = self.make_rate_limiter(control_file=control_file)
+
+        self.write_control_file("2K", 100)
+        rate_limiter.request_reload()
+        rate_limiter.consume(1)
+
+        self.assertEqual(rate_limiter.get_rate(), 2048)
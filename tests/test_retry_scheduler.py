@@ -0,0 +1,27 @@
+import unittest
+
+from yget.error_classifier import ErrorClassifier
+from yget.retry_scheduler import RetryScheduler
+
+class TestRetryScheduler(unittest.TestCase):
+    def test_should_retry_only_transient_errors_within_attempts(self):
+        retry_scheduler = RetryScheduler(3)
+
+        self.assertTrue(retry_scheduler.should_retry(ErrorClassifier.transient, 1))
+        self.assertTrue(retry_scheduler.should_retry(ErrorClassifier.transient, 2))
+        self.assertFalse(retry_scheduler.should_retry(ErrorClassifier.transient, 3))
+
+        for error_class in (ErrorClassifier.auth, ErrorClassifier.unavailable, ErrorClassifier.fatal):
+            self.assertFalse(retry_scheduler.should_retry(error_class, 1))
+
+    def test_get_delay_grows_exponentially_with_jitter(self):
+        low = RetryScheduler(base_delay=2, max_delay=100, random=lambda: 0.0)
+        high = RetryScheduler(base_delay=2, max_delay=100, random=lambda: 1.0)
+
+        self.assertListEqual([low.get_delay(attempts) for attempts in range(1, 5)], [1, 2, 4, 8])
+        self.assertListEqual([high.get_delay(attempts) for attempts in range(1, 5)], [2, 4, 8, 16])
+
+    def test_get_delay_is_capped(self):
+        retry_scheduler = RetryScheduler(base_delay=2, max_delay=10, random=lambda: 1.0)
+
+        self.assertEqual(retry_scheduler.get_delay(20), 10)
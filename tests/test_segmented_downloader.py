@@ -0,0 +1,202 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import youtube_dl
+
+from yget.segmented_downloader import SegmentedDownloader
+
+class RangeRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        data = server.data
+
+        with server.lock:
+            server.connections += 1
+
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+
+        if match is None or not server.supports_ranges:
+            start, end = 0, len(data) - 1
+            self.send_response(200)
+        else:
+            start, end = int(match.group(1)), min(int(match.group(2)), len(data) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", "bytes {}-{}/{}".format(start, end, len(data)))
+
+        body = data[start:end + 1]
+
+        if server.truncate_segments and len(body) > 1:
+            body = body[:len(body) // 2]
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        # Each connection is limited to bytes_per_second, like a server capping per connection throughput
+        chunk_size = 4096
+
+        # The client closes connections early when a download is abandoned
+        try:
+            for i in range(0, len(body), chunk_size):
+                self.wfile.write(body[i:i + chunk_size])
+                time.sleep(chunk_size / server.bytes_per_second)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class TestSegmentedDownloader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data = os.urandom(256 * 1024)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+        self.server.daemon_threads = True
+        self.server.data = self.data
+        self.server.lock = threading.Lock()
+        self.server.connections = 0
+        self.server.supports_ranges = True
+        self.server.truncate_segments = False
+        self.server.bytes_per_second = 512 * 1024
+
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.youtube_downloader = youtube_dl.YoutubeDL({"quiet": True})
+        self.filename = os.path.join(self.directory, "Title (ID).mp4")
+        self.info = {"url": "http://127.0.0.1:{}/video".format(self.server.server_address[1]), "protocol": "http"}
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def make_segmented_downloader(self, segment_count=4, min_size=1024, progress_hooks=None):
+        return SegmentedDownloader(self.youtube_downloader, segment_count, min_size, progress_hooks)
+
+    def read_file(self):
+        with open(self.filename, "rb") as f:
+            return f.read()
+
+    def test_make_segments_covers_every_byte(self):
+        segmented_downloader = self.make_segmented_downloader(segment_count=3)
+
+        self.assertListEqual(segmented_downloader.make_segments(10), [(0, 3), (4, 7), (8, 9)])
+
+    def test_download_with_range_support_downloads_over_several_connections(self):
+        statuses = []
+
+        segmented_downloader = self.make_segmented_downloader(progress_hooks=[statuses.append])
+
+        downloaded = segmented_downloader.download(self.filename, self.info)
+
+        self.assertTrue(downloaded)
+        self.assertEqual(self.read_file(), self.data)
+        self.assertFalse(os.path.exists(self.filename + ".part"))
+        self.assertEqual(self.server.connections, 5)
+        self.assertTrue(all(status["status"] == "downloading" for status in statuses))
+        self.assertEqual(max(status["downloaded_bytes"] for status in statuses), len(self.data))
+
+    def test_download_with_segments_is_faster_than_connection_limit(self):
+        segmented_downloader = self.make_segmented_downloader(segment_count=8)
+
+        start = time.perf_counter()
+        segmented_downloader.download(self.filename, self.info)
+        duration = time.perf_counter() - start
+
+        # A single connection needs len(data) / bytes_per_second = 0.5s
+        self.assertLess(duration, 0.4)
+
+    def test_download_without_range_support_falls_back(self):
+        self.server.supports_ranges = False
+
+        downloaded = self.make_segmented_downloader().download(self.filename, self.info)
+
+        self.assertFalse(downloaded)
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertFalse(os.path.exists(self.filename + ".part"))
+
+    def test_download_with_short_segments_falls_back(self):
+        self.server.truncate_segments = True
+
+        downloaded = self.make_segmented_downloader().download(self.filename, self.info)
+
+        self.assertFalse(downloaded)
+        self.assertFalse(os.path.exists(self.filename))
+        self.assertFalse(os.path.exists(self.filename + ".part"))
+
+    def test_download_with_missing_ranges_fails(self):
+        segmented_downloader = self.make_segmented_downloader()
+        segmented_downloader.download_segments = lambda *args: None
+
+        downloaded = segmented_downloader.download(self.filename, self.info)
+
+        self.assertFalse(downloaded)
+        self.assertFalse(os.path.exists(self.filename))
+
+    def test_download_below_min_size_falls_back(self):
+        downloaded = self.make_segmented_downloader(min_size=len(self.data) + 1).download(self.filename, self.info)
+
+        self.assertFalse(downloaded)
+        self.assertEqual(self.server.connections, 1)
+
+    def write_interrupted_download(self, total, ranges):
+        # The state a killed run leaves behind: the first range written, the rest still zero filled
+        with open(self.filename + ".segments", "wb") as f:
+            f.write(self.data[:ranges[0][2]])
+            f.truncate(total)
+
+        with open(self.filename + ".segments.ranges", "w") as f:
+            json.dump({"total": total, "ranges": ranges}, f)
+
+    def test_download_never_preallocates_part_file(self):
+        part_exists = []
+
+        segmented_downloader = self.make_segmented_downloader(progress_hooks=[lambda status: part_exists.append(os.path.exists(self.filename + ".part"))])
+
+        segmented_downloader.download(self.filename, self.info)
+
+        self.assertNotIn(True, part_exists)
+        self.assertFalse(os.path.exists(self.filename + ".segments"))
+        self.assertFalse(os.path.exists(self.filename + ".segments.ranges"))
+
+    def test_download_resumes_interrupted_preallocated_file(self):
+        segmented_downloader = self.make_segmented_downloader()
+        ranges = [[start, end, 0] for start, end in segmented_downloader.make_segments(len(self.data))]
+        ranges[0][2] = ranges[0][1] + 1
+        self.write_interrupted_download(len(self.data), ranges)
+
+        downloaded = segmented_downloader.download(self.filename, self.info)
+
+        self.assertTrue(downloaded)
+        self.assertEqual(self.read_file(), self.data)
+        self.assertEqual(self.server.connections, 4)
+        self.assertFalse(os.path.exists(self.filename + ".segments"))
+        self.assertFalse(os.path.exists(self.filename + ".segments.ranges"))
+
+    def test_download_restarts_interrupted_file_with_different_size(self):
+        segmented_downloader = self.make_segmented_downloader()
+        ranges = [[start, end, 0] for start, end in segmented_downloader.make_segments(len(self.data) + 1)]
+        ranges[0][2] = 1024
+        self.write_interrupted_download(len(self.data) + 1, ranges)
+
+        downloaded = segmented_downloader.download(self.filename, self.info)
+
+        self.assertTrue(downloaded)
+        self.assertEqual(self.read_file(), self.data)
+        self.assertEqual(self.server.connections, 5)
+
+    def test_download_with_short_segments_keeps_no_interrupted_file(self):
+        self.server.truncate_segments = True
+
+        self.make_segmented_downloader().download(self.filename, self.info)
+
+        self.assertFalse(os.path.exists(self.filename + ".segments"))
+        self.assertFalse(os.path.exists(self.filename + ".segments.ranges"))
@@ -0,0 +1,99 @@
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import unittest
+
+from yget.stage_profiler import StageProfiler, NullStageProfiler
+
+def busy():
+    return sum(i * i for i in range(10000))
+
+class TestStageProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "yget.prof")
+        self.now = 0.0
+        self.messages = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_profiler(self, path=None):
+        return StageProfiler(path or self.path, lambda: self.now, self.messages.append)
+
+    def test_measure_adds_wall_time_per_stage(self):
+        profiler = self.make_profiler()
+
+        for wall in (1.0, 2.0):
+            with profiler.measure("download"):
+                self.now += wall
+
+        with self.assertRaises(ValueError):
+            with profiler.measure("extract"):
+                self.now += 0.5
+                raise ValueError("ERROR")
+
+        self.assertEqual(profiler.stage_times["download"].items, 2)
+        self.assertEqual(profiler.stage_times["download"].wall, 3.0)
+        self.assertEqual(profiler.stage_times["extract"].items, 1)
+        self.assertEqual(profiler.stage_times["extract"].wall, 0.5)
+
+    def test_stop_writes_stats_from_every_thread(self):
+        profiler = self.make_profiler()
+        profiler.start()
+
+        thread = threading.Thread(target=profiler.profile_thread(busy))
+        thread.start()
+        thread.join()
+
+        with profiler.measure("download"):
+            self.now += 2.0
+
+        lines = profiler.stop()
+
+        function_names = [function[2] for function in pstats.Stats(self.path).stats]
+
+        self.assertIn("busy", function_names)
+        self.assertEqual(lines[0].split(), ["stage", "items", "wall", "s", "cpu", "s", "cpu", "%"])
+        self.assertEqual(lines[1].split()[:3], ["download", "1", "2.00"])
+        self.assertEqual(lines[2].split()[0], "ffmpeg")
+        self.assertEqual(lines[3].split()[0], "total")
+
+    def test_profile_thread_leaves_target_unwrapped_when_profile_is_process_wide(self):
+        profiler = self.make_profiler()
+        profiler.per_thread = False
+        profiler.start()
+
+        self.assertIs(profiler.profile_thread(busy), busy)
+
+        busy()
+        profiler.stop()
+
+        function_names = [function[2] for function in pstats.Stats(self.path).stats]
+
+        self.assertIn("busy", function_names)
+        self.assertEqual(len(profiler.profiles), 1)
+
+    def test_stop_reports_unwritable_path(self):
+        profiler = self.make_profiler(os.path.join(self.directory, "missing", "yget.prof"))
+        profiler.start()
+
+        lines = profiler.stop()
+
+        self.assertEqual(len(self.messages), 1)
+        self.assertEqual(len(lines), 3)
+
+    def test_null_profiler_leaves_thread_targets_unwrapped(self):
+        profiler = NullStageProfiler()
+
+        self.assertIs(profiler.profile_thread(busy), busy)
+
+        with profiler.measure("download"):
+            pass
+
+        self.assertListEqual(profiler.stop(), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from yget.stream_urls import StreamUrls
+
+class TestStreamUrls(unittest.TestCase):
+    def test_get_urls_with_single_format_returns_url(self):
+        urls = StreamUrls.get_urls({"url": "https://host/video"})
+
+        self.assertListEqual(urls, ["https://host/video"])
+
+    def test_get_urls_with_requested_formats_returns_every_url(self):
+        urls = StreamUrls.get_urls({"url": "IGNORED", "requested_formats": [{"url": "https://host/video"}, {"url": "https://host/audio"}]})
+
+        self.assertListEqual(urls, ["https://host/video", "https://host/audio"])
+
+    def test_get_expiry_reads_query_parameter(self):
+        expiry = StreamUrls.get_expiry("https://host/videoplayback?expire=1000&id=1")
+
+        self.assertEqual(expiry, 1000)
+
+    def test_get_expiry_reads_path_parameter(self):
+        expiry = StreamUrls.get_expiry("https://host/videoplayback/id/1/expire/2000/file/index.m3u8")
+
+        self.assertEqual(expiry, 2000)
+
+    def test_get_expiry_without_parameter_returns_none(self):
+        expiry = StreamUrls.get_expiry("https://host/video")
+
+        self.assertIsNone(expiry)
+
+    def test_has_expired_with_future_expiry_returns_false(self):
+        expired = StreamUrls.has_expired({"url": "https://host/videoplayback?expire=1000"}, now=100)
+
+        self.assertFalse(expired)
+
+    def test_has_expired_within_margin_returns_true(self):
+        expired = StreamUrls.has_expired({"url": "https://host/videoplayback?expire=1000"}, now=1000 - StreamUrls.expiry_margin)
+
+        self.assertTrue(expired)
+
+    def test_has_expired_without_expiry_returns_false(self):
+        expired = StreamUrls.has_expired({"url": "https://host/video"}, now=100)
+
+        self.assertFalse(expired)
+
+    def test_has_expired_without_urls_returns_true(self):
+        expired = StreamUrls.has_expired({"id": "ID"}, now=100)
+
+        self.assertTrue(expired)
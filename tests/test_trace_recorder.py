@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from yget.trace_recorder import TraceRecorder, NullTraceRecorder
+
+class TestTraceRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "trace.json")
+        self.now = 0.0
+        self.messages = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def make_tracer(self, path=None):
+        return TraceRecorder(path or self.path, lambda item: {"item": item}, lambda: self.now, self.messages.append)
+
+    def get_events(self, tracer, phase):
+        return [event for event in tracer.events if event["ph"] == phase]
+
+    def test_span_records_complete_event_in_microseconds(self):
+        tracer = self.make_tracer()
+
+        self.now = 1.0
+
+        with tracer.span("transfer", "download", "ID"):
+            self.now = 3.5
+
+        span = self.get_events(tracer, "X")[0]
+
+        self.assertEqual(span["name"], "transfer")
+        self.assertEqual(span["cat"], "download")
+        self.assertEqual(span["ts"], 1000000)
+        self.assertEqual(span["dur"], 2500000)
+        self.assertDictEqual(span["args"], {"item": "ID"})
+        self.assertEqual(span["tid"], threading.get_ident())
+
+    def test_span_is_recorded_when_handler_raises(self):
+        tracer = self.make_tracer()
+
+        with self.assertRaises(ValueError):
+            with tracer.span("extract", "stage"):
+                raise ValueError("ERROR")
+
+        self.assertEqual(len(self.get_events(tracer, "X")), 1)
+
+    def test_each_thread_is_named_once(self):
+        tracer = self.make_tracer()
+
+        def work():
+            for _ in range(2):
+                with tracer.span("download", "stage"):
+                    pass
+
+        thread = threading.Thread(target=work, name="download-1")
+        thread.start()
+        thread.join()
+
+        with tracer.span("extract", "stage"):
+            pass
+
+        thread_names = [event["args"]["name"] for event in self.get_events(tracer, "M") if event["name"] == "thread_name"]
+
+        self.assertListEqual(thread_names, ["download-1", threading.current_thread().name])
+
+    def test_dequeue_records_queue_wait_since_enqueue(self):
+        tracer = self.make_tracer()
+
+        self.now = 2.0
+        tracer.enqueue("download", "ID")
+        self.now = 5.0
+        tracer.dequeue("download", "ID")
+        tracer.dequeue("download", "OTHER")
+
+        begin = self.get_events(tracer, "b")
+        end = self.get_events(tracer, "e")
+
+        self.assertEqual(len(begin), 1)
+        self.assertEqual(begin[0]["name"], "download queue")
+        self.assertEqual(begin[0]["ts"], 2000000)
+        self.assertEqual(end[0]["ts"], 5000000)
+        self.assertEqual(begin[0]["id"], end[0]["id"])
+
+    def test_write_saves_trace_events(self):
+        tracer = self.make_tracer()
+
+        with tracer.span("tag", "postprocess"):
+            pass
+
+        tracer.write()
+
+        with open(self.path) as f:
+            trace = json.load(f)
+
+        self.assertIn("tag", [event["name"] for event in trace["traceEvents"]])
+
+    def test_write_reports_unwritable_path(self):
+        tracer = self.make_tracer(os.path.join(self.directory, "missing", "trace.json"))
+
+        tracer.write()
+
+        self.assertEqual(len(self.messages), 1)
+
+    def test_null_tracer_records_nothing(self):
+        tracer = NullTraceRecorder()
+
+        with tracer.span("transfer", "download"):
+            pass
+
+        tracer.enqueue("download", "ID")
+        tracer.dequeue("download", "ID")
+        tracer.write()
+
+if __name__ == "__main__":
+    unittest.main()
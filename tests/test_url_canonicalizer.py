@@ -0,0 +1,69 @@
+import unittest
+
+from yget.url_canonicalizer import UrlCanonicalizer
+
+class TestUrlCanonicalizer(unittest.TestCase):
+    video_id = "dQw4w9WgXcQ"
+    playlist_id = "PLBCF2DAC6FFB574DE"
+
+    def test_classify_video_forms(self):
+        urls = [
+            "dQw4w9WgXcQ",
+            " https://www.youtube.com/watch?v=dQw4w9WgXcQ\n",
+            "https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=10",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ#t=1",
+            "http://youtube.com/watch?v=dQw4w9WgXcQ",
+            "youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://music.youtube.com/watch?v=dQw4w9WgXcQ&feature=share",
+            "https://youtu.be/dQw4w9WgXcQ?t=3",
+            "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+            "https://www.youtube.com/embed/dQw4w9WgXcQ?rel=0",
+            "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ"
+        ]
+
+        for url in urls:
+            self.assertEqual(UrlCanonicalizer.classify(url), (UrlCanonicalizer.kind_video, self.video_id), url)
+
+    def test_classify_playlist_forms(self):
+        urls = [
+            "PLBCF2DAC6FFB574DE",
+            "https://www.youtube.com/playlist?list=PLBCF2DAC6FFB574DE",
+            "https://music.youtube.com/playlist?list=PLBCF2DAC6FFB574DE",
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLBCF2DAC6FFB574DE&index=2",
+            "https://www.youtube.com/watch?list=PLBCF2DAC6FFB574DE&v=dQw4w9WgXcQ",
+            "https://youtu.be/dQw4w9WgXcQ?list=PLBCF2DAC6FFB574DE"
+        ]
+
+        for url in urls:
+            self.assertEqual(UrlCanonicalizer.classify(url), (UrlCanonicalizer.kind_playlist, self.playlist_id), url)
+
+    def test_classify_mix_keeps_seed_video(self):
+        self.assertEqual(UrlCanonicalizer.classify("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDdQw4w9WgXcQ&start_radio=1"), (UrlCanonicalizer.kind_mix, (self.video_id, "RDdQw4w9WgXcQ")))
+        self.assertEqual(UrlCanonicalizer.classify("RDdQw4w9WgXcQ"), (UrlCanonicalizer.kind_mix, (None, "RDdQw4w9WgXcQ")))
+        self.assertEqual(UrlCanonicalizer.classify("https://music.youtube.com/playlist?list=RDCLAK5uy_kmPRjHDECIcuVwnKsx2Ng7fyNgFKWNJFs"), (UrlCanonicalizer.kind_playlist, "RDCLAK5uy_kmPRjHDECIcuVwnKsx2Ng7fyNgFKWNJFs"))
+
+    def test_classify_channel_forms(self):
+        self.assertEqual(UrlCanonicalizer.classify("https://www.youtube.com/@handle/videos"), (UrlCanonicalizer.kind_channel, "@handle"))
+        self.assertEqual(UrlCanonicalizer.classify("https://www.youtube.com/channel/UCuAXFkgsw1L7xaCfnd5JJOw"), (UrlCanonicalizer.kind_channel, "channel/UCuAXFkgsw1L7xaCfnd5JJOw"))
+
+    def test_classify_unrecognised_inputs(self):
+        for value in ["", "hello world", "dQw4w9WgXcQX", "https://www.youtube.com/watch?v=dQw4w9WgXcQX", "https://vimeo.com/123", "https://www.youtube.com/feed/subscriptions"]:
+            self.assertEqual(UrlCanonicalizer.classify(value), (None, None), value)
+
+    def test_canonicalize_makes_one_url_per_video_or_playlist(self):
+        self.assertEqual(UrlCanonicalizer.canonicalize("https://youtu.be/dQw4w9WgXcQ"), "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+        self.assertEqual(UrlCanonicalizer.canonicalize("PLBCF2DAC6FFB574DE"), "https://www.youtube.com/playlist?list=PLBCF2DAC6FFB574DE")
+        self.assertEqual(UrlCanonicalizer.canonicalize(" https://vimeo.com/123 "), "https://vimeo.com/123")
+
+    def test_canonicalize_keeps_mixes_on_watch_page(self):
+        self.assertEqual(UrlCanonicalizer.canonicalize("https://youtu.be/dQw4w9WgXcQ?list=RDdQw4w9WgXcQ"), "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDdQw4w9WgXcQ")
+        self.assertEqual(UrlCanonicalizer.canonicalize("RDdQw4w9WgXcQ"), "https://www.youtube.com/watch?list=RDdQw4w9WgXcQ")
+
+    def test_get_key_matches_same_video_in_different_forms(self):
+        self.assertEqual(UrlCanonicalizer.get_key("dQw4w9WgXcQ"), UrlCanonicalizer.get_key("https://m.youtube.com/watch?v=dQw4w9WgXcQ"))
+        self.assertNotEqual(UrlCanonicalizer.get_key("dQw4w9WgXcQ"), UrlCanonicalizer.get_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PLBCF2DAC6FFB574DE"))
+
+    def test_get_video_id_only_returns_videos(self):
+        self.assertEqual(UrlCanonicalizer.get_video_id("https://youtu.be/dQw4w9WgXcQ"), self.video_id)
+        self.assertIsNone(UrlCanonicalizer.get_video_id("PLBCF2DAC6FFB574DE"))
@@ -1,4 +1,5 @@
 from .helpers import Helpers
+from .url_canonicalizer import UrlCanonicalizer
 
 class App:
     def __init__(self, argument_parser, bookmarks_parser, downloader_factory, file_reader, input_provider, path_validator, logger):
@@ -11,7 +12,7 @@ class App:
         self.logger = logger
 
     def run(self):
-        arguments_valid, mode_info, output_directory, options = self.argument_parser.parse()
+        arguments_valid, mode_info, output_directory, options, settings = self.argument_parser.parse()
 
         if not arguments_valid:
             self.logger.write_line(self.argument_parser.make_arguments_invalid_message())
@@ -29,9 +30,13 @@ class App:
 
         has_verbose_option, has_audio_only_option, has_wav_option, has_mp3_option, has_netrc_option = options
 
-        downloader = self.downloader_factory.make_downloader(output_directory, has_verbose_option, has_netrc_option)
+        downloader = self.downloader_factory.make_downloader(output_directory, has_verbose_option, has_netrc_option, settings)
 
-        if mode == "files":
+        if mode == "rebuild-archive":
+            count = downloader.rebuild_archive()
+
+            self.logger.write_line("Recorded {} video(s) in the download archive".format(count))
+        elif mode == "files":
             files = mode_value
 
             for f in files:
@@ -40,6 +45,7 @@ class App:
                     return 1
 
             urls = []
+            sources = []
 
             if not files:
                 while True:
@@ -47,18 +53,20 @@ class App:
                     try:
                         line = self.input_provider.get_input("")
                         urls.append(line)
+                        sources.append("-")
                     except EOFError:
                         break
             else:
                 for f in files:
                     lines = self.file_reader.read_lines(f)
                     urls.extend(Helpers.strip_strings(lines))
+                    sources.extend([f] * len(lines))
 
-            downloader.download_videos(urls, audio_only=has_audio_only_option, wav=has_wav_option, mp3=has_mp3_option)
+            downloader.download_videos(UrlCanonicalizer.canonicalize_all(urls), audio_only=has_audio_only_option, wav=has_wav_option, mp3=has_mp3_option, sources=sources)
         elif mode == "url":
             url = mode_value
 
-            downloader.download_videos([url], audio_only=has_audio_only_option, wav=has_wav_option, mp3=has_mp3_option)
+            downloader.download_videos(UrlCanonicalizer.canonicalize_all([url]), audio_only=has_audio_only_option, wav=has_wav_option, mp3=has_mp3_option, sources=[url])
         elif mode == "bookmarks":
             bookmarks_file = mode_value
 
@@ -73,6 +81,6 @@ class App:
                 self.logger.write_line("Bookmarks file '{}' not valid".format(bookmarks_file))
                 return 1
 
-            downloader.download_videos(urls, audio_only=has_audio_only_option, wav=has_wav_option, mp3=has_mp3_option)
+            downloader.download_videos(urls, audio_only=has_audio_only_option, wav=has_wav_option, mp3=has_mp3_option, sources=self.bookmarks_parser.get_url_sources())
 
         return 0
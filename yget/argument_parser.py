@@ -1,11 +1,16 @@
 import getopt
 
+from .download_scheduler import DownloadScheduler
+from .download_settings import DownloadSettings
+from .rate_limiter import RateLimiter
+
 class ArgumentParser:
     opt_help = "-h"
     opt_output_directory = "-o"
     opt_url = "-u"
     opt_bookmarks = "-b"
     opt_verbose = "-v"
+    opt_jobs = "-j"
 
     opt_help_long = "--help"
     opt_output_directory_long = "--output-directory"
@@ -16,9 +21,44 @@ class ArgumentParser:
     opt_wav_long = "--wav"
     opt_mp3_long = "--mp3"
     opt_netrc_long = "--netrc"
+    opt_jobs_long = "--jobs"
+    opt_extract_jobs_long = "--extract-jobs"
+    opt_postprocess_jobs_long = "--postprocess-jobs"
+    opt_queue_size_long = "--queue-size"
+    opt_schedule_long = "--schedule"
+    opt_no_fair_long = "--no-fair"
+    opt_source_weight_long = "--source-weight"
+    opt_no_cache_long = "--no-cache"
+    opt_refresh_long = "--refresh"
+    opt_cache_directory_long = "--cache-dir"
+    opt_cache_ttl_long = "--cache-ttl"
+    opt_cache_size_long = "--cache-size"
+    opt_archive_long = "--archive"
+    opt_no_archive_long = "--no-archive"
+    opt_rebuild_archive_long = "--rebuild-archive"
+    opt_resume_long = "--resume"
+    opt_journal_long = "--journal"
+    opt_no_journal_long = "--no-journal"
+    opt_nice_long = "--nice"
+    opt_ffmpeg_threads_long = "--ffmpeg-threads"
+    opt_segments_long = "--segments"
+    opt_segment_min_size_long = "--segment-min-size"
+    opt_retries_long = "--retries"
+    opt_adaptive_long = "--adaptive"
+    opt_max_jobs_long = "--max-jobs"
+    opt_limit_rate_long = "--limit-rate"
+    opt_limit_rate_per_transfer_long = "--limit-rate-per-transfer"
+    opt_limit_rate_file_long = "--limit-rate-file"
+    opt_metrics_file_long = "--metrics-file"
+    opt_metrics_summary_long = "--metrics-summary"
+    opt_metrics_interval_long = "--metrics-interval"
+    opt_profile_long = "--profile"
+    opt_trace_long = "--trace"
+
+    cache_kinds = ["playlist", "video", "stream"]
 
-    opt_string = "ho:u:b:v"
-    opt_long_array = ["help", "output-directory=", "url=", "bookmarks=", "verbose", "audio-only", "wav", "mp3", "netrc"]
+    opt_string = "ho:u:b:vj:"
+    opt_long_array = ["help", "output-directory=", "url=", "bookmarks=", "verbose", "audio-only", "wav", "mp3", "netrc", "jobs=", "extract-jobs=", "postprocess-jobs=", "queue-size=", "schedule=", "no-fair", "source-weight=", "no-cache", "refresh", "cache-dir=", "cache-ttl=", "cache-size=", "archive=", "no-archive", "rebuild-archive", "resume", "journal=", "no-journal", "nice=", "ffmpeg-threads=", "segments=", "segment-min-size=", "retries=", "adaptive", "max-jobs=", "limit-rate=", "limit-rate-per-transfer=", "limit-rate-file=", "metrics-file=", "metrics-summary=", "metrics-interval=", "profile=", "trace="]
 
     def __init__(self, argv):
         if argv is None or not argv:
@@ -69,6 +109,8 @@ class ArgumentParser:
         help_message += "     URL of the YouTube video to download\n"
         help_message += " -b, --bookmarks=BOOKMARKS_FILE\n"
         help_message += "     Bookmarks formatted file to extract YouTube urls from\n"
+        help_message += "     --rebuild-archive\n"
+        help_message += "     Record every video already in the output directory in the download archive\n"
         help_message += " -h, --help\n"
         help_message += "     Display help information\n"
 
@@ -80,6 +122,58 @@ class ArgumentParser:
         help_message += "     --mp3          audio-only but with output forced to mp3 format\n"
         help_message += "     --netrc        Use .netrc file for authentication\n"
         help_message += "     Entry must follow the format: machine youtube login <username> password <password>\n"
+        help_message += " -j, --jobs=N       Number of videos to download at the same time (default 1)\n"
+        help_message += "     --extract-jobs=N\n"
+        help_message += "                    Number of urls to extract video information from at the same time (default 1)\n"
+        help_message += "     --postprocess-jobs=N\n"
+        help_message += "                    Number of downloaded videos to run ffmpeg on at the same time (default number of CPU cores)\n"
+        help_message += "     --retries=N    Times to retry a video after a network error or throttling, waiting longer each time (default 3)\n"
+        help_message += "     --adaptive     Raise the number of extractions and downloads while they succeed and lower it when throttled\n"
+        help_message += "     --max-jobs=N   Most extractions or downloads at the same time with --adaptive (default 8)\n"
+        help_message += "     --nice=N       Run ffmpeg with its niceness raised by N so downloads keep priority (Linux only)\n"
+        help_message += "     --ffmpeg-threads=N\n"
+        help_message += "                    Maximum number of threads each ffmpeg run uses\n"
+        help_message += "     --segments=N   Download large files over N connections at once when the server supports it (default 1)\n"
+        help_message += "     --segment-min-size=MB\n"
+        help_message += "                    Smallest file to download over several connections (default 16)\n"
+        help_message += "     --limit-rate=RATE\n"
+        help_message += "                    Maximum total download rate across all transfers, e.g. 50K or 4.2M\n"
+        help_message += "     --limit-rate-per-transfer=RATE\n"
+        help_message += "                    Maximum download rate of each transfer\n"
+        help_message += "     --limit-rate-file=FILE\n"
+        help_message += "                    File holding the total rate limit, re-read when it changes or on SIGHUP\n"
+        help_message += "     --queue-size=N Number of videos waiting between each stage before earlier stages pause (default 16)\n"
+        help_message += "                    Up to 8 times as many wait to download unless --schedule=input and --no-fair are given\n"
+        help_message += "     --schedule=POLICY\n"
+        help_message += "                    Order to download videos in: input, shortest, largest or mixed (shortest first without starving long videos)\n"
+        help_message += "     --no-fair      Do not take turns between input files and bookmarks folders, or between their urls in input order\n"
+        help_message += "     --source-weight=SOURCE=N\n"
+        help_message += "                    Give an input file or bookmarks folder N turns for every turn of the others, e.g. urgent.txt=4\n"
+        help_message += "     --no-cache     Do not read or write the video information cache\n"
+        help_message += "     --refresh      Ignore cached video information but update the cache\n"
+        help_message += "     --cache-dir=CACHE_DIRECTORY\n"
+        help_message += "                    Directory for the video information cache (default ~/.cache/yget)\n"
+        help_message += "     --cache-ttl=KIND=SECONDS\n"
+        help_message += "                    Time to keep cached playlist, video or stream information, e.g. stream=3600\n"
+        help_message += "     --cache-size=MB\n"
+        help_message += "                    Maximum size of the video information cache (default 64)\n"
+        help_message += "     --archive=ARCHIVE_FILE\n"
+        help_message += "                    File recording downloaded videos (default OUTPUT_DIRECTORY/.yget-archive)\n"
+        help_message += "     --no-archive   Do not read or write the download archive\n"
+        help_message += "     --resume       Continue the videos recorded in the journal by an interrupted run\n"
+        help_message += "     --journal=JOURNAL_FILE\n"
+        help_message += "                    File recording the progress of each video (default OUTPUT_DIRECTORY/.yget-journal)\n"
+        help_message += "     --no-journal   Do not write the journal\n"
+        help_message += "     --metrics-file=FILE\n"
+        help_message += "                    Prometheus textfile rewritten with the progress of each stage while running\n"
+        help_message += "     --metrics-summary=FILE\n"
+        help_message += "                    JSON file written with the metrics of the whole run when it ends\n"
+        help_message += "     --metrics-interval=SECONDS\n"
+        help_message += "                    Time between rewrites of the metrics file (default 15)\n"
+        help_message += "     --profile=PROFILE_FILE\n"
+        help_message += "                    Write a cProfile dump of every stage and print the wall and CPU time of each\n"
+        help_message += "     --trace=TRACE_FILE\n"
+        help_message += "                    Write a timeline of every item in each stage and queue for chrome://tracing or Perfetto\n"
 
         return help_message
 
@@ -87,7 +181,7 @@ class ArgumentParser:
         try:
             opts, args = getopt.getopt(self.argv[1:], ArgumentParser.opt_string, ArgumentParser.opt_long_array)
         except getopt.GetoptError:
-            return (False, None, None, None)
+            return (False, None, None, None, None)
 
         mode = None
         output_directory = "."
@@ -96,15 +190,18 @@ class ArgumentParser:
         has_wav_option = False
         has_mp3_option = False
         has_netrc_option = False
+        settings = DownloadSettings()
 
         for o, a in opts:
             if o in (ArgumentParser.opt_help, ArgumentParser.opt_help_long):
                 mode = ("help", None)
-                return (True, mode, None, None)
+                return (True, mode, None, None, None)
             elif o in (ArgumentParser.opt_url, ArgumentParser.opt_url_long) and not mode:
                 mode = ("url", a.strip())
             elif o in (ArgumentParser.opt_bookmarks, ArgumentParser.opt_bookmarks_long) and not mode:
                 mode = ("bookmarks", a.strip())
+            elif o == ArgumentParser.opt_rebuild_archive_long and not mode:
+                mode = ("rebuild-archive", None)
             elif o in (ArgumentParser.opt_output_directory, ArgumentParser.opt_output_directory_long):
                 output_directory = a.strip()
             elif o in (ArgumentParser.opt_verbose, ArgumentParser.opt_verbose_long):
@@ -117,6 +214,115 @@ class ArgumentParser:
                 has_mp3_option = True
             elif o == ArgumentParser.opt_netrc_long:
                 has_netrc_option = True
+            elif o in (ArgumentParser.opt_jobs, ArgumentParser.opt_jobs_long, ArgumentParser.opt_extract_jobs_long, ArgumentParser.opt_postprocess_jobs_long, ArgumentParser.opt_queue_size_long, ArgumentParser.opt_ffmpeg_threads_long, ArgumentParser.opt_segments_long, ArgumentParser.opt_segment_min_size_long, ArgumentParser.opt_max_jobs_long):
+                number = ArgumentParser.parse_positive_integer(a)
+
+                if number is None:
+                    return (False, None, None, None, None)
+
+                if o in (ArgumentParser.opt_jobs, ArgumentParser.opt_jobs_long):
+                    settings.jobs = number
+                elif o == ArgumentParser.opt_extract_jobs_long:
+                    settings.extract_jobs = number
+                elif o == ArgumentParser.opt_postprocess_jobs_long:
+                    settings.postprocess_jobs = number
+                elif o == ArgumentParser.opt_queue_size_long:
+                    settings.queue_size = number
+                elif o == ArgumentParser.opt_ffmpeg_threads_long:
+                    settings.ffmpeg_threads = number
+                elif o == ArgumentParser.opt_segments_long:
+                    settings.segments = number
+                elif o == ArgumentParser.opt_segment_min_size_long:
+                    settings.segment_min_size = number * 1024 * 1024
+                elif o == ArgumentParser.opt_max_jobs_long:
+                    settings.max_jobs = number
+            elif o == ArgumentParser.opt_schedule_long:
+                if a.strip() not in DownloadScheduler.policies:
+                    return (False, None, None, None, None)
+
+                settings.schedule = a.strip()
+            elif o == ArgumentParser.opt_no_fair_long:
+                settings.fair = False
+            elif o == ArgumentParser.opt_source_weight_long:
+                source, _, weight = a.strip().rpartition("=")
+                weight = ArgumentParser.parse_positive_integer(weight)
+
+                if not source or weight is None:
+                    return (False, None, None, None, None)
+
+                settings.source_weights[source] = weight
+            elif o == ArgumentParser.opt_retries_long:
+                retries = 0 if a.strip() == "0" else ArgumentParser.parse_positive_integer(a)
+
+                if retries is None:
+                    return (False, None, None, None, None)
+
+                settings.retries = retries
+            elif o == ArgumentParser.opt_adaptive_long:
+                settings.adaptive = True
+            elif o == ArgumentParser.opt_nice_long:
+                nice = ArgumentParser.parse_positive_integer(a)
+
+                if nice is None or nice > 19:
+                    return (False, None, None, None, None)
+
+                settings.nice = nice
+            elif o in (ArgumentParser.opt_limit_rate_long, ArgumentParser.opt_limit_rate_per_transfer_long):
+                rate = RateLimiter.parse_rate(a)
+
+                if rate is None:
+                    return (False, None, None, None, None)
+
+                if o == ArgumentParser.opt_limit_rate_long:
+                    settings.limit_rate = rate
+                else:
+                    settings.limit_rate_per_transfer = rate
+            elif o == ArgumentParser.opt_limit_rate_file_long:
+                settings.limit_rate_file = a.strip()
+            elif o == ArgumentParser.opt_no_cache_long:
+                settings.use_cache = False
+            elif o == ArgumentParser.opt_refresh_long:
+                settings.refresh_cache = True
+            elif o == ArgumentParser.opt_cache_directory_long:
+                settings.cache_directory = a.strip()
+            elif o == ArgumentParser.opt_cache_ttl_long:
+                kind, _, seconds = a.strip().partition("=")
+                seconds = ArgumentParser.parse_positive_integer(seconds)
+
+                if kind not in ArgumentParser.cache_kinds or seconds is None:
+                    return (False, None, None, None, None)
+
+                settings.cache_ttls[kind] = seconds
+            elif o == ArgumentParser.opt_cache_size_long:
+                megabytes = ArgumentParser.parse_positive_integer(a)
+
+                if megabytes is None:
+                    return (False, None, None, None, None)
+
+                settings.cache_size = megabytes * 1024 * 1024
+            elif o == ArgumentParser.opt_archive_long:
+                settings.archive_file = a.strip()
+            elif o == ArgumentParser.opt_no_archive_long:
+                settings.use_archive = False
+            elif o == ArgumentParser.opt_resume_long:
+                settings.resume = True
+            elif o == ArgumentParser.opt_journal_long:
+                settings.journal_file = a.strip()
+            elif o == ArgumentParser.opt_no_journal_long:
+                settings.use_journal = False
+            elif o == ArgumentParser.opt_metrics_file_long:
+                settings.metrics_file = a.strip()
+            elif o == ArgumentParser.opt_metrics_summary_long:
+                settings.metrics_summary_file = a.strip()
+            elif o == ArgumentParser.opt_metrics_interval_long:
+                settings.metrics_interval = ArgumentParser.parse_positive_integer(a)
+
+                if settings.metrics_interval is None:
+                    return (False, None, None, None, None)
+            elif o == ArgumentParser.opt_profile_long:
+                settings.profile_file = a.strip()
+            elif o == ArgumentParser.opt_trace_long:
+                settings.trace_file = a.strip()
 
         if mode is None and args and len(args) == 1 and args[0] == "-":
             mode = ("files", [])
@@ -125,4 +331,16 @@ class ArgumentParser:
         elif mode is None:
             mode = ("files", [])
 
-        return (True, mode, output_directory, (has_verbose_option, has_audio_only_option, has_wav_option, has_mp3_option, has_netrc_option))
+        return (True, mode, output_directory, (has_verbose_option, has_audio_only_option, has_wav_option, has_mp3_option, has_netrc_option), settings)
+
+    @staticmethod
+    def parse_positive_integer(value):
+        try:
+            number = int(value.strip())
+        except ValueError:
+            return None
+
+        if number < 1:
+            return None
+
+        return number
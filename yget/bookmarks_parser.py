@@ -1,15 +1,17 @@
+import html
 import io
-import re
 
 from collections import deque
 from xml import etree
 
+from .url_canonicalizer import UrlCanonicalizer
+
 class BookmarksParser(object):
     def __init__(self, input_provider, logger):
         self.input_provider = input_provider
         self.logger = logger
 
-        self.youtube_url_regex = re.compile("youtube..*/(watch|playlist)?")
+        self.url_sources = None
 
     def parse(self, bookmarks_file_data):
         # Force valid XML
@@ -114,6 +116,7 @@ class BookmarksParser(object):
             self.logger.write_empty_line()
 
         urls = []
+        self.url_sources = []
 
         if get_urls:
             folders = deque([breadcrumbs[-1]])
@@ -122,13 +125,21 @@ class BookmarksParser(object):
                 folder = folders.popleft()
 
                 for link in folder["links"]:
-                    if self.youtube_url_regex.search(link):
-                        urls.append(link)
+                    # Links keep the escaping of the bookmarks file
+                    kind, id = UrlCanonicalizer.classify(html.unescape(link))
+
+                    if kind is not None:
+                        urls.append(UrlCanonicalizer.make_url(kind, id))
+                        self.url_sources.append(folder["name"])
 
                 folders.extend(folder["folders"])
 
         return (True, urls)
 
+    def get_url_sources(self):
+        # The folder each url from the last parse came from
+        return self.url_sources
+
     def create_bookmarks(self, bookmarks_file_data):
         root = etree.ElementTree.fromstring(bookmarks_file_data)
 
@@ -0,0 +1,110 @@
+import threading
+import time
+
+class ConcurrencyController(object):
+    throttle_markers = ("HTTP Error 429", "HTTP Error 403", "Too Many Requests")
+    throughput_smoothing = 0.3
+    throughput_drop = 0.5
+    cooldown = 5.0
+
+    def __init__(self, name, initial, maximum, minimum=1, clock=time.monotonic, log=print):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.clock = clock
+        self.log = log
+
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.in_flight = 0
+        self.successes = 0
+        self.throughput = None
+        self.best_throughput = None
+        self.last_decrease = None
+
+        self.condition = threading.Condition()
+
+    @staticmethod
+    def is_throttled(error):
+        return any(marker in str(error) for marker in ConcurrencyController.throttle_markers)
+
+    def acquire(self):
+        with self.condition:
+            while self.in_flight >= self.limit:
+                self.condition.wait()
+
+            self.in_flight += 1
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+
+    def record_success(self, throughput=None):
+        with self.condition:
+            if throughput is not None:
+                if self.throughput is None:
+                    self.throughput = float(throughput)
+                else:
+                    self.throughput += ConcurrencyController.throughput_smoothing * (throughput - self.throughput)
+
+                if self.best_throughput is None or self.throughput > self.best_throughput:
+                    self.best_throughput = self.throughput
+
+                # More parallel transfers only help while each one keeps most of its speed
+                if self.throughput < self.best_throughput * ConcurrencyController.throughput_drop and self.limit > self.minimum and not self.is_cooling_down():
+                    self.decrease(self.limit - 1, "per-transfer throughput fell to {:.0f} B/s from {:.0f} B/s".format(self.throughput, self.best_throughput))
+                    self.best_throughput = self.throughput
+                    return
+
+            self.successes += 1
+
+            # Additive increase once every slot at the current limit has succeeded
+            if self.successes >= self.limit and self.limit < self.maximum:
+                self.set_limit(self.limit + 1, "{} successes in a row".format(self.successes))
+
+    def record_throttled(self, reason):
+        with self.condition:
+            self.successes = 0
+
+            # Requests already in flight when the first throttle arrived report it too
+            if self.is_cooling_down():
+                self.log("[{}] concurrency stays at {}: throttled again within {:.0f}s ({})".format(self.name, self.limit, ConcurrencyController.cooldown, reason))
+                return
+
+            self.decrease(max(self.limit // 2, self.minimum), "throttled ({})".format(reason))
+
+    def is_cooling_down(self):
+        return self.last_decrease is not None and self.clock() - self.last_decrease < ConcurrencyController.cooldown
+
+    def decrease(self, limit, reason):
+        self.last_decrease = self.clock()
+
+        if limit == self.limit:
+            self.successes = 0
+            self.log("[{}] concurrency stays at minimum {}: {}".format(self.name, self.limit, reason))
+            return
+
+        self.set_limit(limit, reason)
+
+    def set_limit(self, limit, reason):
+        previous_limit = self.limit
+
+        self.limit = limit
+        self.successes = 0
+
+        self.log("[{}] concurrency {} -> {}: {}".format(self.name, previous_limit, limit, reason))
+
+        self.condition.notify_all()
+
+class NullConcurrencyController(object):
+    def acquire(self):
+        pass
+
+    def release(self):
+        pass
+
+    def record_success(self, throughput=None):
+        pass
+
+    def record_throttled(self, reason):
+        pass
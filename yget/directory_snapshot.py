@@ -0,0 +1,69 @@
+import os
+import threading
+
+from collections import Counter
+
+class DirectorySnapshot(object):
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+        self.lock = threading.Lock()
+
+        self.names = set()
+        self.extensions = {}
+
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                self.add_name(entry.name)
+
+    @staticmethod
+    def get_prefixes(name):
+        # Every prefix before a "." so a lookup answers the same question as glob(root + ".*")
+        i = name.find(".")
+
+        while i != -1:
+            yield name[:i]
+            i = name.find(".", i + 1)
+
+    def add_name(self, name):
+        if name in self.names:
+            return
+
+        self.names.add(name)
+
+        _, extension = os.path.splitext(name)
+
+        for prefix in DirectorySnapshot.get_prefixes(name):
+            self.extensions.setdefault(prefix, Counter())[extension] += 1
+
+    def remove_name(self, name):
+        if name not in self.names:
+            return
+
+        self.names.remove(name)
+
+        _, extension = os.path.splitext(name)
+
+        for prefix in DirectorySnapshot.get_prefixes(name):
+            counts = self.extensions[prefix]
+            counts[extension] -= 1
+
+            if counts[extension] == 0:
+                del counts[extension]
+
+            if not counts:
+                del self.extensions[prefix]
+
+    def covers(self, path):
+        return os.path.dirname(os.path.abspath(path)) == self.directory
+
+    def get_extensions(self, root):
+        with self.lock:
+            return set(self.extensions.get(os.path.basename(root), ()))
+
+    def add(self, path):
+        with self.lock:
+            self.add_name(os.path.basename(path))
+
+    def remove(self, path):
+        with self.lock:
+            self.remove_name(os.path.basename(path))
@@ -0,0 +1,90 @@
+import os
+import re
+import threading
+
+class DownloadArchive(object):
+    file_name = ".yget-archive"
+    default_extractor = "youtube"
+
+    # Matches the "%(title)s (%(id)s).%(ext)s" output template
+    library_file_regex = re.compile(r"\((?P<id>[0-9A-Za-z_-]{11})\)\.(?P<ext>[0-9A-Za-z]+)$")
+    incomplete_extensions = ("part", "ytdl", "temp")
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.keys = set()
+
+        self.load()
+
+    @staticmethod
+    def get_default_path(output_directory):
+        return os.path.join(output_directory, DownloadArchive.file_name)
+
+    @staticmethod
+    def make_key(video_id, extractor=None):
+        # Same "<extractor> <id>" lines as youtube_dl's --download-archive so either tool can read the file
+        return "{} {}".format((extractor or DownloadArchive.default_extractor).lower(), video_id)
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path) as f:
+            for line in f:
+                line = line.strip()
+
+                if line:
+                    self.keys.add(line)
+
+    def contains(self, video_id, extractor=None):
+        return DownloadArchive.make_key(video_id, extractor) in self.keys
+
+    def add(self, video_id, extractor=None):
+        key = DownloadArchive.make_key(video_id, extractor)
+
+        with self.lock:
+            if key in self.keys:
+                return
+
+            # A single appended line is written whole so an interrupted run never leaves a partial id
+            with open(self.path, "a") as f:
+                f.write(key + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self.keys.add(key)
+
+    def rebuild(self, directory):
+        keys = set()
+
+        for name in os.listdir(directory):
+            match = DownloadArchive.library_file_regex.search(name)
+
+            if match is None or match.group("ext").lower() in DownloadArchive.incomplete_extensions:
+                continue
+
+            keys.add(DownloadArchive.make_key(match.group("id")))
+
+        temporary_path = self.path + ".tmp"
+
+        with open(temporary_path, "w") as f:
+            for key in sorted(keys):
+                f.write(key + "\n")
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temporary_path, self.path)
+
+        with self.lock:
+            self.keys = keys
+
+        return len(keys)
+
+class NullDownloadArchive(object):
+    def contains(self, video_id, extractor=None):
+        return False
+
+    def add(self, video_id, extractor=None):
+        pass
@@ -0,0 +1,161 @@
+import collections
+import heapq
+import queue
+import time
+
+from .pipeline import PipelineStage
+
+class ScheduledSource(object):
+    def __init__(self, weight):
+        self.weight = weight
+        self.current_weight = 0
+        self.jobs = collections.OrderedDict()
+
+class DownloadScheduler(queue.Queue):
+    policy_input = "input"
+    policy_shortest = "shortest"
+    policy_largest = "largest"
+    policy_mixed = "mixed"
+    policies = [policy_input, policy_shortest, policy_largest, policy_mixed]
+
+    # Under the mixed policy an item waiting this long goes next whatever its size
+    starvation_seconds = 600.0
+
+    def __init__(self, policy, get_size, maxsize=0, get_source=None, weights=None, clock=time.monotonic):
+        if policy not in DownloadScheduler.policies:
+            raise ValueError("policy must be one of {}".format(", ".join(DownloadScheduler.policies)))
+
+        self.policy = policy
+        self.get_size = get_size
+        self.get_source = get_source or (lambda item: (None, None))
+        self.weights = weights or {}
+        self.clock = clock
+
+        super(DownloadScheduler, self).__init__(maxsize)
+
+    # queue.Queue calls these with its lock held, the same way PriorityQueue changes the ordering
+    def _init(self, maxsize):
+        self.sources = collections.OrderedDict()
+        self.arrivals = []
+        self.stop_items = []
+        self.sequence = 0
+        self.count = 0
+
+    def _qsize(self):
+        return self.count
+
+    def _put(self, item):
+        self.count += 1
+
+        # Workers are only told to stop once every real item has been handed out
+        if item is PipelineStage.stop_item:
+            self.stop_items.append(item)
+            return
+
+        self.sequence += 1
+
+        source_key, job_key = self.get_source(item)
+
+        # The urls of a source only take turns in input order, any other policy orders all of its items together
+        if self.policy != DownloadScheduler.policy_input:
+            job_key = None
+
+        if source_key not in self.sources:
+            self.sources[source_key] = ScheduledSource(self.weights.get(source_key, 1))
+
+        source = self.sources[source_key]
+        entry = [self.get_key(item), self.sequence, self.clock(), item, False, source_key, job_key]
+
+        heapq.heappush(source.jobs.setdefault(job_key, []), entry)
+
+        if self.policy == DownloadScheduler.policy_mixed:
+            heapq.heappush(self.arrivals, (entry[1], entry))
+
+    def _get(self):
+        self.count -= 1
+
+        entry = self.pop_starved() or self.pop_next()
+
+        if entry is None:
+            return self.stop_items.pop()
+
+        return entry[3]
+
+    def pop_starved(self):
+        if self.policy != DownloadScheduler.policy_mixed:
+            return None
+
+        # Entries already taken through their source are dropped lazily
+        while self.arrivals and self.arrivals[0][1][4]:
+            heapq.heappop(self.arrivals)
+
+        if not self.arrivals or self.clock() - self.arrivals[0][1][2] < DownloadScheduler.starvation_seconds:
+            return None
+
+        entry = heapq.heappop(self.arrivals)[1]
+        entry[4] = True
+
+        self.remove_taken(entry[5], entry[6])
+
+        return entry
+
+    def pop_next(self):
+        source = self.select_source()
+
+        if source is None:
+            return None
+
+        # Each url of a source takes its turn, so one long playlist does not hold back the urls after it
+        job_key, heap = next(iter(source.jobs.items()))
+        entry = heapq.heappop(heap)
+        entry[4] = True
+
+        source.jobs.move_to_end(job_key)
+        self.remove_taken(entry[5], job_key)
+
+        return entry
+
+    def select_source(self):
+        if not self.sources:
+            return None
+
+        # Smooth weighted round robin spreads a source's turns out instead of taking them in a burst
+        total_weight = 0
+        selected = None
+
+        for source in self.sources.values():
+            source.current_weight += source.weight
+            total_weight += source.weight
+
+            if selected is None or source.current_weight > selected.current_weight:
+                selected = source
+
+        selected.current_weight -= total_weight
+
+        return selected
+
+    def remove_taken(self, source_key, job_key):
+        # Keeps every heap topped by an entry still waiting so sources and urls with nothing left drop out
+        source = self.sources[source_key]
+        heap = source.jobs[job_key]
+
+        while heap and heap[0][4]:
+            heapq.heappop(heap)
+
+        if not heap:
+            del source.jobs[job_key]
+
+        if not source.jobs:
+            del self.sources[source_key]
+
+    def get_key(self, item):
+        if self.policy == DownloadScheduler.policy_input:
+            return (0, 0)
+
+        size = self.get_size(item)
+
+        # Items of unknown size wait behind the ones that can be ordered
+        if size is None:
+            return (1, 0)
+
+        return (0, -size if self.policy == DownloadScheduler.policy_largest else size)
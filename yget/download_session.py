@@ -0,0 +1,61 @@
+import youtube_dl
+
+from .postprocessors import Postprocessors
+
+class DownloadSession(object):
+    authentication_keys = ("username", "password")
+
+    def __init__(self, download_options):
+        self.download_options = download_options
+        self.youtube_downloader = DownloadSession.create_youtube_downloader(download_options)
+
+    def __enter__(self):
+        self.youtube_downloader.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self.youtube_downloader.__exit__(*args)
+
+    @staticmethod
+    def create_youtube_downloader(download_options):
+        # youtube_dl only knows its own postprocessors so they are added here instead of through the params
+        params = dict(download_options)
+        postprocessors = params.pop("postprocessors", [])
+
+        youtube_downloader = youtube_dl.YoutubeDL(params)
+
+        DownloadSession.set_postprocessors(youtube_downloader, postprocessors)
+
+        return youtube_downloader
+
+    @staticmethod
+    def set_postprocessors(youtube_downloader, postprocessors):
+        youtube_downloader._pps = []
+
+        for postprocessor_options in postprocessors:
+            postprocessor_options = dict(postprocessor_options)
+            postprocessor_class = Postprocessors.get_postprocessor(postprocessor_options.pop("key"))
+
+            youtube_downloader.add_post_processor(postprocessor_class(youtube_downloader, **postprocessor_options))
+
+    def apply_options(self, download_options):
+        # Extractors log in once when first used so new credentials need a fresh YoutubeDL
+        if any(download_options.get(key) != self.download_options.get(key) for key in DownloadSession.authentication_keys):
+            self.youtube_downloader.__exit__(None, None, None)
+
+            self.download_options = download_options
+            self.youtube_downloader = DownloadSession.create_youtube_downloader(download_options)
+            self.youtube_downloader.__enter__()
+
+            return
+
+        params = self.youtube_downloader.params
+        params["format"] = download_options.get("format")
+        params["postprocessor_args"] = download_options.get("postprocessor_args")
+
+        postprocessors = download_options.get("postprocessors", [])
+
+        if postprocessors != self.download_options.get("postprocessors", []):
+            DownloadSession.set_postprocessors(self.youtube_downloader, postprocessors)
+
+        self.download_options = download_options
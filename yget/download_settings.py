@@ -0,0 +1,65 @@
+class DownloadSettings(object):
+    default_jobs = 1
+    default_extract_jobs = 1
+    default_postprocess_jobs = None
+    default_queue_size = 16
+    default_schedule = "input"
+    default_fair = True
+    default_use_cache = True
+    default_refresh_cache = False
+    default_cache_directory = None
+    default_cache_size = 64 * 1024 * 1024
+    default_use_archive = True
+    default_archive_file = None
+    default_use_journal = True
+    default_journal_file = None
+    default_resume = False
+    default_nice = None
+    default_ffmpeg_threads = None
+    default_segments = 1
+    default_segment_min_size = 16 * 1024 * 1024
+    default_retries = 3
+    default_adaptive = False
+    default_max_jobs = 8
+    default_limit_rate = None
+    default_limit_rate_per_transfer = None
+    default_limit_rate_file = None
+    default_metrics_file = None
+    default_metrics_summary_file = None
+    default_metrics_interval = 15
+    default_profile_file = None
+    default_trace_file = None
+
+    def __init__(self):
+        self.jobs = DownloadSettings.default_jobs
+        self.extract_jobs = DownloadSettings.default_extract_jobs
+        self.postprocess_jobs = DownloadSettings.default_postprocess_jobs
+        self.queue_size = DownloadSettings.default_queue_size
+        self.schedule = DownloadSettings.default_schedule
+        self.fair = DownloadSettings.default_fair
+        self.source_weights = {}
+        self.use_cache = DownloadSettings.default_use_cache
+        self.refresh_cache = DownloadSettings.default_refresh_cache
+        self.cache_directory = DownloadSettings.default_cache_directory
+        self.cache_ttls = {}
+        self.cache_size = DownloadSettings.default_cache_size
+        self.use_archive = DownloadSettings.default_use_archive
+        self.archive_file = DownloadSettings.default_archive_file
+        self.use_journal = DownloadSettings.default_use_journal
+        self.journal_file = DownloadSettings.default_journal_file
+        self.resume = DownloadSettings.default_resume
+        self.nice = DownloadSettings.default_nice
+        self.ffmpeg_threads = DownloadSettings.default_ffmpeg_threads
+        self.segments = DownloadSettings.default_segments
+        self.segment_min_size = DownloadSettings.default_segment_min_size
+        self.retries = DownloadSettings.default_retries
+        self.adaptive = DownloadSettings.default_adaptive
+        self.max_jobs = DownloadSettings.default_max_jobs
+        self.limit_rate = DownloadSettings.default_limit_rate
+        self.limit_rate_per_transfer = DownloadSettings.default_limit_rate_per_transfer
+        self.limit_rate_file = DownloadSettings.default_limit_rate_file
+        self.metrics_file = DownloadSettings.default_metrics_file
+        self.metrics_summary_file = DownloadSettings.default_metrics_summary_file
+        self.metrics_interval = DownloadSettings.default_metrics_interval
+        self.profile_file = DownloadSettings.default_profile_file
+        self.trace_file = DownloadSettings.default_trace_file
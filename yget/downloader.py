@@ -1,23 +1,48 @@
 import glob
 import os
+import signal
+import sqlite3
 import sys
+import threading
+import time
 import youtube_dl
 
+from .concurrency_controller import ConcurrencyController, NullConcurrencyController
+from .download_archive import DownloadArchive, NullDownloadArchive
+from .directory_snapshot import DirectorySnapshot
+from .download_scheduler import DownloadScheduler
+from .download_session import DownloadSession
+from .error_classifier import ErrorClassifier
+from .job_journal import JobJournal, NullJobJournal
+from .metadata_cache import MetadataCache, NullMetadataCache
+from .metrics import Metrics, NullMetrics
+from .pipeline import Pipeline, PipelineStage, RetryLater
+from .postprocessors import Postprocessors
+from .progress_renderer import ProgressRenderer, NullProgressRenderer
+from .rate_limiter import RateLimiter
+from .retry_scheduler import RetryScheduler
+from .segmented_downloader import SegmentedDownloader
+from .stage_profiler import StageProfiler, NullStageProfiler
+from .stream_urls import StreamUrls
+from .trace_recorder import TraceRecorder, NullTraceRecorder
+from .url_canonicalizer import UrlCanonicalizer
+
 class DownloadLogger(object):
-    def __init__(self, verbose):
+    def __init__(self, verbose, log=print):
         self.verbose = verbose
+        self.log = log
 
     def debug(self, msg):
         if self.verbose:
-            print(msg)
+            self.log(msg)
 
     def warning(self, msg):
         if self.verbose:
-            print(msg)
+            self.log(msg)
 
     def error(self, msg):
         if self.verbose:
-            print(msg)
+            self.log(msg)
 
 class DownloaderOptionsBuilder:
     default_download_options = {
@@ -28,15 +53,34 @@ class DownloaderOptionsBuilder:
     }
     default_output_directory = "."
 
+    # Prefer an audio only stream and fall back to the best combined stream when there is none
+    audio_format = "bestaudio/best"
+
     def __init__(self):
-        self.download_options = DownloaderOptionsBuilder.default_download_options
+        self.download_options = DownloaderOptionsBuilder.default_download_options.copy()
         self.output_directory = DownloaderOptionsBuilder.default_output_directory
+        self.audio_only = False
+        self.ffmpeg_threads = None
 
     def make_download_options(self):
         options = self.download_options.copy()
         options["outtmpl"] = os.path.join(self.output_directory, options["outtmpl"])
+
+        if self.ffmpeg_threads is not None:
+            options["postprocessor_args"] = options.get("postprocessor_args", []) + ["-threads", str(self.ffmpeg_threads)]
+
         return options
 
+    def make_transfer_options(self):
+        options = self.make_download_options()
+        options["postprocessors"] = []
+        # Fixups are ffmpeg runs too, so the postprocess stage adds them once instead
+        options["fixup"] = "never"
+        return options
+
+    def get_format(self):
+        return self.download_options["format"]
+
     def set_output_directory(self, output_directory):
         self.output_directory = output_directory
 
@@ -47,29 +91,42 @@ class DownloaderOptionsBuilder:
     def set_progress_hook(self, progress_hook):
         self.download_options["progress_hooks"] = [progress_hook]
 
+    def add_progress_hook(self, progress_hook):
+        self.download_options["progress_hooks"] = self.download_options.get("progress_hooks", []) + [progress_hook]
+
     def set_logger(self, logger):
         self.download_options["logger"] = logger
 
     def set_audio_only(self):
+        self.download_options["format"] = DownloaderOptionsBuilder.audio_format
+        # Extracts the audio and writes the tags in a single ffmpeg run
         self.download_options["postprocessors"] = [{
-            'key': 'FFmpegExtractAudio',
+            'key': 'FFmpegExtractAudioMetadata',
             'preferredcodec': "best"
-        },
-        {'key': 'FFmpegMetadata'}]
+        }]
+        self.audio_only = True
 
     def set_wav(self):
+        self.download_options["format"] = DownloaderOptionsBuilder.audio_format
         self.download_options["postprocessors"] = [{
-            'key': 'FFmpegExtractAudio',
+            'key': 'FFmpegExtractAudioMetadata',
             'preferredcodec': "wav"
-        },
-        {'key': 'FFmpegMetadata'}]
+        }]
+        self.audio_only = True
 
     def set_mp3(self):
+        self.download_options["format"] = DownloaderOptionsBuilder.audio_format
         self.download_options["postprocessors"] = [{
-            'key': 'FFmpegExtractAudio',
+            'key': 'FFmpegExtractAudioMetadata',
             'preferredcodec': "mp3"
-        },
-        {'key': 'FFmpegMetadata'}]
+        }]
+        self.audio_only = True
+
+    def set_ffmpeg_threads(self, ffmpeg_threads):
+        self.ffmpeg_threads = ffmpeg_threads
+
+    def set_rate_limit(self, rate_limit):
+        self.download_options["ratelimit"] = rate_limit
 
     def set_use_netrc(self):
         self.download_options["usenetrc"] = True
@@ -77,176 +134,980 @@ class DownloaderOptionsBuilder:
     def set_album(self, album):
         self.download_options["postprocessor_args"] = ["-metadata", "album={}".format(album)]
 
+class DownloadCounters(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.bytes_saved = 0
+
+    def add_downloaded(self):
+        with self.lock:
+            self.downloaded += 1
+
+    def add_skipped(self):
+        with self.lock:
+            self.skipped += 1
+
+    def add_failed(self):
+        with self.lock:
+            self.failed += 1
+
+    def add_duplicate(self):
+        with self.lock:
+            self.duplicates += 1
+
+    def add_bytes_saved(self, bytes_saved):
+        with self.lock:
+            self.bytes_saved += bytes_saved
+
+class DownloadJob(object):
+    def __init__(self, url, download_options, should_request_authentication):
+        self.url = url
+        self.download_options = download_options
+        self.should_request_authentication = should_request_authentication
+        self.has_requested_authentication = False
+        self.attempts = 0
+        self.resumed = None
+        self.emitted_ids = set()
+        self.source = None
+        self.listing = None
+        self.queued = 0
+
+class DownloadListing(object):
+    def __init__(self, info, entries, is_cached):
+        self.info = info
+        self.entries = entries
+        self.is_cached = is_cached
+        self.index = 0
+        self.infos = []
+
+class DownloadItem(object):
+    def __init__(self, job, info):
+        self.job = job
+        self.info = info
+        self.filename = None
+        self.refreshed = False
+        self.attempts = 0
+        self.state = None
+        self.started = False
+
 class Downloader:
-    def __init__(self, output_directory, verbose, use_netrc, authentication_provider):
-        self.started_download = False
+    nominal_byte_rate = 125000
+    scheduling_window = 8
+    latency_buckets = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+    throughput_buckets = (64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024)
+    playlist_extractors = ("YoutubeTab", "YoutubePlaylist", "YoutubeYtUser", "YoutubeFavourites", "YoutubeHistory", "YoutubeRecommended", "YoutubeSubscriptions", "YoutubeWatchLater")
 
+    def __init__(self, output_directory, verbose, use_netrc, settings, authentication_provider):
         self.output_directory = output_directory
         self.verbose = verbose
         self.use_netrc = use_netrc
+        self.settings = settings
 
         self.authentication_provider = authentication_provider
+        self.metadata_cache = NullMetadataCache()
+        self.download_archive = NullDownloadArchive()
+        self.job_journal = NullJobJournal()
+        self.directory_snapshot = None
+        self.rate_limiter = RateLimiter()
+        self.transfer_bytes = {}
+        self.extract_controller = NullConcurrencyController()
+        self.download_controller = NullConcurrencyController()
+        self.retry_scheduler = RetryScheduler()
+        self.scheduled_ids = set()
+        self.get_waiting_jobs = lambda: 0
+        self.progress_renderer = NullProgressRenderer()
+        self.metrics = NullMetrics()
+        self.tracer = NullTraceRecorder()
+
+        self.authentication_lock = threading.Lock()
+        self.rate_lock = threading.Lock()
+        self.schedule_lock = threading.Lock()
 
     def create_download_options(self):
         download_options = DownloaderOptionsBuilder()
         download_options.set_output_directory(self.output_directory)
         download_options.set_progress_hook(self.download_status)
-        download_options.set_logger(DownloadLogger(self.verbose))
+        download_options.add_progress_hook(self.limit_rate)
+        download_options.set_logger(DownloadLogger(self.verbose, self.log))
 
         if self.use_netrc:
             download_options.set_use_netrc()
 
         return download_options
 
-    def download_videos(self, urls, audio_only=False, wav=False, mp3=False):
-        downloaded = 0
-        skipped = 0
-        failed = 0
-
+    def download_videos(self, urls, audio_only=False, wav=False, mp3=False, sources=None):
+        counters = DownloadCounters()
         authentication_params = {}
 
-        for url in urls:
-            should_request_authentication = not self.use_netrc
-            has_requested_authentication = False
+        resumed_jobs = self.load_job_journal()
 
-            download_options = self.create_download_options()
+        jobs = []
+        job_keys = set()
 
-            if wav:
-                download_options.set_wav()
-            elif mp3:
-                download_options.set_mp3()
-            elif audio_only:
-                download_options.set_audio_only()
+        self.scheduled_ids = set()
 
-            album = None
-            infos = []
+        for url, source in zip(urls, sources or [None] * len(urls)):
+            # The same video linked from several inputs is only extracted once
+            key = UrlCanonicalizer.get_key(url)
 
-            while True:
-                if authentication_params:
-                    download_options.set_authentication_params(authentication_params)
+            if key in job_keys:
+                counters.add_duplicate()
+                continue
 
-                try:
-                    with youtube_dl.YoutubeDL(download_options.make_download_options()) as youtube_downloader:
-                        info = youtube_downloader.extract_info(url, download=False)
+            job_keys.add(key)
 
-                        # Set album to playlist title
-                        if "entries" in info:
-                            album = info["title"]
+            job = DownloadJob(url, self.create_media_download_options(audio_only, wav, mp3), not self.use_netrc)
+            job.resumed = resumed_jobs.get(url)
+            job.source = source
 
-                            for entry in info["entries"]:
-                                infos.append(entry)
-                        else:
-                            album = "YouTube"
+            jobs.append(job)
 
-                            infos.append(info)
+        if self.settings.nice is not None and not sys.platform.startswith("linux"):
+            print("--nice is only supported on Linux, ffmpeg will run at normal priority")
 
-                        download_options.set_album(album)
+        session_options = self.create_media_download_options(audio_only, wav, mp3)
 
-                        break
-                except youtube_dl.utils.DownloadError as e:
-                    if "Please sign in to view this video" in str(e) or "Please enter your password" in str(e):
-                        print("({}, {}) {}".format(url, None, str(e)))
-                        if should_request_authentication and not has_requested_authentication:
+        extract_controller = self.create_concurrency_controller("extract", self.settings.extract_jobs)
+        download_controller = self.create_concurrency_controller("download", self.settings.jobs)
 
-                            has_requested_authentication = True
+        download_stage = PipelineStage("download", self.get_worker_count(self.settings.jobs),
+            lambda item, emit, session: self.download_video(session, item, authentication_params, counters, emit),
+            self.get_download_queue_size(),
+            lambda: DownloadSession(session_options.make_transfer_options()),
+            download_controller,
+            self.create_download_scheduler,
+            failure_handler=lambda item, error: self.fail_drained("download", item.job.url, item.info["id"], error, counters))
 
-                            if not self.authentication_provider.request_authentication_parameters(authentication_params):
-                                break
+        extract_stage = PipelineStage("extract", self.get_worker_count(self.settings.extract_jobs),
+            lambda job, emit, session: self.extract_videos(session, job, authentication_params, counters, emit),
+            self.settings.queue_size,
+            lambda: DownloadSession(session_options.make_transfer_options()),
+            extract_controller,
+            failure_handler=lambda job, error: self.fail_drained("extract", job.url, None, error, counters))
 
-                            continue
+        stages = [
+            extract_stage,
+            download_stage,
+            # Unbounded so finished transfers never wait for ffmpeg before the next download starts
+            PipelineStage("postprocess", self.get_postprocess_jobs(),
+                lambda item, emit, session: self.postprocess_video(session, item, counters),
+                0,
+                lambda: self.create_postprocess_session(session_options),
+                failure_handler=lambda item, error: self.fail_drained("postprocess", item.job.url, item.info["id"], error, counters))
+        ]
 
-                    print("({}, {}) {}".format(url, None, str(e)))
+        profiler = self.create_stage_profiler()
+        self.tracer = self.create_trace_recorder()
 
-                    break
-                except Exception as e:
-                    print("({}, {}) {}".format(url, None, str(e)))
+        pipeline = Pipeline(stages, profiler, self.tracer)
 
-                    break
+        self.metadata_cache = self.create_metadata_cache()
+        self.download_archive = self.create_download_archive()
+        self.job_journal = self.create_job_journal()
 
-            if not infos:
-                failed += 1
-                continue
+        # Written ahead of any work so a killed run knows every url it was given
+        for job in jobs:
+            if job.resumed is None:
+                self.job_journal.add_job(job.url)
+
+        # One directory listing up front instead of a glob per video
+        self.directory_snapshot = DirectorySnapshot(self.output_directory)
+
+        self.rate_limiter = RateLimiter(self.settings.limit_rate, self.settings.limit_rate_file)
+        self.get_waiting_jobs = extract_stage.queue.qsize
+        self.extract_controller = extract_controller or NullConcurrencyController()
+        self.download_controller = download_controller or NullConcurrencyController()
+        self.retry_scheduler = RetryScheduler(self.settings.retries + 1)
+        previous_signal_handler = self.install_reload_signal()
+
+        # Progress from every transfer is drawn together a few times a second instead of on every chunk
+        self.progress_renderer = ProgressRenderer(
+            get_queued=lambda: download_stage.queue.qsize() + download_stage.pending_retries,
+            get_rate_limit=lambda: self.rate_limiter.get_rate())
+        self.progress_renderer.start()
+
+        self.metrics = self.create_metrics(counters, stages)
+        self.metrics.start()
+
+        profiler.start()
+
+        try:
+            pipeline.run(jobs)
+
+            # Nothing is left to resume once every video has been handled
+            if counters.failed == 0:
+                self.job_journal.remove()
+        finally:
+            profile_table = profiler.stop()
+
+            self.tracer.write()
+            self.tracer = NullTraceRecorder()
+
+            self.metrics.stop()
+            self.metrics = NullMetrics()
+
+            self.progress_renderer.stop()
+            self.progress_renderer = NullProgressRenderer()
+
+            self.job_journal.close()
+            self.job_journal = NullJobJournal()
+            self.metadata_cache.close()
+            self.metadata_cache = NullMetadataCache()
+            self.download_archive = NullDownloadArchive()
+            self.directory_snapshot = None
+
+            if previous_signal_handler is not None:
+                signal.signal(signal.SIGHUP, previous_signal_handler)
+
+            self.rate_limiter = RateLimiter()
+            self.get_waiting_jobs = lambda: 0
+            self.extract_controller = NullConcurrencyController()
+            self.download_controller = NullConcurrencyController()
+
+        print("")
+        print("Downloaded " + str(counters.downloaded) + " video(s), skipped " + str(counters.skipped) + " video(s), failed " + str(counters.failed) + " video(s)")
+
+        if counters.duplicates > 0:
+            print("Removed " + str(counters.duplicates) + " duplicate video(s) found in more than one input")
+
+        if counters.bytes_saved > 0:
+            print("Saved " + youtube_dl.utils.format_bytes(counters.bytes_saved) + " by downloading audio only formats")
+
+        if profile_table:
+            print("")
+            print("Profile written to '{}', wall and CPU time spent handling items in each stage:".format(self.settings.profile_file))
+
+            for line in profile_table:
+                print(line)
+
+    def create_concurrency_controller(self, name, jobs):
+        if not self.settings.adaptive:
+            return None
+
+        return ConcurrencyController(name, jobs, self.settings.max_jobs, log=self.log)
+
+    def create_stage_profiler(self):
+        if self.settings.profile_file is None:
+            return NullStageProfiler()
+
+        return StageProfiler(self.settings.profile_file, log=self.log)
+
+    def create_trace_recorder(self):
+        if self.settings.trace_file is None:
+            return NullTraceRecorder()
+
+        return TraceRecorder(self.settings.trace_file, Downloader.describe_task, log=self.log)
+
+    @staticmethod
+    def describe_task(task):
+        if isinstance(task, DownloadItem):
+            return {"url": task.job.url, "id": task.info.get("id")}
+
+        return {"url": task.url}
+
+    def create_metrics(self, counters, stages):
+        if self.settings.metrics_file is None and self.settings.metrics_summary_file is None:
+            return NullMetrics()
+
+        metrics = Metrics(self.settings.metrics_file, self.settings.metrics_summary_file, self.settings.metrics_interval, log=self.log)
+
+        for result in ("downloaded", "skipped", "failed", "duplicates"):
+            metrics.add_sampled("yget_videos_total", Metrics.counter, "Videos handled so far by result", lambda result=result: getattr(counters, result), {"result": result})
+
+        metrics.add_sampled("yget_audio_bytes_saved_total", Metrics.counter, "Bytes not downloaded by choosing audio only formats", lambda: counters.bytes_saved)
+
+        for stage in stages:
+            metrics.add_sampled("yget_queue_depth", Metrics.gauge, "Items waiting for a worker of each stage", stage.queue.qsize, {"stage": stage.name})
+            metrics.add_sampled("yget_pending_retries", Metrics.gauge, "Items waiting to be retried by each stage", lambda stage=stage: stage.pending_retries, {"stage": stage.name})
+
+            if stage.controller is not None:
+                metrics.add_sampled("yget_concurrency_limit", Metrics.gauge, "Workers of each stage allowed to be busy by --adaptive", lambda stage=stage: stage.controller.limit, {"stage": stage.name})
+
+        metrics.add_counter("yget_retries_total", "Failed attempts retried later by stage and error class")
+        metrics.add_counter("yget_errors_total", "Urls and videos given up on by stage and error class")
+        metrics.add_counter("yget_transfer_bytes_total", "Bytes of media files downloaded")
+        metrics.add_histogram("yget_extract_seconds", "Time to extract the listing of a url or the information of a video", Downloader.latency_buckets)
+        metrics.add_histogram("yget_transfer_seconds", "Time to download the media of a video", Downloader.latency_buckets)
+        metrics.add_histogram("yget_transfer_bytes_per_second", "Average rate of each download lasting at least a second", Downloader.throughput_buckets)
+        metrics.add_histogram("yget_postprocess_seconds", "Time to run ffmpeg on a downloaded video", Downloader.latency_buckets)
+
+        return metrics
+
+    def get_worker_count(self, jobs):
+        # With --adaptive every worker up to the maximum is started and the controller decides how many are busy
+        if not self.settings.adaptive:
+            return jobs
+
+        return max(jobs, self.settings.max_jobs)
+
+    def install_reload_signal(self):
+        # Signal handlers can only be installed from the main thread
+        if self.settings.limit_rate_file is None or not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return None
+
+        return signal.signal(signal.SIGHUP, self.rate_limiter.request_reload)
+
+    def get_download_queue_size(self):
+        # Ordering and taking turns choose from a wider window of flat entries, which still pauses extraction once full
+        if self.settings.schedule != DownloadScheduler.policy_input or self.settings.fair:
+            return self.settings.queue_size * Downloader.scheduling_window
+
+        return self.settings.queue_size
+
+    def create_download_scheduler(self, queue_size):
+        get_source = Downloader.get_item_source if self.settings.fair else None
+
+        return DownloadScheduler(self.settings.schedule, Downloader.get_item_size, queue_size, get_source, self.settings.source_weights)
+
+    @staticmethod
+    def get_item_source(item):
+        return (item.job.source, item.job)
+
+    @staticmethod
+    def get_item_size(item):
+        duration = item.info.get("duration")
+
+        if duration:
+            return duration
+
+        filesize = item.info.get("filesize") or item.info.get("filesize_approx")
 
-            for info in infos:
-                while True:
-                    if authentication_params:
-                        download_options.set_authentication_params(authentication_params)
+        # Without a duration the size is turned into seconds at a nominal 1 Mbit/s so both can be compared
+        return filesize / Downloader.nominal_byte_rate if filesize else None
 
-                    try:
-                        with youtube_dl.YoutubeDL(download_options.make_download_options()) as youtube_downloader:
-                            filename = youtube_downloader.prepare_filename(info)
+    def get_postprocess_jobs(self):
+        return self.settings.postprocess_jobs or os.cpu_count() or 1
 
-                            root, _ = os.path.splitext(os.path.join(os.getcwd(), filename))
-                            existing_files = glob.glob(root + ".*")
+    def create_postprocess_session(self, download_options):
+        # Linux niceness is per thread and inherited by child processes, so only this worker's ffmpeg runs are lowered
+        if self.settings.nice is not None and sys.platform.startswith("linux"):
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), os.getpriority(os.PRIO_PROCESS, 0) + self.settings.nice)
 
-                            has_part = False
+        return DownloadSession(download_options.make_download_options())
 
-                            if existing_files:
-                                for existing_file in existing_files:
-                                    _, extension = os.path.splitext(existing_file)
+    def create_metadata_cache(self):
+        if not self.settings.use_cache:
+            return NullMetadataCache()
 
-                                    if "part" in extension:
-                                        has_part = True
-                                        break
+        cache_directory = self.settings.cache_directory or MetadataCache.get_default_directory()
 
-                                if not has_part:
-                                    skipped += 1
-                                    break
+        try:
+            return MetadataCache(cache_directory, self.settings.cache_ttls, self.settings.cache_size, self.settings.refresh_cache)
+        except (OSError, sqlite3.Error) as e:
+            print("Metadata cache in '{}' not available: {}".format(cache_directory, str(e)))
+
+            return NullMetadataCache()
+
+    def create_download_archive(self):
+        if not self.settings.use_archive:
+            return NullDownloadArchive()
+
+        return DownloadArchive(self.get_archive_path())
+
+    def get_archive_path(self):
+        return self.settings.archive_file or DownloadArchive.get_default_path(self.output_directory)
+
+    def get_journal_path(self):
+        return self.settings.journal_file or JobJournal.get_default_path(self.output_directory)
+
+    def load_job_journal(self):
+        if not self.settings.use_journal or not self.settings.resume:
+            return {}
+
+        resumed_jobs = JobJournal.load(self.get_journal_path())
+
+        if resumed_jobs:
+            print("Resuming {} url(s) from the journal".format(len(resumed_jobs)))
+
+        return resumed_jobs
+
+    def create_job_journal(self):
+        if not self.settings.use_journal:
+            return NullJobJournal()
+
+        return JobJournal(self.get_journal_path(), self.settings.resume)
+
+    def rebuild_archive(self):
+        return DownloadArchive(self.get_archive_path()).rebuild(self.output_directory)
+
+    def create_media_download_options(self, audio_only, wav, mp3):
+        download_options = self.create_download_options()
+
+        if self.settings.ffmpeg_threads is not None:
+            download_options.set_ffmpeg_threads(self.settings.ffmpeg_threads)
+
+        if self.settings.limit_rate_per_transfer is not None:
+            download_options.set_rate_limit(self.settings.limit_rate_per_transfer)
+
+        if wav:
+            download_options.set_wav()
+        elif mp3:
+            download_options.set_mp3()
+        elif audio_only:
+            download_options.set_audio_only()
+
+        return download_options
+
+    def extract_videos(self, session, job, authentication_params, counters, emit):
+        download_options = job.download_options
+
+        if job.resumed is not None and job.resumed["state"] == JobJournal.state_extracted:
+            self.resume_videos(job, counters, emit)
+            return
+
+        video_id = UrlCanonicalizer.get_video_id(job.url)
+
+        if video_id is not None and self.download_archive.contains(video_id):
+            self.job_journal.add_entries(job.url, None, [])
+
+            counters.add_skipped()
+            return
+
+        album = None
+        failed = False
+        paused = False
+
+        while True:
+            attempted_authentication_params = dict(authentication_params)
+
+            if attempted_authentication_params:
+                download_options.set_authentication_params(attempted_authentication_params)
+
+            try:
+                # A listing paused to let other urls take their turn carries on from where it stopped
+                if job.listing is None:
+                    job.listing = self.start_listing(session, job)
+
+                listing = job.listing
+                info = listing.info
+
+                # Set album to playlist title
+                if "entries" in info:
+                    album = info.get("title")
+                    download_options.set_album(album)
+
+                    for entry in listing.entries:
+                        listing.index += 1
+                        Downloader.add_playlist_info(entry, info, listing.index)
+
+                        listing.infos.append(entry)
+                        self.emit_video(job, entry, counters, emit)
 
-                            youtube_downloader.download([info["id"]])
-                            downloaded += 1
+                        if self.should_pause_listing(job):
+                            paused = True
                             break
-                    except youtube_dl.utils.DownloadError as e:
-                        if "Please sign in to view this video" in str(e) or "Please enter your password" in str(e):
-                            print("({}, {}) {}".format(url, info["id"], str(e)))
-                            if should_request_authentication and not has_requested_authentication:
+                else:
+                    album = "YouTube"
+                    download_options.set_album(album)
 
-                                has_requested_authentication = True
+                    listing.infos.append(info)
+                    self.emit_video(job, info, counters, emit)
 
-                                if not self.authentication_provider.request_authentication_parameters(authentication_params):
-                                    break
+                if not paused and not listing.is_cached:
+                    self.metadata_cache.set_listing(job.url, "entries" in info, info.get("title"), listing.infos)
 
-                                continue
+                break
+            except youtube_dl.utils.DownloadError as e:
+                job.listing = None
 
-                        failed += 1
-                        print("({}, {}) {}".format(url, info["id"], str(e)))
+                if "Please sign in to view this video" in str(e) or "Please enter your password" in str(e):
+                    self.log("({}, {}) {}".format(job.url, None, str(e)))
+                    if job.should_request_authentication and not job.has_requested_authentication:
 
-                        break
-                    except Exception as e:
-                        print("({}, {}) {}".format(url, None, str(e)))
+                        job.has_requested_authentication = True
+
+                        if not self.request_authentication(authentication_params, attempted_authentication_params):
+                            self.report_failure(job.url, None, job, e)
+
+                            failed = True
+                            break
+
+                        continue
+
+                if ConcurrencyController.is_throttled(e):
+                    self.extract_controller.record_throttled(str(e))
+
+                self.report_failure(job.url, None, job, e)
+
+                failed = True
+                break
+            except Exception as e:
+                job.listing = None
+
+                self.report_failure(job.url, None, job, e)
+
+                failed = True
+                break
+
+        if paused:
+            # The worker moves on to the urls waiting behind this one, which comes back after them
+            raise RetryLater(0)
+
+        # A listing cut short is never recorded as extracted, so a resumed run lists the url again
+        if failed or not job.emitted_ids:
+            counters.add_failed()
+            return
+
+        infos = job.listing.infos
+        job.listing = None
+
+        self.job_journal.add_entries(job.url, album, infos)
+
+    def start_listing(self, session, job):
+        download_options = job.download_options
+
+        info = self.metadata_cache.get_info(job.url, download_options.get_format())
+
+        if info is None:
+            session.apply_options(download_options.make_transfer_options())
+
+            started = time.monotonic()
+
+            # Playlist pages are fetched as the entries are iterated and each video is fully extracted by the download stage
+            info = self.extract_listing(session.youtube_downloader, job.url)
+
+            self.metrics.observe("yget_extract_seconds", time.monotonic() - started, {"kind": "listing"})
+
+            self.extract_controller.record_success()
+
+            is_cached = False
+        else:
+            is_cached = True
+
+        entries = self.iterate_entries(session.youtube_downloader, info) if "entries" in info else None
+
+        return DownloadListing(info, entries, is_cached)
+
+    def should_pause_listing(self, job):
+        # A playlist holding its share of the download window lets the other urls be listed before it goes on
+        if not self.settings.fair:
+            return False
+
+        with self.schedule_lock:
+            queued = job.queued
+
+        return queued >= max(self.settings.queue_size, 1) and self.get_waiting_jobs() > 0
+
+    def extract_listing(self, youtube_downloader, url, ie_key=None):
+        info = youtube_downloader.extract_info(url, download=False, ie_key=ie_key, process=False)
+
+        # Urls such as watch?v=ID&list=ID point at the playlist through a url result
+        while info.get("_type") in ("url", "url_transparent") and info.get("ie_key") in Downloader.playlist_extractors:
+            info = youtube_downloader.extract_info(info["url"], download=False, ie_key=info.get("ie_key"), process=False)
+
+        return info
+
+    def iterate_entries(self, youtube_downloader, info):
+        for entry in info["entries"]:
+            if not entry:
+                continue
+
+            # Channels list their playlists as url results which are expanded in place
+            if entry.get("_type") == "playlist":
+                for nested_entry in self.iterate_entries(youtube_downloader, entry):
+                    yield nested_entry
+            elif entry.get("_type") in ("url", "url_transparent") and entry.get("ie_key") in Downloader.playlist_extractors:
+                nested_info = self.extract_listing(youtube_downloader, entry["url"], entry.get("ie_key"))
+
+                if "entries" in nested_info:
+                    for nested_entry in self.iterate_entries(youtube_downloader, nested_info):
+                        yield nested_entry
+                else:
+                    yield nested_info
+            else:
+                yield entry
+
+    @staticmethod
+    def add_playlist_info(entry, info, index):
+        entry.setdefault("playlist", info.get("title"))
+        entry.setdefault("playlist_id", info.get("id"))
+        entry.setdefault("playlist_title", info.get("title"))
+        entry.setdefault("playlist_index", index)
+
+        # Archive keys are made from the extractor, which a flat entry only names as the extractor to resolve it with
+        if "ie_key" in entry:
+            entry.setdefault("extractor_key", entry["ie_key"])
+
+    def emit_video(self, job, info, counters, emit):
+        # An extraction retried part way through a playlist does not queue its earlier entries again
+        if info["id"] in job.emitted_ids:
+            return
+
+        job.emitted_ids.add(info["id"])
+
+        if not self.schedule_video(info["id"]):
+            counters.add_duplicate()
+            return
+
+        self.queue_video(DownloadItem(job, info), emit)
+
+    def queue_video(self, item, emit):
+        with self.schedule_lock:
+            item.job.queued += 1
+
+        emit(item)
+
+    def schedule_video(self, video_id):
+        # The first job to reach a video keeps it, so its album is the one written to the file
+        with self.schedule_lock:
+            if video_id in self.scheduled_ids:
+                return False
+
+            self.scheduled_ids.add(video_id)
+
+            return True
+
+    def resume_videos(self, job, counters, emit):
+        job.download_options.set_album(job.resumed["album"])
+
+        for entry in job.resumed["entries"]:
+            state = job.resumed["items"].get(entry["id"], {"state": None, "filename": None})
+
+            # Finished videos are not checked again at all
+            if state["state"] == JobJournal.state_postprocessed:
+                counters.add_skipped()
+                continue
+
+            info = self.metadata_cache.get_video_info(entry["id"], job.download_options.get_format()) or {}
+
+            if not info and "ie_key" in entry:
+                info["_type"] = "url"
+
+            for key, value in entry.items():
+                info.setdefault(key, value)
+
+            item = DownloadItem(job, info)
+            item.state = state["state"]
+            item.filename = state["filename"]
+
+            job.emitted_ids.add(entry["id"])
+
+            if not self.schedule_video(entry["id"]):
+                counters.add_duplicate()
+                continue
+
+            self.queue_video(item, emit)
+
+    def download_video(self, session, item, authentication_params, counters, emit):
+        job = item.job
+        info = item.info
+
+        if not item.started:
+            item.started = True
+
+            with self.schedule_lock:
+                job.queued -= 1
+        download_options = job.download_options
+
+        if self.download_archive.contains(info["id"], info.get("extractor_key")):
+            self.job_journal.set_state(job.url, info["id"], JobJournal.state_postprocessed)
+
+            counters.add_skipped()
+            return
 
+        if item.state == JobJournal.state_downloaded and item.filename is not None and os.path.exists(item.filename):
+            self.resume_postprocess(session, item, download_options, emit)
+            return
+
+        while True:
+            attempted_authentication_params = dict(authentication_params)
+
+            if attempted_authentication_params:
+                download_options.set_authentication_params(attempted_authentication_params)
+
+            try:
+                session.apply_options(download_options.make_transfer_options())
+
+                youtube_downloader = session.youtube_downloader
+
+                # Playlist entries arrive flat and are only fully extracted once a worker picks them up, cached metadata without stream urls is selected again
+                if "format_id" not in info or StreamUrls.has_expired(info):
+                    started = time.monotonic()
+
+                    with self.tracer.span("resolve", "download", item):
+                        item.info = info = self.resolve_video_info(youtube_downloader, info)
+
+                    self.metrics.observe("yget_extract_seconds", time.monotonic() - started, {"kind": "video"})
+
+                filename = youtube_downloader.prepare_filename(info)
+
+                existing_extensions = self.get_existing_extensions(filename)
+
+                if existing_extensions:
+                    has_part = any("part" in extension or extension in SegmentedDownloader.incomplete_extensions for extension in existing_extensions)
+
+                    if not has_part:
+                        self.download_archive.add(info["id"], info.get("extractor_key"))
+                        self.job_journal.set_state(job.url, info["id"], JobJournal.state_postprocessed)
+
+                        counters.add_skipped()
                         break
 
-        if downloaded > 0:
-            sys.stdout.write("\n")
-            sys.stdout.flush()
+                started = time.monotonic()
 
-        print("")
-        print("Downloaded " + str(downloaded) + " video(s), skipped " + str(skipped) + " video(s), failed " + str(failed) + " video(s)")
+                with self.tracer.span("transfer", "download", item):
+                    info = self.transfer_video(youtube_downloader, item)
+
+                # Postprocessing runs in its own stage so the transfer slot is freed for the next video
+                item.filename = info.get("_filename", filename)
+
+                elapsed = time.monotonic() - started
+                throughput = self.get_transfer_throughput(item.filename, elapsed)
+
+                self.download_controller.record_success(throughput)
+                self.record_transfer_metrics(item.filename, elapsed, throughput)
+
+                if download_options.audio_only:
+                    counters.add_bytes_saved(self.get_bytes_saved(youtube_downloader, info))
+
+                self.directory_snapshot.remove(item.filename + ".part")
+                self.directory_snapshot.add(item.filename)
+
+                self.job_journal.set_state(job.url, info["id"], JobJournal.state_downloaded, item.filename)
+
+                emit(item)
+                break
+            except youtube_dl.utils.DownloadError as e:
+                if "Please sign in to view this video" in str(e) or "Please enter your password" in str(e):
+                    self.log("({}, {}) {}".format(job.url, info["id"], str(e)))
+                    if job.should_request_authentication and not job.has_requested_authentication:
+
+                        job.has_requested_authentication = True
+
+                        if not self.request_authentication(authentication_params, attempted_authentication_params):
+                            self.report_failure(job.url, info["id"], item, e)
+
+                            counters.add_failed()
+
+                            break
+
+                        continue
+
+                if ConcurrencyController.is_throttled(e):
+                    self.download_controller.record_throttled(str(e))
+
+                self.report_failure(job.url, info["id"], item, e)
+
+                counters.add_failed()
+
+                break
+            except Exception as e:
+                self.report_failure(job.url, info["id"], item, e)
+
+                counters.add_failed()
+
+                break
+
+    def resume_postprocess(self, session, item, download_options, emit):
+        # Tags are written from the full video information, which the journal does not keep
+        if "formats" not in item.info:
+            try:
+                session.apply_options(download_options.make_transfer_options())
+
+                item.info = self.refresh_video_info(session.youtube_downloader, item.info)
+            except Exception as e:
+                self.log("({}, {}) Tagging from journal information only: {}".format(item.job.url, item.info["id"], str(e)))
+
+        emit(item)
+
+    @staticmethod
+    def get_format_size(format_info):
+        return format_info.get("filesize") or format_info.get("filesize_approx") or 0
+
+    def get_bytes_saved(self, youtube_downloader, info):
+        formats = info.get("formats")
+
+        if not formats:
+            return 0
+
+        # Compare against what the default video format would have fetched before extracting the audio
+        video_format_selector = youtube_downloader.build_format_selector(DownloaderOptionsBuilder.default_download_options["format"])
+        video_formats = list(video_format_selector({"formats": formats, "incomplete_formats": False}))
+
+        video_size = sum(Downloader.get_format_size(f) for f in video_formats)
+        audio_size = sum(Downloader.get_format_size(f) for f in (info.get("requested_formats") or [info]))
+
+        if not video_size or not audio_size:
+            return 0
+
+        return max(video_size - audio_size, 0)
+
+    def get_existing_extensions(self, filename):
+        root, _ = os.path.splitext(os.path.join(os.getcwd(), filename))
+
+        if self.directory_snapshot.covers(root):
+            return self.directory_snapshot.get_extensions(root)
+
+        return set(os.path.splitext(existing_file)[1] for existing_file in glob.glob(glob.escape(root) + ".*"))
+
+    @staticmethod
+    def get_transfer_throughput(filename, elapsed):
+        # Files found already complete finish instantly and say nothing about the network
+        if elapsed < 1.0 or not os.path.exists(filename):
+            return None
+
+        return os.path.getsize(filename) / elapsed
+
+    def record_transfer_metrics(self, filename, elapsed, throughput):
+        self.metrics.observe("yget_transfer_seconds", elapsed)
+
+        if throughput is not None:
+            self.metrics.observe("yget_transfer_bytes_per_second", throughput)
+
+        if os.path.exists(filename):
+            self.metrics.increment("yget_transfer_bytes_total", os.path.getsize(filename))
+
+    def transfer_video(self, youtube_downloader, item):
+        # Download straight from the extracted info instead of extracting the video page again
+        if StreamUrls.has_expired(item.info):
+            item.info = self.refresh_video_info(youtube_downloader, item.info)
 
-    def download_status(self, info):
         try:
-            if info["status"] == "downloading":
-                if "total_bytes" in info:
-                    current_percentage = info["downloaded_bytes"] * 100.0 / info["total_bytes"]
-                else:
-                    current_percentage = "?"
-                self.download_status_message(info["filename"], current_percentage)
-            elif info["status"] == "finished":
-                self.download_status_message(info["filename"], 100, True)
-                self.started_download = False
+            self.transfer_segments(youtube_downloader, item.info)
+
+            youtube_downloader.process_info(item.info)
+        except youtube_dl.utils.DownloadError as e:
+            if "HTTP Error 403" not in str(e) or item.refreshed:
+                raise
+
+            self.download_controller.record_throttled(str(e))
+
+            # Stream urls can be revoked before their advertised expiry
+            item.info = self.refresh_video_info(youtube_downloader, item.info)
+            item.refreshed = True
+
+            youtube_downloader.process_info(item.info)
+
+        return item.info
+
+    def transfer_segments(self, youtube_downloader, info):
+        if self.settings.segments < 2:
+            return
+
+        # A completed file is picked up by process_info as already downloaded, otherwise it falls back to a single stream
+        transfer_rate_limiter = RateLimiter(self.settings.limit_rate_per_transfer) if self.settings.limit_rate_per_transfer is not None else None
+
+        segmented_downloader = SegmentedDownloader(youtube_downloader, self.settings.segments, self.settings.segment_min_size, [self.download_status, self.limit_rate], transfer_rate_limiter)
+        segmented_downloader.download(youtube_downloader.prepare_filename(info), info)
+
+    def resolve_video_info(self, youtube_downloader, info):
+        # Journal entries carry too little to process, everything else is a url result or an unprocessed video
+        if info.get("_type") not in ("url", "url_transparent") and "formats" not in info:
+            return self.refresh_video_info(youtube_downloader, info)
+
+        resolved_info = youtube_downloader.process_ie_result(dict(info), download=False)
+
+        self.metadata_cache.set_video_info(resolved_info, youtube_downloader.params.get("format"))
+
+        return Downloader.keep_playlist_info(info, resolved_info)
+
+    def refresh_video_info(self, youtube_downloader, info):
+        url = info.get("webpage_url") or info["id"]
+
+        refreshed_info = youtube_downloader.extract_info(url, download=False)
+
+        self.metadata_cache.set_video_info(refreshed_info, youtube_downloader.params.get("format"))
+
+        return Downloader.keep_playlist_info(info, refreshed_info)
+
+    @staticmethod
+    def keep_playlist_info(info, refreshed_info):
+        # Keep the playlist details added when the entry was extracted as part of a playlist
+        for key, value in info.items():
+            if key.startswith("playlist") or key == "n_entries":
+                refreshed_info.setdefault(key, value)
+
+        return refreshed_info
+
+    def postprocess_video(self, session, item, counters):
+        job = item.job
+
+        # The merge process_info ran during the transfer is not run again, only the fixups it left out
+        info = dict((key, value) for key, value in item.info.items() if key not in ("__postprocessors", "__files_to_merge"))
+
+        try:
+            session.apply_options(job.download_options.make_download_options())
+
+            info["__postprocessors"] = Postprocessors.get_fixups(session.youtube_downloader, info)
+
+            started = time.monotonic()
+
+            with self.tracer.span("tag", "postprocess", item):
+                session.youtube_downloader.post_process(item.filename, info)
+
+            self.metrics.observe("yget_postprocess_seconds", time.monotonic() - started)
+
+            # Only recorded once the file is complete so an interrupted postprocess is retried next run
+            self.download_archive.add(info["id"], info.get("extractor_key"))
+            self.job_journal.set_state(job.url, info["id"], JobJournal.state_postprocessed)
+
+            counters.add_downloaded()
         except Exception as e:
-            print("Download status error")
-            print(e)
+            counters.add_failed()
+            self.metrics.increment("yget_errors_total", labels={"stage": "postprocess", "class": ErrorClassifier.classify(e)})
+            self.log("({}, {}) {} error: {}".format(job.url, info["id"], ErrorClassifier.classify(e), str(e)))
+
+    def report_failure(self, url, video_id, task, error):
+        task.attempts += 1
+        error_class = ErrorClassifier.classify(error)
+        labels = {"stage": "download" if isinstance(task, DownloadItem) else "extract", "class": error_class}
+
+        if self.retry_scheduler.should_retry(error_class, task.attempts):
+            delay = self.retry_scheduler.get_delay(task.attempts)
+
+            self.metrics.increment("yget_retries_total", labels=labels)
+
+            self.log("({}, {}) {} error on attempt {}, retrying in {:.1f}s: {}".format(url, video_id, error_class, task.attempts, delay, str(error)))
+
+            raise RetryLater(delay)
+
+        self.metrics.increment("yget_errors_total", labels=labels)
+
+        self.log("({}, {}) {} error after {} attempt(s): {}".format(url, video_id, error_class, task.attempts, str(error)))
+
+    def fail_drained(self, stage, url, video_id, error, counters):
+        # Left out of the journal's finished states so the next run picks the url up again
+        counters.add_failed()
+
+        self.metrics.increment("yget_errors_total", labels={"stage": stage, "class": ErrorClassifier.classify(error)})
+
+        self.log("({}, {}) {} error: could not start a {} session: {}".format(url, video_id, ErrorClassifier.classify(error), stage, str(error)))
+
+    def request_authentication(self, authentication_params, attempted_authentication_params):
+        # Only prompt once when several workers hit the sign in wall at the same time
+        with self.authentication_lock:
+            if authentication_params != attempted_authentication_params:
+                return True
+
+            with self.progress_renderer.suspend():
+                return self.authentication_provider.request_authentication_parameters(authentication_params)
+
+    def download_status(self, info):
+        self.progress_renderer.update(info)
+
+    def log(self, message):
+        self.progress_renderer.write_line(message)
 
-    def download_status_message(self, file_name, current_percentage, new_line=False):
-        if not self.started_download:
-            print("Downloading " + file_name)
+    def limit_rate(self, info):
+        filename = info.get("filename")
+        downloaded_bytes = info.get("downloaded_bytes")
 
-        self.started_download = True
+        if filename is None or downloaded_bytes is None:
+            return
 
-        end_of_line = "\r"
+        with self.rate_lock:
+            if info["status"] != "downloading":
+                self.transfer_bytes.pop(filename, None)
+                return
 
-        sys.stdout.write("[" + "%.2f" % current_percentage + "%]" + end_of_line)
+            # The first report only sets a baseline so bytes resumed from an earlier run are not charged again
+            previous_bytes = self.transfer_bytes.get(filename, downloaded_bytes)
+            self.transfer_bytes[filename] = max(previous_bytes, downloaded_bytes)
 
-        sys.stdout.flush()
+        if downloaded_bytes > previous_bytes:
+            self.rate_limiter.consume(downloaded_bytes - previous_bytes)
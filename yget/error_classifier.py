@@ -0,0 +1,72 @@
+import http.client
+import re
+import socket
+import urllib.error
+
+class ErrorClassifier(object):
+    transient = "transient"
+    auth = "auth"
+    unavailable = "unavailable"
+    fatal = "fatal"
+
+    http_status_regex = re.compile(r"HTTP Error (?P<status>\d{3})")
+
+    auth_markers = ("Please sign in", "Please enter your password", "Sign in to confirm", "login required", "Unable to log in")
+    unavailable_markers = ("Video unavailable", "This video is private", "This video has been removed", "is not available", "copyright", "members-only", "Private video", "premieres in")
+    transient_markers = ("timed out", "Connection reset", "Connection refused", "Temporary failure in name resolution", "Name or service not known", "IncompleteRead", "Remote end closed connection", "giving up after", "Unable to download webpage", "Unable to download API page", "urlopen error")
+
+    transient_types = (socket.timeout, TimeoutError, ConnectionError, http.client.IncompleteRead, http.client.RemoteDisconnected, urllib.error.URLError)
+
+    @staticmethod
+    def get_causes(error):
+        # youtube_dl wraps the original network error in exc_info or cause
+        causes = [error]
+        exc_info = getattr(error, "exc_info", None)
+
+        if exc_info and exc_info[1] is not None and exc_info[1] is not error:
+            causes.append(exc_info[1])
+
+        cause = getattr(error, "cause", None)
+
+        if cause is not None:
+            causes.append(cause)
+
+        return causes
+
+    @staticmethod
+    def classify(error):
+        message = str(error)
+
+        if any(marker in message for marker in ErrorClassifier.auth_markers):
+            return ErrorClassifier.auth
+
+        match = ErrorClassifier.http_status_regex.search(message)
+
+        if match is not None:
+            status = int(match.group("status"))
+
+            if status == 401:
+                return ErrorClassifier.auth
+
+            # 403 is how YouTube throttles stream urls as often as it refuses them
+            if status in (403, 408, 429) or status >= 500:
+                return ErrorClassifier.transient
+
+            if status in (404, 410, 451):
+                return ErrorClassifier.unavailable
+
+        if any(marker in message for marker in ErrorClassifier.unavailable_markers):
+            return ErrorClassifier.unavailable
+
+        for cause in ErrorClassifier.get_causes(error):
+            # An HTTPError is a URLError, but one that reached here has a status handled above or is not worth retrying
+            if isinstance(cause, urllib.error.HTTPError):
+                continue
+
+            if isinstance(cause, ErrorClassifier.transient_types):
+                return ErrorClassifier.transient
+
+        if any(marker in message for marker in ErrorClassifier.transient_markers):
+            return ErrorClassifier.transient
+
+        return ErrorClassifier.fatal
@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+
+class JobJournal(object):
+    file_name = ".yget-journal"
+
+    state_pending = "pending"
+    state_extracted = "extracted"
+    state_downloaded = "downloaded"
+    state_postprocessed = "postprocessed"
+
+    batch_size = 64
+    sync_interval = 1.0
+
+    # Enough of an entry to name its file and refresh it, the formats are re-extracted since stream urls expire
+    entry_keys = ("id", "title", "ext", "webpage_url", "extractor_key", "playlist", "playlist_id", "playlist_title", "playlist_index", "n_entries")
+
+    def __init__(self, path, resume=False, clock=time.monotonic):
+        self.path = path
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.file = open(path, "a" if resume else "w")
+        self.unsynced = 0
+        self.synced = clock()
+
+    @staticmethod
+    def get_default_path(output_directory):
+        return os.path.join(output_directory, JobJournal.file_name)
+
+    @staticmethod
+    def make_entry(info):
+        entry = dict((key, info[key]) for key in JobJournal.entry_keys if key in info)
+
+        # Flat playlist entries are resolved through the extractor that listed them, which only a youtube id can do without
+        if "ie_key" in info and "url" in info:
+            entry["ie_key"] = info["ie_key"]
+            entry["url"] = info["url"]
+
+        return entry
+
+    @staticmethod
+    def load(path):
+        jobs = {}
+
+        if not os.path.isfile(path):
+            return jobs
+
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line is cut short if the run was killed mid write
+                    break
+
+                job = jobs.setdefault(record["url"], {"state": JobJournal.state_pending, "album": None, "entries": [], "items": {}})
+
+                if "id" in record:
+                    item = job["items"].setdefault(record["id"], {"state": None, "filename": None})
+                    item["state"] = record["state"]
+                    item["filename"] = record.get("filename", item["filename"])
+                elif record["state"] == JobJournal.state_extracted:
+                    job["state"] = record["state"]
+                    job["album"] = record.get("album")
+                    job["entries"] = record.get("entries", [])
+
+        return jobs
+
+    def write(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.unsynced += 1
+
+            # Records are synced in batches, a crash loses at most the last batch which is simply redone
+            if self.unsynced >= JobJournal.batch_size or self.clock() - self.synced >= JobJournal.sync_interval:
+                self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.unsynced = 0
+        self.synced = self.clock()
+
+    def add_job(self, url):
+        self.write({"url": url, "state": JobJournal.state_pending})
+
+    def add_entries(self, url, album, infos):
+        self.write({"url": url, "state": JobJournal.state_extracted, "album": album, "entries": [JobJournal.make_entry(info) for info in infos]})
+
+    def set_state(self, url, video_id, state, filename=None):
+        record = {"url": url, "id": video_id, "state": state}
+
+        if filename is not None:
+            record["filename"] = filename
+
+        self.write(record)
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+
+            self.sync()
+            self.file.close()
+
+    def remove(self):
+        self.close()
+
+        os.remove(self.path)
+
+class NullJobJournal(object):
+    def add_job(self, url):
+        pass
+
+    def add_entries(self, url, album, infos):
+        pass
+
+    def set_state(self, url, video_id, state, filename=None):
+        pass
+
+    def close(self):
+        pass
+
+    def remove(self):
+        pass
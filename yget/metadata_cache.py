@@ -0,0 +1,234 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .stream_urls import StreamUrls
+
+class MetadataCache(object):
+    kind_playlist = "playlist"
+    kind_video = "video"
+    kind_stream = "stream"
+
+    default_ttls = {
+        kind_playlist: 12 * 60 * 60,
+        kind_video: 30 * 24 * 60 * 60,
+        kind_stream: 60 * 60
+    }
+    default_max_size = 64 * 1024 * 1024
+    file_name = "metadata.sqlite3"
+    max_pending_accesses = 256
+
+    # Large per-format and subtitle listings are not needed to download the selected format
+    stream_excluded_keys = ("formats", "thumbnails", "subtitles", "automatic_captions", "requested_subtitles")
+    video_excluded_keys = stream_excluded_keys + ("url", "requested_formats", "http_headers", "manifest_url", "fragments", "fragment_base_url")
+    # Enough of each listed video to download it without its own row, which archived videos never get
+    listing_entry_keys = ("id", "title", "duration", "webpage_url", "extractor_key")
+
+    def __init__(self, directory, ttls=None, max_size=None, refresh=False):
+        self.ttls = dict(MetadataCache.default_ttls)
+
+        if ttls:
+            self.ttls.update(ttls)
+
+        self.max_size = max_size if max_size is not None else MetadataCache.default_max_size
+        self.refresh = refresh
+
+        self.lock = threading.Lock()
+        self.pending_accesses = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+        self.connection = sqlite3.connect(os.path.join(directory, MetadataCache.file_name), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # A cache lost in a power cut is only fetched again, so commits do not wait for an fsync
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS entries (kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL, PRIMARY KEY (kind, key))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self.connection.commit()
+
+        self.remove_expired()
+
+    @staticmethod
+    def get_default_directory():
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+        return os.path.join(cache_home, "yget")
+
+    @staticmethod
+    def trim(info, excluded_keys):
+        return dict((k, v) for k, v in info.items() if k not in excluded_keys and not k.startswith("__"))
+
+    def get(self, kind, key, now=None):
+        if self.refresh:
+            return None
+
+        if now is None:
+            now = time.time()
+
+        with self.lock:
+            row = self.connection.execute("SELECT value, created FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+
+            if row is None:
+                return None
+
+            value, created = row
+
+            if created + self.ttls[kind] <= now:
+                self.delete(kind, key)
+                self.connection.commit()
+                return None
+
+            # Access times only order evictions, so reads keep them in memory until the next write
+            self.pending_accesses[(kind, key)] = now
+
+            if len(self.pending_accesses) >= MetadataCache.max_pending_accesses:
+                self.write_accesses()
+                self.connection.commit()
+
+        return json.loads(value)
+
+    def write_accesses(self):
+        if not self.pending_accesses:
+            return
+
+        self.connection.executemany("UPDATE entries SET accessed = ? WHERE kind = ? AND key = ?", [(accessed, kind, key) for (kind, key), accessed in self.pending_accesses.items()])
+        self.pending_accesses = {}
+
+    def get_size(self, kind, key):
+        row = self.connection.execute("SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)).fetchone()
+
+        return row[0] if row is not None else 0
+
+    def delete(self, kind, key):
+        self.total_size -= self.get_size(kind, key)
+        self.connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+        self.pending_accesses.pop((kind, key), None)
+
+    def set(self, kind, key, value, now=None):
+        if now is None:
+            now = time.time()
+
+        data = json.dumps(value, default=str)
+
+        with self.lock:
+            self.total_size += len(data) - self.get_size(kind, key)
+            self.connection.execute("INSERT OR REPLACE INTO entries (kind, key, value, created, accessed, size) VALUES (?, ?, ?, ?, ?, ?)", (kind, key, data, now, now, len(data)))
+            self.pending_accesses.pop((kind, key), None)
+            self.evict()
+            self.connection.commit()
+
+    def evict(self):
+        # The total is kept as entries change instead of summing the table on every write
+        if self.total_size <= self.max_size:
+            return
+
+        self.write_accesses()
+
+        # Least recently used entries go first
+        for kind, key, size in self.connection.execute("SELECT kind, key, size FROM entries ORDER BY accessed").fetchall():
+            self.connection.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+            self.total_size -= size
+
+            if self.total_size <= self.max_size:
+                break
+
+    def remove_expired(self, now=None):
+        if now is None:
+            now = time.time()
+
+        with self.lock:
+            for kind, ttl in self.ttls.items():
+                self.connection.execute("DELETE FROM entries WHERE kind = ? AND created <= ?", (kind, now - ttl))
+
+            self.total_size, = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            self.connection.commit()
+
+    def get_info(self, url, format_spec=None):
+        listing = self.get(MetadataCache.kind_playlist, url)
+
+        # Listings written before entries were kept only name their videos
+        if listing is None or "entries" not in listing:
+            return None
+
+        entries = [self.get_video_info(entry["id"], format_spec) or entry for entry in listing["entries"]]
+
+        if not listing["playlist"]:
+            return entries[0]
+
+        return {"title": listing["title"], "entries": entries}
+
+    @staticmethod
+    def make_listing_entry(info):
+        entry = dict((key, info[key]) for key in MetadataCache.listing_entry_keys if key in info)
+
+        # Flat playlist entries are resolved through the extractor that listed them
+        if "ie_key" in info and "url" in info:
+            entry["_type"] = "url"
+            entry["ie_key"] = info["ie_key"]
+            entry["url"] = info["url"]
+
+        return entry
+
+    @staticmethod
+    def make_stream_key(video_id, format_spec):
+        # Stream urls are those of the formats one spec selected, so an audio only run never reuses a video run's
+        return "{}:{}".format(video_id, format_spec)
+
+    def get_video_info(self, video_id, format_spec=None):
+        # Prefer the entry with usable stream urls, then the stable metadata which the download stage refreshes
+        if format_spec is not None:
+            info = self.get(MetadataCache.kind_stream, MetadataCache.make_stream_key(video_id, format_spec))
+
+            if info is not None and not StreamUrls.has_expired(info):
+                return info
+
+        return self.get(MetadataCache.kind_video, video_id)
+
+    def set_info(self, url, info, format_spec=None):
+        if "entries" in info:
+            entries = [entry for entry in info["entries"] if entry]
+
+            self.set_listing(url, True, info.get("title"), entries)
+        else:
+            entries = [info]
+
+            self.set_listing(url, False, None, entries)
+
+        for entry in entries:
+            self.set_video_info(entry, format_spec)
+
+    def set_listing(self, url, playlist, title, entries):
+        self.set(MetadataCache.kind_playlist, url, {"playlist": playlist, "title": title if playlist else None, "entries": [MetadataCache.make_listing_entry(entry) for entry in entries]})
+
+    def set_video_info(self, info, format_spec=None):
+        self.set(MetadataCache.kind_video, info["id"], MetadataCache.trim(info, MetadataCache.video_excluded_keys))
+
+        if format_spec is not None and StreamUrls.get_urls(info):
+            self.set(MetadataCache.kind_stream, MetadataCache.make_stream_key(info["id"], format_spec), MetadataCache.trim(info, MetadataCache.stream_excluded_keys))
+
+    def close(self):
+        with self.lock:
+            self.write_accesses()
+            self.connection.commit()
+            self.connection.close()
+
+class NullMetadataCache(object):
+    def get_info(self, url, format_spec=None):
+        return None
+
+    def get_video_info(self, video_id, format_spec=None):
+        return None
+
+    def set_info(self, url, info, format_spec=None):
+        pass
+
+    def set_listing(self, url, playlist, title, entries):
+        pass
+
+    def set_video_info(self, info, format_spec=None):
+        pass
+
+    def close(self):
+        pass
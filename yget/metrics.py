@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+import time
+
+class Histogram(object):
+    def __init__(self, buckets):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+
+    def observe(self, value):
+        for i, bucket in enumerate(self.buckets):
+            if value <= bucket:
+                self.counts[i] += 1
+                break
+
+        self.count += 1
+        self.sum += value
+        self.max = value if self.max is None else max(self.max, value)
+
+    def get_cumulative_counts(self):
+        total = 0
+        cumulative_counts = []
+
+        for count in self.counts:
+            total += count
+            cumulative_counts.append(total)
+
+        return cumulative_counts
+
+class Metrics(object):
+    counter = "counter"
+    gauge = "gauge"
+    histogram = "histogram"
+
+    default_interval = 15.0
+
+    def __init__(self, textfile_path=None, summary_path=None, interval=default_interval, clock=time.monotonic, log=print):
+        self.textfile_path = textfile_path
+        self.summary_path = summary_path
+        self.interval = interval
+        self.clock = clock
+        self.log = log
+
+        self.kinds = {}
+        self.help_texts = {}
+        self.buckets = {}
+        self.values = {}
+        self.callbacks = {}
+        self.started = clock()
+
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def add_counter(self, name, help_text):
+        self.describe(name, Metrics.counter, help_text)
+
+    def add_histogram(self, name, help_text, buckets):
+        self.describe(name, Metrics.histogram, help_text)
+        self.buckets[name] = buckets
+
+    def add_sampled(self, name, kind, help_text, get_value, labels=None):
+        # Values kept elsewhere, such as queue depths or the run's counters, are read when the metrics are written
+        self.describe(name, kind, help_text)
+        self.callbacks[(name, Metrics.make_label_key(labels))] = get_value
+
+    def describe(self, name, kind, help_text):
+        self.kinds[name] = kind
+        self.help_texts[name] = help_text
+
+    @staticmethod
+    def make_label_key(labels):
+        return tuple(sorted((labels or {}).items()))
+
+    def increment(self, name, amount=1, labels=None):
+        key = (name, Metrics.make_label_key(labels))
+
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def observe(self, name, value, labels=None):
+        key = (name, Metrics.make_label_key(labels))
+
+        with self.lock:
+            histogram = self.values.get(key)
+
+            if histogram is None:
+                histogram = self.values[key] = Histogram(self.buckets[name])
+
+            histogram.observe(value)
+
+    def get_samples(self):
+        with self.lock:
+            samples = {}
+
+            for key, value in self.values.items():
+                samples[key] = value if not isinstance(value, Histogram) else Metrics.copy_histogram(value)
+
+        for key, get_value in self.callbacks.items():
+            try:
+                samples[key] = get_value()
+            except Exception:
+                continue
+
+        return samples
+
+    @staticmethod
+    def copy_histogram(histogram):
+        copy = Histogram(histogram.buckets)
+        copy.counts = list(histogram.counts)
+        copy.count = histogram.count
+        copy.sum = histogram.sum
+        copy.max = histogram.max
+
+        return copy
+
+    @staticmethod
+    def format_labels(label_key, extra_labels=()):
+        labels = list(label_key) + list(extra_labels)
+
+        if not labels:
+            return ""
+
+        return "{" + ",".join('{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"')) for name, value in labels) + "}"
+
+    @staticmethod
+    def format_value(value):
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def make_prometheus_text(self):
+        samples = self.get_samples()
+        lines = []
+
+        for name in sorted(self.kinds):
+            lines.append("# HELP {} {}".format(name, self.help_texts[name]))
+            lines.append("# TYPE {} {}".format(name, self.kinds[name]))
+
+            for (sample_name, label_key), value in sorted(samples.items(), key=lambda sample: sample[0]):
+                if sample_name != name:
+                    continue
+
+                if not isinstance(value, Histogram):
+                    lines.append("{}{} {}".format(name, Metrics.format_labels(label_key), Metrics.format_value(value)))
+                    continue
+
+                for bucket, count in zip(value.buckets, value.get_cumulative_counts()):
+                    lines.append("{}_bucket{} {}".format(name, Metrics.format_labels(label_key, [("le", Metrics.format_value(float(bucket)))]), count))
+
+                lines.append("{}_bucket{} {}".format(name, Metrics.format_labels(label_key, [("le", "+Inf")]), value.count))
+                lines.append("{}_sum{} {}".format(name, Metrics.format_labels(label_key), Metrics.format_value(value.sum)))
+                lines.append("{}_count{} {}".format(name, Metrics.format_labels(label_key), value.count))
+
+        return "\n".join(lines) + "\n"
+
+    def make_summary(self):
+        summary = {"elapsed_seconds": self.clock() - self.started}
+
+        for (name, label_key), value in sorted(self.get_samples().items(), key=lambda sample: sample[0]):
+            key = name + Metrics.format_labels(label_key)
+
+            if isinstance(value, Histogram):
+                summary.setdefault("histograms", {})[key] = {
+                    "count": value.count,
+                    "sum": value.sum,
+                    "mean": value.sum / value.count if value.count else None,
+                    "max": value.max,
+                    "buckets": dict(zip([str(bucket) for bucket in value.buckets], value.get_cumulative_counts()))
+                }
+            else:
+                summary.setdefault(self.kinds[name] + "s", {})[key] = value
+
+        return summary
+
+    @staticmethod
+    def write_atomically(path, text):
+        # The node exporter may read the file at any moment, so it only ever sees a complete one
+        temporary_path = path + ".tmp"
+
+        with open(temporary_path, "w") as f:
+            f.write(text)
+
+        os.replace(temporary_path, path)
+
+    def write_textfile(self):
+        if self.textfile_path is None:
+            return
+
+        try:
+            Metrics.write_atomically(self.textfile_path, self.make_prometheus_text())
+        except OSError as e:
+            self.log("Metrics file '{}' not written: {}".format(self.textfile_path, str(e)))
+
+    def write_summary(self):
+        if self.summary_path is None:
+            return
+
+        try:
+            Metrics.write_atomically(self.summary_path, json.dumps(self.make_summary(), indent=2, sort_keys=True) + "\n")
+        except OSError as e:
+            self.log("Metrics summary '{}' not written: {}".format(self.summary_path, str(e)))
+
+    def start(self):
+        self.stopped.clear()
+
+        if self.textfile_path is None:
+            return
+
+        self.thread = threading.Thread(target=self.run, name="metrics", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        self.write_textfile()
+        self.write_summary()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.write_textfile()
+
+class NullMetrics(object):
+    def add_counter(self, name, help_text):
+        pass
+
+    def add_histogram(self, name, help_text, buckets):
+        pass
+
+    def add_sampled(self, name, kind, help_text, get_value, labels=None):
+        pass
+
+    def increment(self, name, amount=1, labels=None):
+        pass
+
+    def observe(self, name, value, labels=None):
+        pass
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
@@ -0,0 +1,182 @@
+import queue
+import threading
+
+from .stage_profiler import NullStageProfiler
+from .trace_recorder import NullTraceRecorder
+
+class RetryLater(Exception):
+    def __init__(self, delay):
+        super(RetryLater, self).__init__("retry in {:.1f}s".format(delay))
+
+        self.delay = delay
+
+class PipelineStage(object):
+    stop_item = object()
+
+    def __init__(self, name, worker_count, handler, queue_size=0, session_factory=None, controller=None, queue_factory=queue.Queue, failure_handler=None):
+        self.name = name
+        self.worker_count = worker_count
+        self.handler = handler
+        self.failure_handler = failure_handler
+        self.session_factory = session_factory
+        self.controller = controller
+        self.profiler = NullStageProfiler()
+        self.tracer = NullTraceRecorder()
+
+        self.queue = queue_factory(queue_size)
+        self.next_stage = None
+        self.threads = []
+        self.errors = []
+
+        self.pending_retries = 0
+        self.retry_condition = threading.Condition()
+
+    def put(self, item):
+        self.tracer.enqueue(self.name, item)
+        self.queue.put(item)
+
+    def emit(self, item):
+        if self.next_stage is not None:
+            self.next_stage.put(item)
+
+    def start(self):
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self.profiler.profile_thread(self.work), name="{}-{}".format(self.name, i + 1), daemon=True)
+            thread.start()
+
+            self.threads.append(thread)
+
+    def retry(self, item, delay):
+        with self.retry_condition:
+            self.pending_retries += 1
+
+        def requeue():
+            self.put(item)
+
+            with self.retry_condition:
+                self.pending_retries -= 1
+                self.retry_condition.notify_all()
+
+        timer = threading.Timer(delay, requeue)
+        timer.daemon = True
+        timer.start()
+
+    def wait_for_retries(self):
+        # A retried item can schedule another retry, so only stop once nothing is queued, running or waiting
+        while True:
+            self.queue.join()
+
+            with self.retry_condition:
+                while self.pending_retries:
+                    self.retry_condition.wait()
+
+                if self.queue.unfinished_tasks == 0:
+                    return
+
+    def stop(self):
+        self.wait_for_retries()
+
+        for _ in self.threads:
+            self.queue.put(PipelineStage.stop_item)
+
+        for thread in self.threads:
+            thread.join()
+
+    def work(self):
+        # Each worker keeps one session for its lifetime instead of one per item
+        if self.session_factory is None:
+            self.process_items(None)
+            return
+
+        try:
+            session = self.session_factory().__enter__()
+        except Exception as e:
+            # Items this worker can no longer handle are reported one by one when the stage can account for them
+            if self.failure_handler is None:
+                self.errors.append(e)
+
+            self.drain(e)
+            return
+
+        try:
+            self.process_items(session)
+        finally:
+            try:
+                session.__exit__(None, None, None)
+            except Exception as e:
+                self.errors.append(e)
+
+    def process_items(self, session):
+        while True:
+            # Idle workers beyond the controller's limit leave items queued instead of holding them
+            if self.controller is not None:
+                self.controller.acquire()
+
+            try:
+                item = self.queue.get()
+
+                if item is PipelineStage.stop_item:
+                    break
+
+                self.tracer.dequeue(self.name, item)
+
+                try:
+                    with self.profiler.measure(self.name), self.tracer.span(self.name, "stage", item):
+                        self.handler(item, self.emit, session)
+                except RetryLater as e:
+                    # The worker moves on and the item comes back once its delay has passed
+                    self.retry(item, e.delay)
+                except Exception as e:
+                    self.errors.append(e)
+                finally:
+                    self.queue.task_done()
+            finally:
+                if self.controller is not None:
+                    self.controller.release()
+
+    def drain(self, error):
+        while True:
+            item = self.queue.get()
+
+            try:
+                if item is PipelineStage.stop_item:
+                    break
+
+                if self.failure_handler is not None:
+                    self.failure_handler(item, error)
+            finally:
+                self.queue.task_done()
+
+class Pipeline(object):
+    def __init__(self, stages, profiler=None, tracer=None):
+        if not stages:
+            raise ValueError("stages must be non-empty")
+
+        self.stages = stages
+
+        for stage, next_stage in zip(stages, stages[1:]):
+            stage.next_stage = next_stage
+
+        if profiler is not None:
+            for stage in stages:
+                stage.profiler = profiler
+
+        if tracer is not None:
+            for stage in stages:
+                stage.tracer = tracer
+
+    def run(self, items):
+        for stage in self.stages:
+            stage.start()
+
+        try:
+            for item in items:
+                self.stages[0].put(item)
+        finally:
+            # Stages drain in order so every item emitted upstream is processed downstream
+            for stage in self.stages:
+                stage.stop()
+
+        for stage in self.stages:
+            if stage.errors:
+                raise stage.errors[0]
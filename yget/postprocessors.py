@@ -0,0 +1,164 @@
+import io
+import os
+import re
+
+from youtube_dl.postprocessor import get_postprocessor as get_youtube_dl_postprocessor
+from youtube_dl.postprocessor.common import AudioConversionError
+from youtube_dl.postprocessor.ffmpeg import FFmpegExtractAudioPP, FFmpegFixupM3u8PP, FFmpegFixupM4aPP, FFmpegFixupStretchedPP, FFmpegMetadataPP, FFmpegPostProcessorError
+from youtube_dl.utils import replace_extension
+
+class FFmpegExtractAudioMetadataPP(FFmpegExtractAudioPP):
+    # Same fields FFmpegMetadataPP writes, as (metadata names, info fields in order of preference)
+    metadata_fields = [
+        (("track", "title"), ("title",)),
+        (("date",), ("upload_date",)),
+        (("description", "comment"), ("description",)),
+        (("purl",), ("webpage_url",)),
+        (("track",), ("track_number",)),
+        (("artist",), ("artist", "creator", "uploader", "uploader_id")),
+        (("genre",), ("genre",)),
+        (("album",), ("album",)),
+        (("album_artist",), ("album_artist",)),
+        (("disc",), ("disc_number",)),
+        (("show",), ("series",)),
+        (("season_number",), ("season_number",)),
+        (("episode_id",), ("episode", "episode_id")),
+        (("episode_sort",), ("episode_number",))
+    ]
+
+    # Codec names reported by extractors mapped to the names ffprobe reports
+    codec_prefixes = [
+        ("mp4a", "aac"),
+        ("aac", "aac"),
+        ("opus", "opus"),
+        ("vorbis", "vorbis"),
+        ("mp3", "mp3"),
+        ("flac", "flac")
+    ]
+
+    def __init__(self, downloader=None, preferredcodec=None, preferredquality=None, nopostoverwrites=False):
+        FFmpegExtractAudioPP.__init__(self, downloader, preferredcodec, preferredquality, nopostoverwrites)
+
+        self.known_codec = None
+        self.metadata_options = []
+        self.chapters_path = None
+
+    @staticmethod
+    def make_metadata(info):
+        metadata = {}
+
+        for metadata_names, info_fields in FFmpegExtractAudioMetadataPP.metadata_fields:
+            for info_field in info_fields:
+                if info.get(info_field) is not None:
+                    for metadata_name in metadata_names:
+                        metadata[metadata_name] = info[info_field]
+                    break
+
+        return metadata
+
+    @staticmethod
+    def make_chapters_metadata(chapters):
+        # The ffmetadata file FFmpegMetadataPP writes, so chapter markers survive the single ffmpeg run
+        def escape(text):
+            return re.sub(r"(=|;|#|\\|\n)", r"\\\1", text)
+
+        content = ";FFMETADATA1\n"
+
+        for chapter in chapters:
+            content += "[CHAPTER]\nTIMEBASE=1/1000\n"
+            content += "START={:d}\n".format(int(chapter["start_time"] * 1000))
+            content += "END={:d}\n".format(int(chapter["end_time"] * 1000))
+
+            if chapter.get("title"):
+                content += "title={}\n".format(escape(chapter["title"]))
+
+        return content
+
+    @staticmethod
+    def get_known_codec(info):
+        acodec = (info.get("acodec") or "").lower()
+
+        for prefix, codec in FFmpegExtractAudioMetadataPP.codec_prefixes:
+            if acodec.startswith(prefix):
+                return codec
+
+        return None
+
+    def get_audio_codec(self, path):
+        # The extracted info already names the codec, which saves an ffprobe run per file
+        if self.known_codec is not None:
+            return self.known_codec
+
+        return FFmpegExtractAudioPP.get_audio_codec(self, path)
+
+    def run_ffmpeg(self, path, out_path, codec, more_opts):
+        if self.chapters_path is None:
+            FFmpegExtractAudioPP.run_ffmpeg(self, path, out_path, codec, more_opts + self.metadata_options)
+            return
+
+        acodec_opts = ["-acodec", codec] if codec is not None else []
+
+        try:
+            self.run_ffmpeg_multiple_files([path, self.chapters_path], out_path, ["-vn"] + acodec_opts + more_opts + self.metadata_options + ["-map_metadata", "1"])
+        except FFmpegPostProcessorError as err:
+            raise AudioConversionError(err.msg)
+
+    def run(self, information):
+        path = information["filepath"]
+
+        self.known_codec = FFmpegExtractAudioMetadataPP.get_known_codec(information)
+        self.metadata_options = []
+
+        for name, value in FFmpegExtractAudioMetadataPP.make_metadata(information).items():
+            self.metadata_options.extend(["-metadata", "{}={}".format(name, value)])
+
+        chapters = information.get("chapters")
+
+        if chapters:
+            self.chapters_path = replace_extension(path, "meta")
+
+            with io.open(self.chapters_path, "wt", encoding="utf-8") as f:
+                f.write(FFmpegExtractAudioMetadataPP.make_chapters_metadata(chapters))
+
+        try:
+            files_to_delete, information = FFmpegExtractAudioPP.run(self, information)
+        finally:
+            if self.chapters_path is not None:
+                os.remove(self.chapters_path)
+                self.chapters_path = None
+
+        # Nothing to convert so ffmpeg did not run, tag the file in place instead
+        if information["filepath"] == path:
+            return FFmpegMetadataPP(self._downloader).run(information)
+
+        return files_to_delete, information
+
+class Postprocessors(object):
+    custom_postprocessors = {
+        "FFmpegExtractAudioMetadata": FFmpegExtractAudioMetadataPP
+    }
+
+    @staticmethod
+    def get_postprocessor(key):
+        if key in Postprocessors.custom_postprocessors:
+            return Postprocessors.custom_postprocessors[key]
+
+        return get_youtube_dl_postprocessor(key)
+
+    @staticmethod
+    def get_fixups(youtube_downloader, info):
+        # The fixups process_info would add, run by the postprocess stage instead of in a transfer slot
+        fixups = []
+
+        stretched_ratio = info.get("stretched_ratio")
+
+        if stretched_ratio is not None and stretched_ratio != 1:
+            fixups.append(FFmpegFixupStretchedPP(youtube_downloader))
+
+        if info.get("requested_formats") is None and info.get("container") == "m4a_dash":
+            fixups.append(FFmpegFixupM4aPP(youtube_downloader))
+
+        if info.get("protocol") == "m3u8_native" or info.get("protocol") == "m3u8" and youtube_downloader.params.get("hls_prefer_native"):
+            fixups.append(FFmpegFixupM3u8PP(youtube_downloader))
+
+        return [fixup for fixup in fixups if fixup.available]
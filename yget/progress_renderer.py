@@ -0,0 +1,290 @@
+import collections
+import contextlib
+import os
+import shutil
+import sys
+import threading
+import time
+import youtube_dl
+
+from youtube_dl.downloader.common import FileDownloader
+
+class ProgressTransfer(object):
+    def __init__(self, filename, started):
+        self.filename = filename
+        self.started = started
+        self.downloaded_bytes = 0
+        self.total_bytes = None
+        self.speed = None
+        self.sample_bytes = None
+        self.sample_time = started
+
+    def get_remaining_bytes(self):
+        if self.total_bytes is None:
+            return None
+
+        return max(self.total_bytes - self.downloaded_bytes, 0)
+
+    def get_percent(self):
+        if not self.total_bytes:
+            return None
+
+        return min(self.downloaded_bytes * 100.0 / self.total_bytes, 100.0)
+
+    def get_eta(self):
+        remaining_bytes = self.get_remaining_bytes()
+
+        if remaining_bytes is None or not self.speed:
+            return None
+
+        return remaining_bytes / self.speed
+
+class ProgressRenderer(object):
+    redraw_interval = 0.25
+    log_interval = 30.0
+    speed_smoothing = 0.3
+    max_transfer_lines = 8
+
+    def __init__(self, stream=None, get_queued=None, get_rate_limit=None, is_tty=None, clock=time.monotonic):
+        self.stream = stream or sys.stdout
+        self.get_queued = get_queued or (lambda: 0)
+        self.get_rate_limit = get_rate_limit or (lambda: None)
+        self.is_tty = is_tty if is_tty is not None else ProgressRenderer.stream_is_tty(self.stream)
+        self.clock = clock
+
+        self.transfers = collections.OrderedDict()
+        self.completed = 0
+        self.completed_bytes = 0
+        self.drawn_lines = []
+        self.last_log = clock()
+        self.suspended = False
+        self.held_messages = []
+
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def stream_is_tty(stream):
+        try:
+            return stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def start(self):
+        self.stopped.clear()
+
+        self.thread = threading.Thread(target=self.run, name="progress", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+        with self.lock:
+            self.clear()
+            self.stream.flush()
+
+    def run(self):
+        while not self.stopped.wait(ProgressRenderer.redraw_interval):
+            self.render()
+
+    def update(self, info):
+        # Called for every chunk from the downloading threads, so only the numbers are kept and nothing is written
+        filename = info.get("filename")
+
+        if filename is None:
+            return
+
+        with self.lock:
+            transfer = self.transfers.get(filename)
+
+            if info.get("status") == "downloading":
+                if transfer is None:
+                    transfer = self.transfers[filename] = ProgressTransfer(filename, self.clock())
+
+                    if not self.is_tty:
+                        self.write("Downloading " + filename)
+
+                transfer.downloaded_bytes = info.get("downloaded_bytes") or 0
+                transfer.total_bytes = info.get("total_bytes") or info.get("total_bytes_estimate") or transfer.total_bytes
+            elif info.get("status") == "finished":
+                self.transfers.pop(filename, None)
+
+                total_bytes = info.get("total_bytes") or info.get("downloaded_bytes") or (transfer.downloaded_bytes if transfer is not None else 0)
+
+                self.completed += 1
+                self.completed_bytes += total_bytes
+
+                elapsed = self.clock() - transfer.started if transfer is not None else 0
+
+                self.write("Downloaded {} ({} in {})".format(filename, youtube_dl.utils.format_bytes(total_bytes), FileDownloader.format_seconds(elapsed)))
+            else:
+                self.transfers.pop(filename, None)
+
+    def write_line(self, message):
+        # Messages are written above the progress lines, which are drawn again underneath
+        with self.lock:
+            self.write(message)
+
+    @contextlib.contextmanager
+    def suspend(self):
+        # A prompt reads from the terminal, so nothing is drawn or written over it until it is answered
+        with self.lock:
+            self.clear()
+            self.stream.flush()
+            self.suspended = True
+
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.suspended = False
+
+                held_messages = self.held_messages
+                self.held_messages = []
+
+                for message in held_messages:
+                    self.write(message)
+
+    def write(self, message):
+        if self.suspended:
+            self.held_messages.append(message)
+            return
+
+        if not self.is_tty:
+            self.stream.write(message + "\n")
+            self.stream.flush()
+            return
+
+        lines = self.drawn_lines
+
+        self.clear()
+        self.stream.write(message + "\n")
+        self.draw(lines)
+
+    def render(self):
+        with self.lock:
+            if self.suspended:
+                return
+
+            now = self.clock()
+
+            self.sample_speeds(now)
+
+            if self.is_tty:
+                self.clear()
+                self.draw(self.make_transfer_lines() + [self.make_summary_line()])
+            elif self.transfers and now - self.last_log >= ProgressRenderer.log_interval:
+                self.last_log = now
+
+                for line in self.make_transfer_lines():
+                    self.stream.write(line + "\n")
+
+                self.stream.write(self.make_summary_line() + "\n")
+                self.stream.flush()
+
+    def sample_speeds(self, now):
+        for transfer in self.transfers.values():
+            elapsed = now - transfer.sample_time
+
+            if transfer.sample_bytes is None:
+                transfer.sample_bytes = transfer.downloaded_bytes
+                transfer.sample_time = now
+                continue
+
+            if elapsed <= 0:
+                continue
+
+            speed = max(transfer.downloaded_bytes - transfer.sample_bytes, 0) / elapsed
+
+            if transfer.speed is None:
+                transfer.speed = speed
+            else:
+                transfer.speed += ProgressRenderer.speed_smoothing * (speed - transfer.speed)
+
+            transfer.sample_bytes = transfer.downloaded_bytes
+            transfer.sample_time = now
+
+    def make_transfer_lines(self):
+        transfers = list(self.transfers.values())
+        lines = []
+
+        for transfer in transfers[:ProgressRenderer.max_transfer_lines]:
+            name = os.path.basename(transfer.filename) if self.is_tty else transfer.filename
+
+            lines.append("[{}] {}/s ETA {} {}".format(
+                FileDownloader.format_percent(transfer.get_percent()),
+                ProgressRenderer.format_rate(transfer.speed),
+                FileDownloader.format_eta(transfer.get_eta()),
+                name))
+
+        if len(transfers) > ProgressRenderer.max_transfer_lines:
+            lines.append("... and {} more".format(len(transfers) - ProgressRenderer.max_transfer_lines))
+
+        return lines
+
+    def make_summary_line(self):
+        transfers = list(self.transfers.values())
+        speed = sum(transfer.speed or 0 for transfer in transfers)
+
+        remaining = [transfer.get_remaining_bytes() for transfer in transfers]
+        eta = sum(remaining) / speed if speed and None not in remaining else None
+
+        items_left = len(transfers) + self.get_queued()
+
+        line = "[download] {} active, {} left, {} done, {}/s ETA {}".format(
+            len(transfers),
+            items_left,
+            self.completed,
+            ProgressRenderer.format_rate(speed),
+            FileDownloader.format_eta(eta))
+
+        rate_limit = self.get_rate_limit()
+
+        if rate_limit is not None:
+            line += " (limit " + youtube_dl.utils.format_bytes(rate_limit) + "/s)"
+
+        return line
+
+    @staticmethod
+    def format_rate(speed):
+        if speed is None:
+            return "---b"
+
+        return youtube_dl.utils.format_bytes(speed)
+
+    def clear(self):
+        if not self.drawn_lines:
+            return
+
+        # The cursor is left at the end of the last progress line
+        self.stream.write("\r\x1b[K" + "\x1b[A\x1b[K" * (len(self.drawn_lines) - 1))
+        self.drawn_lines = []
+
+    def draw(self, lines):
+        # Lines wider than the terminal would wrap and leave the cursor somewhere the next clear does not expect
+        width = shutil.get_terminal_size().columns - 1
+
+        self.drawn_lines = [line[:width] for line in lines]
+        self.stream.write("\n".join(self.drawn_lines))
+        self.stream.flush()
+
+class NullProgressRenderer(object):
+    def start(self):
+        pass
+
+    def suspend(self):
+        return contextlib.nullcontext()
+
+    def stop(self):
+        pass
+
+    def update(self, info):
+        pass
+
+    def write_line(self, message):
+        print(message)
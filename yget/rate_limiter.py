@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+
+from youtube_dl.downloader.common import FileDownloader
+
+class RateLimiter(object):
+    control_file_interval = 1.0
+
+    def __init__(self, rate=None, control_file=None, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+
+        self.rate = rate
+        self.tokens = 0.0
+        self.updated = clock()
+
+        self.control_file = control_file
+        self.control_file_mtime = None
+        self.control_file_checked = None
+
+        if control_file is not None:
+            self.reload()
+
+    @staticmethod
+    def parse_rate(value):
+        # Accepts the same values as youtube_dl's --limit-rate, e.g. 50K or 4.2M
+        return FileDownloader.parse_bytes(value.strip()) if value and value.strip() else None
+
+    def get_rate(self):
+        with self.lock:
+            return self.rate
+
+    def set_rate(self, rate):
+        with self.lock:
+            self.refill()
+            self.rate = rate
+            self.tokens = min(self.tokens, 0.0)
+
+    def reload(self):
+        self.control_file_checked = self.clock()
+
+        try:
+            mtime = os.path.getmtime(self.control_file)
+        except OSError:
+            return
+
+        if mtime == self.control_file_mtime:
+            return
+
+        self.control_file_mtime = mtime
+
+        with open(self.control_file) as f:
+            value = f.read()
+
+        # An empty file or "0" removes the limit, anything unreadable keeps the current one
+        if not value.strip() or value.strip() == "0":
+            self.set_rate(None)
+            return
+
+        rate = RateLimiter.parse_rate(value)
+
+        if rate is not None:
+            self.set_rate(rate)
+
+    def request_reload(self, *args):
+        self.control_file_mtime = None
+        self.control_file_checked = None
+
+    def refill(self):
+        now = self.clock()
+
+        if self.rate is not None:
+            # At most one second of unused bandwidth can be saved up as a burst
+            self.tokens = min(self.tokens + (now - self.updated) * self.rate, float(self.rate))
+
+        self.updated = now
+
+    def consume(self, byte_count):
+        if self.control_file is not None and (self.control_file_checked is None or self.clock() - self.control_file_checked >= RateLimiter.control_file_interval):
+            self.reload()
+
+        with self.lock:
+            if self.rate is None:
+                return
+
+            self.refill()
+            self.tokens -= byte_count
+
+            # Callers take what they need and wait off the debt so large chunks are not starved by small ones
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            self.sleep(wait)
@@ -0,0 +1,23 @@
+import random
+
+from .error_classifier import ErrorClassifier
+
+class RetryScheduler(object):
+    default_max_attempts = 4
+    default_base_delay = 2.0
+    default_max_delay = 120.0
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None, random=random.random):
+        self.max_attempts = max_attempts if max_attempts is not None else RetryScheduler.default_max_attempts
+        self.base_delay = base_delay if base_delay is not None else RetryScheduler.default_base_delay
+        self.max_delay = max_delay if max_delay is not None else RetryScheduler.default_max_delay
+        self.random = random
+
+    def should_retry(self, error_class, attempts):
+        return error_class == ErrorClassifier.transient and attempts < self.max_attempts
+
+    def get_delay(self, attempts):
+        delay = min(self.base_delay * 2 ** (attempts - 1), self.max_delay)
+
+        # Equal jitter keeps a minimum wait while spreading out workers that failed together
+        return delay / 2 + self.random() * delay / 2
@@ -0,0 +1,249 @@
+import json
+import os
+import re
+import threading
+
+from youtube_dl.utils import sanitized_Request
+
+class SegmentedDownloadError(Exception):
+    pass
+
+class SegmentedDownloader(object):
+    chunk_size = 64 * 1024
+    checkpoint_size = 4 * 1024 * 1024
+    segments_extension = ".segments"
+    ranges_extension = ".ranges"
+    temporary_extension = ".tmp"
+    incomplete_extensions = (segments_extension, ranges_extension, temporary_extension)
+    supported_protocols = ("http", "https")
+    content_range_regex = re.compile(r"bytes\s+(?P<start>\d+)-(?P<end>\d+)/(?P<total>\d+)")
+
+    def __init__(self, youtube_downloader, segment_count, min_size, progress_hooks=None, rate_limiter=None):
+        self.youtube_downloader = youtube_downloader
+        self.segment_count = segment_count
+        self.min_size = min_size
+        self.progress_hooks = progress_hooks or []
+        self.rate_limiter = rate_limiter
+
+        self.lock = threading.Lock()
+
+    def is_suitable(self, info):
+        if self.segment_count < 2 or info.get("requested_formats"):
+            return False
+
+        if info.get("protocol", "https") not in SegmentedDownloader.supported_protocols:
+            return False
+
+        filesize = info.get("filesize") or info.get("filesize_approx")
+
+        return filesize is None or filesize >= self.min_size
+
+    def download(self, filename, info):
+        # Returns False when the file should be fetched over a single connection instead
+        if not self.is_suitable(info) or os.path.exists(filename) or os.path.exists(filename + ".part"):
+            return False
+
+        url = info["url"]
+        headers = info.get("http_headers", {})
+
+        # youtube_dl takes any .part as its own to resume, so the preallocated file and its progress get names of their own
+        segments_filename = filename + SegmentedDownloader.segments_extension
+        ranges_filename = segments_filename + SegmentedDownloader.ranges_extension
+
+        total = self.probe(url, headers)
+
+        if total is None or total < self.min_size:
+            SegmentedDownloader.remove_files(segments_filename, ranges_filename)
+            return False
+
+        ranges = SegmentedDownloader.load_ranges(ranges_filename, total) if os.path.exists(segments_filename) else None
+
+        try:
+            if ranges is None:
+                SegmentedDownloader.remove_files(segments_filename, ranges_filename)
+
+                ranges = [[start, end, 0] for start, end in self.make_segments(total)]
+
+                self.preallocate(segments_filename, total)
+                SegmentedDownloader.save_ranges(ranges_filename, total, ranges)
+
+            self.download_segments(url, headers, filename, segments_filename, ranges_filename, total, ranges)
+
+            # The file is preallocated to its full size, so completeness is judged by the bytes each range received
+            received = sum(segment[2] for segment in ranges)
+
+            if received != total:
+                raise SegmentedDownloadError("expected {} bytes but received {}".format(total, received))
+        except Exception:
+            SegmentedDownloader.remove_files(segments_filename, ranges_filename)
+
+            return False
+
+        os.replace(segments_filename, filename)
+        SegmentedDownloader.remove_files(ranges_filename)
+
+        return True
+
+    @staticmethod
+    def remove_files(*filenames):
+        for filename in filenames:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+    @staticmethod
+    def load_ranges(ranges_filename, total):
+        # Ranges of an interrupted download, each with how many of its bytes were written, or None to start again
+        try:
+            with open(ranges_filename) as f:
+                state = json.load(f)
+
+            ranges = state["ranges"]
+
+            if state["total"] != total or not ranges:
+                return None
+
+            expected_start = 0
+
+            for start, end, received in ranges:
+                if start != expected_start or end < start or not 0 <= received <= end - start + 1:
+                    return None
+
+                expected_start = end + 1
+
+            if expected_start != total:
+                return None
+
+            return [list(segment) for segment in ranges]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def save_ranges(ranges_filename, total, ranges):
+        temporary_filename = ranges_filename + SegmentedDownloader.temporary_extension
+
+        with open(temporary_filename, "w") as f:
+            json.dump({"total": total, "ranges": ranges}, f)
+
+        os.replace(temporary_filename, ranges_filename)
+
+    def make_request(self, url, headers, start, end):
+        request = sanitized_Request(url, None, headers)
+        request.add_header("Range", "bytes={}-{}".format(start, end))
+
+        return request
+
+    def probe(self, url, headers):
+        try:
+            response = self.youtube_downloader.urlopen(self.make_request(url, headers, 0, 0))
+        except Exception:
+            return None
+
+        with response:
+            # A 200 means the server ignored the range and would send the whole file on every connection
+            if response.getcode() != 206:
+                return None
+
+            match = SegmentedDownloader.content_range_regex.match(response.headers.get("Content-Range", ""))
+
+            if match is None:
+                return None
+
+            return int(match.group("total"))
+
+    def preallocate(self, segments_filename, total):
+        with open(segments_filename, "wb") as f:
+            if hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, total)
+                    return
+                except OSError:
+                    pass
+
+            f.truncate(total)
+
+    def make_segments(self, total):
+        segment_size = -(-total // self.segment_count)
+
+        return [(start, min(start + segment_size, total) - 1) for start in range(0, total, segment_size)]
+
+    def download_segments(self, url, headers, filename, segments_filename, ranges_filename, total, ranges):
+        progress = {"downloaded_bytes": sum(segment[2] for segment in ranges)}
+        errors = []
+
+        def download_segment(segment):
+            try:
+                self.download_segment(url, headers, filename, segments_filename, ranges_filename, total, ranges, segment, progress)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=download_segment, args=(segment,), daemon=True) for segment in ranges if segment[2] < segment[1] - segment[0] + 1]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+    def download_segment(self, url, headers, filename, segments_filename, ranges_filename, total, ranges, segment, progress):
+        segment_start, end, received = segment
+        start = segment_start + received
+
+        response = self.youtube_downloader.urlopen(self.make_request(url, headers, start, end))
+
+        with response, open(segments_filename, "r+b") as f:
+            match = SegmentedDownloader.content_range_regex.match(response.headers.get("Content-Range", ""))
+
+            if response.getcode() != 206 or match is None or int(match.group("start")) != start or int(match.group("total")) != total:
+                raise SegmentedDownloadError("server did not return the requested range {}-{}".format(start, end))
+
+            f.seek(start)
+
+            expected = end - segment_start + 1
+            unsaved = 0
+
+            while received < expected:
+                data = response.read(min(SegmentedDownloader.chunk_size, expected - received))
+
+                if not data:
+                    break
+
+                f.write(data)
+                received += len(data)
+                unsaved += len(data)
+
+                # Shared by every segment so the per transfer cap covers all connections together
+                if self.rate_limiter is not None:
+                    self.rate_limiter.consume(len(data))
+
+                with self.lock:
+                    progress["downloaded_bytes"] += len(data)
+                    downloaded_bytes = progress["downloaded_bytes"]
+
+                # Progress is only recorded for bytes already written so a killed run resumes without gaps
+                if unsaved >= SegmentedDownloader.checkpoint_size or received == expected:
+                    f.flush()
+                    self.save_progress(ranges_filename, total, ranges, segment, received)
+                    unsaved = 0
+
+                self.hook_progress({
+                    "status": "downloading",
+                    "filename": filename,
+                    "downloaded_bytes": downloaded_bytes,
+                    "total_bytes": total
+                })
+
+            if received != expected:
+                raise SegmentedDownloadError("expected {} bytes for range {}-{} but received {}".format(expected, segment_start, end, received))
+
+    def save_progress(self, ranges_filename, total, ranges, segment, received):
+        with self.lock:
+            segment[2] = received
+
+            SegmentedDownloader.save_ranges(ranges_filename, total, ranges)
+
+    def hook_progress(self, status):
+        for progress_hook in self.progress_hooks:
+            progress_hook(status)
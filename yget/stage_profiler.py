@@ -0,0 +1,149 @@
+import collections
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+class StageTimes(object):
+    def __init__(self):
+        self.items = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+
+class StageProfiler(object):
+    # From Python 3.12 a profile follows every thread and a second one cannot be enabled alongside it
+    per_thread = sys.version_info < (3, 12)
+
+    def __init__(self, path, clock=time.monotonic, log=print):
+        self.path = path
+        self.clock = clock
+        self.log = log
+
+        self.profiles = []
+        self.stage_times = collections.OrderedDict()
+        self.main_profile = None
+        self.started = None
+        self.started_cpu = None
+        self.started_children = None
+
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_children_cpu():
+        # Only finished child processes are counted, which is every ffmpeg run once its stage has returned
+        times = os.times()
+
+        return times.children_user + times.children_system
+
+    def start(self):
+        self.started = self.clock()
+        self.started_cpu = time.process_time()
+        self.started_children = StageProfiler.get_children_cpu()
+
+        self.main_profile = self.make_profile()
+        self.main_profile.enable()
+
+    def make_profile(self):
+        profile = cProfile.Profile()
+
+        with self.lock:
+            self.profiles.append(profile)
+
+        return profile
+
+    def profile_thread(self, target):
+        if not self.per_thread:
+            return target
+
+        # cProfile only follows the thread it was enabled in, so each worker keeps its own profile
+        def run():
+            profile = self.make_profile()
+            profile.enable()
+
+            try:
+                target()
+            finally:
+                profile.disable()
+
+        return run
+
+    @contextlib.contextmanager
+    def measure(self, stage_name):
+        started = self.clock()
+        started_cpu = time.thread_time()
+
+        try:
+            yield
+        finally:
+            wall = self.clock() - started
+            cpu = time.thread_time() - started_cpu
+
+            with self.lock:
+                stage_times = self.stage_times.setdefault(stage_name, StageTimes())
+                stage_times.items += 1
+                stage_times.wall += wall
+                stage_times.cpu += cpu
+
+    def stop(self):
+        self.main_profile.disable()
+
+        wall = self.clock() - self.started
+        cpu = time.process_time() - self.started_cpu
+        children_cpu = StageProfiler.get_children_cpu() - self.started_children
+
+        with self.lock:
+            profiles = list(self.profiles)
+
+        for profile in profiles:
+            profile.create_stats()
+
+        stats = pstats.Stats(profiles[0])
+
+        for profile in profiles[1:]:
+            stats.add(pstats.Stats(profile))
+
+        try:
+            stats.dump_stats(self.path)
+        except OSError as e:
+            self.log("Profile '{}' not written: {}".format(self.path, str(e)))
+
+        return self.make_table(wall, cpu, children_cpu)
+
+    def make_table(self, wall, cpu, children_cpu):
+        lines = ["{:<12} {:>7} {:>10} {:>10} {:>6}".format("stage", "items", "wall s", "cpu s", "cpu %")]
+
+        with self.lock:
+            stage_times = list(self.stage_times.items())
+
+        for stage_name, times in stage_times:
+            lines.append(StageProfiler.format_row(stage_name, times.items, times.wall, times.cpu))
+
+        lines.append(StageProfiler.format_row("ffmpeg", None, None, children_cpu))
+        lines.append(StageProfiler.format_row("total", None, wall, cpu))
+
+        return lines
+
+    @staticmethod
+    def format_row(name, items, wall, cpu):
+        return "{:<12} {:>7} {:>10} {:>10.2f} {:>6}".format(
+            name,
+            "-" if items is None else items,
+            "-" if wall is None else "{:.2f}".format(wall),
+            cpu,
+            "{:.0f}%".format(cpu * 100 / wall) if wall else "-")
+
+class NullStageProfiler(object):
+    def start(self):
+        pass
+
+    def profile_thread(self, target):
+        return target
+
+    def measure(self, stage_name):
+        return contextlib.nullcontext()
+
+    def stop(self):
+        return []
@@ -0,0 +1,52 @@
+import time
+
+from urllib.parse import parse_qs, urlparse
+
+class StreamUrls(object):
+    expiry_margin = 60
+
+    @staticmethod
+    def get_urls(info):
+        if info.get("requested_formats"):
+            return [f.get("url") for f in info["requested_formats"] if f.get("url")]
+
+        if info.get("url"):
+            return [info["url"]]
+
+        return []
+
+    @staticmethod
+    def get_expiry(url):
+        query = parse_qs(urlparse(url).query)
+
+        # YouTube stream urls carry their expiry as a unix timestamp, either as a query or path parameter
+        values = query.get("expire")
+
+        if not values:
+            parts = urlparse(url).path.split("/")
+
+            if "expire" in parts and parts.index("expire") + 1 < len(parts):
+                values = [parts[parts.index("expire") + 1]]
+
+        try:
+            return int(values[0]) if values else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def has_expired(info, now=None):
+        if now is None:
+            now = time.time()
+
+        urls = StreamUrls.get_urls(info)
+
+        if not urls:
+            return True
+
+        for url in urls:
+            expiry = StreamUrls.get_expiry(url)
+
+            if expiry is not None and expiry - StreamUrls.expiry_margin <= now:
+                return True
+
+        return False
@@ -0,0 +1,118 @@
+import collections
+import contextlib
+import itertools
+import json
+import os
+import threading
+import time
+
+class TraceRecorder(object):
+    def __init__(self, path, describe=None, clock=time.perf_counter, log=print):
+        self.path = path
+        self.describe = describe or (lambda item: {})
+        self.clock = clock
+        self.log = log
+
+        self.pid = os.getpid()
+        self.started = clock()
+        self.events = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "yget"}}]
+        self.thread_ids = set()
+        self.enqueued = {}
+        self.async_ids = itertools.count(1)
+
+        self.lock = threading.Lock()
+
+    def get_timestamp(self, moment):
+        # Trace event timestamps are microseconds
+        return (moment - self.started) * 1000000
+
+    def add_event(self, event):
+        thread = threading.current_thread()
+
+        event["pid"] = self.pid
+        event["tid"] = thread.ident
+
+        with self.lock:
+            # Each worker thread is its own track, named after the stage it belongs to
+            if thread.ident not in self.thread_ids:
+                self.thread_ids.add(thread.ident)
+                self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": thread.ident, "args": {"name": thread.name}})
+
+            self.events.append(event)
+
+    def get_args(self, item):
+        if item is None:
+            return {}
+
+        try:
+            return self.describe(item)
+        except Exception:
+            return {}
+
+    @contextlib.contextmanager
+    def span(self, name, category, item=None):
+        started = self.clock()
+
+        try:
+            yield
+        finally:
+            ended = self.clock()
+
+            self.add_event({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self.get_timestamp(started),
+                "dur": (ended - started) * 1000000,
+                "args": self.get_args(item)
+            })
+
+    def enqueue(self, stage_name, item):
+        # The same item can be queued more than once, so each keeps the times it was queued at in order
+        with self.lock:
+            self.enqueued.setdefault((stage_name, id(item)), collections.deque()).append(self.clock())
+
+    def dequeue(self, stage_name, item):
+        key = (stage_name, id(item))
+
+        with self.lock:
+            times = self.enqueued.get(key)
+
+            if not times:
+                return
+
+            enqueued = times.popleft()
+
+            if not times:
+                del self.enqueued[key]
+
+        # Waits overlap each other, so they are async events which the viewer lays out on rows of their own
+        async_id = next(self.async_ids)
+        name = stage_name + " queue"
+        args = self.get_args(item)
+
+        self.add_event({"name": name, "cat": "queue", "ph": "b", "id": async_id, "ts": self.get_timestamp(enqueued), "args": args})
+        self.add_event({"name": name, "cat": "queue", "ph": "e", "id": async_id, "ts": self.get_timestamp(self.clock())})
+
+    def write(self):
+        with self.lock:
+            events = list(self.events)
+
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        except OSError as e:
+            self.log("Trace '{}' not written: {}".format(self.path, str(e)))
+
+class NullTraceRecorder(object):
+    def span(self, name, category, item=None):
+        return contextlib.nullcontext()
+
+    def enqueue(self, stage_name, item):
+        pass
+
+    def dequeue(self, stage_name, item):
+        pass
+
+    def write(self):
+        pass
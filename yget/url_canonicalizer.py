@@ -0,0 +1,111 @@
+import re
+
+class UrlCanonicalizer(object):
+    kind_video = "video"
+    kind_playlist = "playlist"
+    kind_mix = "mix"
+    kind_channel = "channel"
+
+    video_id_pattern = r"[0-9A-Za-z_-]{11}"
+    playlist_id_pattern = r"(?:PL|LL|EC|UU|FL|RD|UL|TL|PU|OLAK5uy_)[0-9A-Za-z_-]{10,}|RDMM|WL|LL|LM"
+    list_parameter_pattern = r"[0-9A-Za-z_-]+"
+    query_pattern = r"[^#\s]*"
+
+    # Mixes are made around a video and only open on a watch page, unlike album playlists which also start with RD
+    mix_regex = re.compile(r"^RD(?!CLAK5uy_)")
+
+    # Every accepted form in one expression so each input is classified by a single match
+    input_regex = re.compile(r"""
+        ^\s*(?:
+            (?P<bare_video>{video})(?=\s*$)
+          | (?P<bare_playlist>{playlist})(?=\s*$)
+          | (?:https?://)?
+            (?:
+                (?:(?:www|m|music|gaming)\.)?youtube(?:-nocookie)?\.com/
+                (?:
+                    (?:watch|watch_popup)/?\?
+                    (?=(?:{query}&)?v=(?P<watch_video>{video})(?![0-9A-Za-z_-]))?
+                    (?=(?:{query}&)?list=(?P<watch_playlist>{list_parameter}))?
+                  | playlist/?\?(?=(?:{query}&)?list=(?P<playlist>{list_parameter}))
+                  | (?:embed|v|e|shorts|live)/(?P<path_video>{video})(?![0-9A-Za-z_-])
+                  | (?P<channel>(?:channel/UC[0-9A-Za-z_-]{{22}}|(?:c|user)/[^/?#\s]+|@[^/?#\s]+))
+                )
+              | youtu\.be/(?P<short_video>{video})(?![0-9A-Za-z_-])
+                (?:\?(?=(?:{query}&)?list=(?P<short_playlist>{list_parameter})))?
+            )
+            {query}(?:\#\S*)?
+        )\s*$
+        """.format(video=video_id_pattern, playlist=playlist_id_pattern, list_parameter=list_parameter_pattern, query=query_pattern), re.VERBOSE)
+
+    @staticmethod
+    def classify(value):
+        match = UrlCanonicalizer.input_regex.match(value)
+
+        if match is None:
+            return (None, None)
+
+        groups = match.groupdict()
+
+        # youtube_dl downloads the whole playlist when a watch url also names one
+        playlist_id = groups["bare_playlist"] or groups["playlist"] or groups["watch_playlist"] or groups["short_playlist"]
+        video_id = groups["bare_video"] or groups["watch_video"] or groups["path_video"] or groups["short_video"]
+
+        # The seed video is kept with a mix, youtube_dl falls back to it when the mix cannot be listed
+        if playlist_id is not None and UrlCanonicalizer.mix_regex.match(playlist_id):
+            return (UrlCanonicalizer.kind_mix, (video_id, playlist_id))
+
+        if playlist_id is not None:
+            return (UrlCanonicalizer.kind_playlist, playlist_id)
+
+        if video_id is not None:
+            return (UrlCanonicalizer.kind_video, video_id)
+
+        if groups["channel"] is not None:
+            return (UrlCanonicalizer.kind_channel, groups["channel"])
+
+        return (None, None)
+
+    @staticmethod
+    def make_url(kind, id):
+        if kind == UrlCanonicalizer.kind_video:
+            return "https://www.youtube.com/watch?v=" + id
+
+        if kind == UrlCanonicalizer.kind_playlist:
+            return "https://www.youtube.com/playlist?list=" + id
+
+        if kind == UrlCanonicalizer.kind_mix:
+            video_id, playlist_id = id
+
+            if video_id is None:
+                return "https://www.youtube.com/watch?list=" + playlist_id
+
+            return "https://www.youtube.com/watch?v={}&list={}".format(video_id, playlist_id)
+
+        return "https://www.youtube.com/" + id
+
+    @staticmethod
+    def canonicalize(value):
+        # Inputs that are not recognised are passed on unchanged for youtube_dl to try
+        kind, id = UrlCanonicalizer.classify(value)
+
+        if kind is None:
+            return value.strip()
+
+        return UrlCanonicalizer.make_url(kind, id)
+
+    @staticmethod
+    def canonicalize_all(values):
+        return [UrlCanonicalizer.canonicalize(value) for value in values]
+
+    @staticmethod
+    def get_key(value):
+        # Inputs naming the same video or playlist in different forms share a key
+        kind, id = UrlCanonicalizer.classify(value)
+
+        return (kind, id) if kind is not None else (None, value.strip())
+
+    @staticmethod
+    def get_video_id(value):
+        kind, id = UrlCanonicalizer.classify(value)
+
+        return id if kind == UrlCanonicalizer.kind_video else None